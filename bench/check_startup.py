@@ -0,0 +1,60 @@
+"""Regression check waktu start CLI untuk mode phone (-p).
+
+Waktu start absolut terutama mengukur mesin, jadi yang dibandingkan adalah
+overhead xtrace di atas interpreter kosong (``python -c pass``) yang diukur
+di run yang sama. Command dijalankan sekali dulu supaya cache dependency
+check dan bytecode hangat, lalu median beberapa run dibandingkan dengan
+target. Exit code 1 jika overhead melewati target.
+
+    python -m bench.check_startup
+    python -m bench.check_startup --target-ms 80 --runs 9
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Overhead maksimum di atas start interpreter kosong: budget 100 ms dikurangi ~20 ms start interpreter
+TARGET_MS = 80.0
+COMMAND = ['-p', '+14155550123']
+
+def measure(argv, runs, workdir, env):
+    # Run pertama mengisi cache dependency check dan __pycache__, tidak dihitung
+    subprocess.run(argv, cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                   stdin=subprocess.DEVNULL, check=True)
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(argv, cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                       stdin=subprocess.DEVNULL, check=True)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail if phone-mode CLI startup overhead exceeds the target")
+    parser.add_argument('--target-ms', type=float, default=TARGET_MS,
+                        help="Maximum median overhead over a bare interpreter start")
+    parser.add_argument('--runs', type=int, default=7)
+    args = parser.parse_args()
+    runs = max(1, args.runs)
+
+    # Bytecode harus bisa ditulis, kalau tidak setiap run ikut mengukur compile
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    # Hasil scan ditulis ke direktori sementara, bukan ke working tree
+    with tempfile.TemporaryDirectory(prefix='xtrace-startup-') as workdir:
+        baseline = statistics.median(measure([sys.executable, '-c', 'pass'], runs, workdir, env))
+        samples = measure([sys.executable, os.path.join(ROOT, 'xtrace.py')] + COMMAND, runs, workdir, env)
+    median = statistics.median(samples)
+    overhead = median - baseline
+    status = 'OK' if overhead <= args.target_ms else 'FAIL'
+    print(f"{status}: xtrace {' '.join(COMMAND)} startup median {median:.1f} ms, "
+          f"bare interpreter {baseline:.1f} ms, overhead {overhead:.1f} ms (target {args.target_ms:.0f} ms)")
+    return 0 if status == 'OK' else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
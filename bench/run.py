@@ -0,0 +1,382 @@
+"""Benchmark offline XTrace terhadap server lokal (tanpa akses internet).
+
+Setiap benchmark berjalan di subprocess sendiri supaya peak RSS dan jumlah
+thread terukur per modul. Hasil ditulis sebagai JSON yang bisa dibandingkan
+antar versi dengan --compare.
+
+    python -m bench.run -o bench.json
+    python -m bench.run --only username,portscan --compare bench.json
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARKS = ('username', 'subdomains', 'domain', 'portscan', 'startup')
+
+def percentiles(samples):
+    """Ringkasan latency dalam milidetik"""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def pick(q):
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 3)
+
+    return {
+        'count': len(ordered),
+        'min': round(ordered[0] * 1000, 3),
+        'p50': pick(0.50),
+        'p95': pick(0.95),
+        'p99': pick(0.99),
+        'max': round(ordered[-1] * 1000, 3),
+        'mean': round(sum(ordered) / len(ordered) * 1000, 3),
+    }
+
+def _peak_rss_mb(who=resource.RUSAGE_SELF):
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux melaporkan KB, macOS byte
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def _os_threads():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('Threads:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return threading.active_count()
+
+class ThreadSampler:
+    """Catat jumlah thread tertinggi selama benchmark berjalan"""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.peak_python = 0
+        self.peak_os = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='bench-sampler', daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak_python = max(self.peak_python, threading.active_count() - 1)
+            self.peak_os = max(self.peak_os, _os_threads() - 1)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def bench_username(args, latencies):
+    from bench.standins import HTTPStandIn, Route
+    import modules.username as username
+
+    routes = {}
+    for i in range(args.platforms):
+        # Seperempat platform "ditemukan", sisanya 404 dengan body kecil
+        found = i % 4 == 0
+        routes[f"/p{i}/"] = Route(status=200 if found else 404, latency=args.http_latency,
+                                  size=args.body_size if found else 256)
+    server = HTTPStandIn(routes).start()
+    username.PLATFORMS = {f"Site{i:03d}": f"{server.base_url}/p{i}/{{username}}" for i in range(args.platforms)}
+
+    probe = username.probe_platform
+
+    def timed_probe(*args):
+        start = time.perf_counter()
+        try:
+            return probe(*args)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    username.probe_platform = timed_probe
+    try:
+        for iteration in range(args.iterations):
+            username.check_username(f"benchuser{iteration}", 'bench', concurrency=args.concurrency)
+    finally:
+        server.stop()
+    return args.iterations * args.platforms
+
+def bench_subdomains(args, latencies):
+    from bench.standins import DNSStandIn
+    import modules.subdomains as subdomains
+
+    if not subdomains.DNS_AVAILABLE:
+        raise RuntimeError('dnspython not installed')
+
+    domain = 'bench.test'
+    labels = [f"host{i}" for i in range(args.labels)]
+    zone = {f"{label}.{domain}": f"10.0.{i // 250 % 250}.{i % 250 + 1}"
+            for i, label in enumerate(labels) if i % 10 == 0}
+    server = DNSStandIn(zone, latency=args.dns_latency).start()
+    wordlist = os.path.join(os.getcwd(), 'bench_wordlist.txt')
+    with open(wordlist, 'w') as f:
+        f.write('\n'.join(labels) + '\n')
+
+    make_lookup = subdomains._make_lookup
+
+    def timed_make_lookup(nameservers, timeout):
+        lookup = make_lookup(nameservers, timeout)
+        if not asyncio.iscoroutinefunction(lookup):
+            def timed(name):
+                start = time.perf_counter()
+                try:
+                    return lookup(name)
+                finally:
+                    latencies.append(time.perf_counter() - start)
+            return timed
+
+        async def timed_async(name):
+            start = time.perf_counter()
+            try:
+                return await lookup(name)
+            finally:
+                latencies.append(time.perf_counter() - start)
+        return timed_async
+
+    subdomains._make_lookup = timed_make_lookup
+    checked = 0
+    try:
+        for _ in range(args.iterations):
+            result = subdomains.enumerate_subdomains(
+                domain, wordlist, nameservers=[server.nameserver],
+                concurrency=args.concurrency or subdomains.DEFAULT_CONCURRENCY)
+            checked += result['checked'] + subdomains.WILDCARD_PROBES
+    finally:
+        server.stop()
+    return checked
+
+def bench_domain(args, latencies):
+    """Semua stage check_domain (tanpa output terminal) terhadap DNS dan HTTP stand-in.
+
+    Belum ada stand-in TLS, jadi stage HTTPS diarahkan ke port tertutup dan
+    hanya mengukur jalur connection refused.
+    """
+    from bench.standins import DNSStandIn, HTTPStandIn, Route, TCPListeners
+    import modules.domain as domain_module
+    from modules.metrics import ScanMetrics
+
+    if not domain_module.DNS_AVAILABLE:
+        raise RuntimeError('dnspython not installed')
+    import dns.resolver
+
+    domain = 'bench.test'
+    labels = [f"host{i}" for i in range(args.labels)]
+    zone = {f"{label}.{domain}": f"10.0.{i // 250 % 250}.{i % 250 + 1}"
+            for i, label in enumerate(labels) if i % 10 == 0}
+    zone[domain] = '127.0.0.1'
+    dns_server = DNSStandIn(zone, latency=args.dns_latency).start()
+    http_server = HTTPStandIn({'/': Route(status=200, latency=args.http_latency, size=args.body_size)}).start()
+    closed = TCPListeners(open_count=0, closed_count=1).start()
+    wordlist = os.path.join(os.getcwd(), 'bench_wordlist.txt')
+    with open(wordlist, 'w') as f:
+        f.write('\n'.join(labels) + '\n')
+
+    resolver = dns.resolver.Resolver(configure=False)
+    address, _, port = dns_server.nameserver.partition(':')
+    resolver.nameservers = [address]
+    resolver.port = int(port)
+
+    class StandInLookups:
+        """Pengganti SharedLookups yang bertanya ke DNS stand-in"""
+
+        def host(self, host):
+            return resolver.resolve(host, 'A')[0].address
+
+        def records(self, name, record_type):
+            return [str(rdata) for rdata in resolver.resolve(name, record_type)]
+
+    # http://bench.test dan HTTPS bench.test:443 diarahkan ke server lokal
+    make_request = domain_module.make_request
+    fingerprint_https = domain_module.fingerprint_https
+    domain_module.make_request = lambda url, timeout=10: make_request(
+        url.replace(f"http://{domain}", http_server.base_url, 1), timeout=timeout)
+    domain_module.fingerprint_https = lambda host, timeout=10: fingerprint_https(
+        '127.0.0.1', port=closed.closed_ports[0], timeout=timeout)
+
+    try:
+        for _ in range(args.iterations):
+            found = []
+            start = time.perf_counter()
+            graph = domain_module.build_domain_graph(
+                domain, ScanMetrics('domain'), lookups=StandInLookups(), wordlist=wordlist,
+                nameservers=[dns_server.nameserver], concurrency=args.concurrency, found=found)
+            graph.run()
+            domain_module.collect_domain_results(domain, graph, found)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        closed.stop()
+        http_server.stop()
+        dns_server.stop()
+    return args.iterations
+
+def bench_portscan(args, latencies):
+    from bench.standins import TCPListeners
+    from modules.ip import check_ip
+
+    listeners = TCPListeners(open_count=args.open_ports, closed_count=args.closed_ports).start()
+    ports = listeners.open_ports + listeners.closed_ports
+    scope_file = os.path.join(os.getcwd(), 'bench_scope.txt')
+    with open(scope_file, 'w') as f:
+        f.write('127.0.0.1\n')
+
+    try:
+        for _ in range(args.iterations):
+            start = time.perf_counter()
+            check_ip('127.0.0.1', 'bench', port_spec=','.join(map(str, ports)),
+                     scope_file=scope_file, concurrency=args.concurrency)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        listeners.stop()
+    return args.iterations * len(ports)
+
+def bench_startup(args, latencies):
+    """Waktu start CLI untuk mode tanpa jaringan (-h dan -p)"""
+    commands = [['-h'], ['-p', '+14155550123']]
+    script = os.path.join(ROOT, 'xtrace.py')
+    runs = 0
+    # Run pertama tiap command mengisi cache (dependency check, import) dan tidak dihitung
+    for command in commands:
+        subprocess.run([sys.executable, script] + command, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, stdin=subprocess.DEVNULL)
+    for _ in range(max(args.iterations, 5)):
+        for command in commands:
+            start = time.perf_counter()
+            subprocess.run([sys.executable, script] + command, stdout=subprocess.DEVNULL,
+                           stderr=subprocess.DEVNULL, stdin=subprocess.DEVNULL)
+            latencies.append(time.perf_counter() - start)
+            runs += 1
+    return runs
+
+def run_child(name, args):
+    """Jalankan satu benchmark di proses ini dan return ringkasannya"""
+    latencies = []
+    benchmark = globals()[f"bench_{name}"]
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        with ThreadSampler() as sampler:
+            start = time.perf_counter()
+            ops = benchmark(args, latencies)
+            elapsed = time.perf_counter() - start
+
+    summary = {
+        'ops': ops,
+        'seconds': round(elapsed, 3),
+        'throughput_per_s': round(ops / elapsed, 1) if elapsed else None,
+        'latency_ms': percentiles(latencies),
+        'peak_rss_mb': _peak_rss_mb(resource.RUSAGE_CHILDREN if name == 'startup' else resource.RUSAGE_SELF),
+    }
+    if name != 'startup':
+        summary['peak_threads'] = sampler.peak_python
+        summary['peak_os_threads'] = sampler.peak_os
+    return summary
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def run_all(args, names):
+    env = dict(os.environ, XTRACE_NO_CACHE='1', PYTHONPATH=ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    results = {}
+    for name in names:
+        print(f"[*] {name} ...", file=sys.stderr, flush=True)
+        # Setiap benchmark di workdir sementara: result store, log dan scope file tidak menyentuh repo
+        with tempfile.TemporaryDirectory(prefix=f"xtrace-bench-{name}-") as workdir:
+            command = [sys.executable, '-m', 'bench.run', '--child', name] + args.passthrough
+            proc = subprocess.run(command, cwd=workdir, env=env, capture_output=True, text=True)
+        if proc.returncode != 0:
+            results[name] = {'error': (proc.stderr.strip().splitlines() or ['failed'])[-1]}
+        else:
+            results[name] = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(f"    {json.dumps(results[name])}", file=sys.stderr)
+
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'revision': _git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {key: value for key, value in vars(args).items()
+                   if key not in ('only', 'output', 'compare', 'child', 'passthrough')},
+        'benchmarks': results,
+    }
+
+def compare(baseline, current):
+    """Cetak perubahan throughput dan p95 dibanding hasil sebelumnya"""
+    print(f"\n{'benchmark':12s} {'throughput/s':>26s} {'p95 ms':>26s}", file=sys.stderr)
+    for name, now in current['benchmarks'].items():
+        before = baseline.get('benchmarks', {}).get(name)
+        if not before or 'error' in before or 'error' in now:
+            continue
+
+        def delta(old, new):
+            if not old or new is None:
+                return f"{new}"
+            return f"{old} -> {new} ({(new - old) / old * 100:+.1f}%)"
+
+        print(f"{name:12s} {delta(before['throughput_per_s'], now['throughput_per_s']):>26s} "
+              f"{delta(before['latency_ms'].get('p95'), now['latency_ms'].get('p95')):>26s}", file=sys.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description='XTrace offline benchmarks')
+    parser.add_argument('--only', help=f"Comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument('-o', '--output', help='Write JSON results to file (default: stdout)')
+    parser.add_argument('--compare', help='Previous JSON results to compare against')
+    parser.add_argument('--iterations', type=int, default=3)
+    parser.add_argument('--concurrency', type=int, help='Override module concurrency')
+    parser.add_argument('--platforms', type=int, default=200, help='Stand-in username platforms')
+    parser.add_argument('--http-latency', type=float, default=0.02, help='Per-request HTTP latency (s)')
+    parser.add_argument('--body-size', type=int, default=16384, help='Body size of "found" profiles')
+    parser.add_argument('--labels', type=int, default=2000, help='Subdomain wordlist size')
+    parser.add_argument('--dns-latency', type=float, default=0.005, help='Per-query DNS latency (s)')
+    parser.add_argument('--open-ports', type=int, default=10)
+    parser.add_argument('--closed-ports', type=int, default=40)
+    parser.add_argument('--child', choices=BENCHMARKS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child, args)))
+        return
+
+    names = [name.strip() for name in args.only.split(',')] if args.only else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark: {', '.join(unknown)}")
+
+    # Child memakai parameter yang sama
+    args.passthrough = []
+    for key, value in vars(args).items():
+        if key not in ('only', 'output', 'compare', 'child', 'passthrough') and value is not None:
+            args.passthrough += [f"--{key.replace('_', '-')}", str(value)]
+    report = run_all(args, names)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(json.load(f), report)
+
+
+if __name__ == '__main__':
+    main()
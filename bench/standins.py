@@ -0,0 +1,204 @@
+"""Server lokal pengganti internet untuk benchmark: HTTP, DNS (UDP) dan TCP listener"""
+import socket
+import selectors
+import struct
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+class Route:
+    """Respons untuk satu prefix path: latency (detik), status dan ukuran body"""
+
+    def __init__(self, status=200, latency=0.0, size=1024):
+        self.status = status
+        self.latency = latency
+        self.body = b'x' * size
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def _respond(self, with_body):
+        route = self.server.match(self.path)
+        self.server.requests += 1
+        if route.latency:
+            time.sleep(route.latency)
+        self.send_response(route.status)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(route.body)))
+        self.end_headers()
+        if with_body:
+            self.wfile.write(route.body)
+
+    def do_GET(self):
+        self._respond(True)
+
+    def do_HEAD(self):
+        self._respond(False)
+
+
+class HTTPStandIn(ThreadingHTTPServer):
+    """HTTP/1.1 keep-alive server dengan latency/status/ukuran body per prefix path"""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, routes=None, default=None):
+        super().__init__(('127.0.0.1', 0), _Handler)
+        # Prefix terpanjang dicek lebih dulu
+        self.routes = sorted((routes or {}).items(), key=lambda item: -len(item[0]))
+        self.default = default or Route(status=404, size=0)
+        self.requests = 0
+        self._thread = threading.Thread(target=self.serve_forever, name='bench-http', daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def handle_error(self, request, client_address):
+        # Client yang membatalkan transfer di tengah body (probe streaming) bukan error
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+    def match(self, path):
+        for prefix, route in self.routes:
+            if path.startswith(prefix):
+                return route
+        return self.default
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def _parse_question(data):
+    """Return (qname, offset akhir question) dari paket query DNS"""
+    labels = []
+    offset = 12
+    while data[offset]:
+        length = data[offset]
+        labels.append(data[offset + 1:offset + 1 + length].decode('ascii', 'ignore').lower())
+        offset += length + 1
+    return '.'.join(labels), offset + 5
+
+class DNSStandIn:
+    """Responder DNS UDP minimal: record A dari zone dict, NXDOMAIN untuk yang lain.
+
+    Paket dibangun langsung (tanpa dnspython) supaya biaya responder sendiri
+    kecil dan tidak ikut terukur. ``latency`` menunda setiap jawaban tanpa
+    memblokir query lain.
+    """
+
+    def __init__(self, zone=None, wildcard=None, latency=0.0):
+        self.zone = {name.lower(): ip for name, ip in (zone or {}).items()}
+        self.wildcard = wildcard
+        self.latency = latency
+        self.queries = 0
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(('127.0.0.1', 0))
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, name='bench-dns', daemon=True)
+
+    @property
+    def nameserver(self):
+        return f"127.0.0.1:{self.sock.getsockname()[1]}"
+
+    def _answer(self, data):
+        name, end = _parse_question(data)
+        qtype = struct.unpack('>H', data[end - 4:end - 2])[0]
+        ip = self.zone.get(name) or self.wildcard
+        # QR=1, RD dari query, RA=1
+        flags = 0x8180 | (struct.unpack('>H', data[2:4])[0] & 0x0100)
+        if ip is None:
+            return data[:2] + struct.pack('>HHHHH', flags | 3, 1, 0, 0, 0) + data[12:end]
+        if qtype != 1:
+            return data[:2] + struct.pack('>HHHHH', flags, 1, 0, 0, 0) + data[12:end]
+        record = struct.pack('>HHHIH', 0xC00C, 1, 1, 60, 4) + socket.inet_aton(ip)
+        return data[:2] + struct.pack('>HHHHH', flags, 1, 1, 0, 0) + data[12:end] + record
+
+    def _serve(self):
+        while self._running:
+            try:
+                data, addr = self.sock.recvfrom(4096)
+            except OSError:
+                return
+            self.queries += 1
+            try:
+                reply = self._answer(data)
+            except (IndexError, struct.error):
+                continue
+            if self.latency:
+                threading.Timer(self.latency, self._send, (reply, addr)).start()
+            else:
+                self._send(reply, addr)
+
+    def _send(self, reply, addr):
+        try:
+            self.sock.sendto(reply, addr)
+        except OSError:
+            pass
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        self.sock.close()
+
+
+class TCPListeners:
+    """Sekumpulan port TCP terbuka di 127.0.0.1 plus daftar port yang pasti tertutup"""
+
+    def __init__(self, open_count=10, closed_count=40):
+        self.selector = selectors.DefaultSelector()
+        self.sockets = []
+        for _ in range(open_count):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.bind(('127.0.0.1', 0))
+            sock.listen(128)
+            sock.setblocking(False)
+            self.selector.register(sock, selectors.EVENT_READ)
+            self.sockets.append(sock)
+        self.open_ports = sorted(sock.getsockname()[1] for sock in self.sockets)
+        self.closed_ports = self._free_ports(closed_count)
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, name='bench-tcp', daemon=True)
+
+    def _free_ports(self, count):
+        # Bind lalu tutup: port tersebut kemudian menolak koneksi (RST)
+        ports = []
+        for _ in range(count):
+            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+                sock.bind(('127.0.0.1', 0))
+                ports.append(sock.getsockname()[1])
+        return sorted(set(ports) - set(self.open_ports))
+
+    def _serve(self):
+        while self._running:
+            for key, _ in self.selector.select(timeout=0.2):
+                try:
+                    conn, _ = key.fileobj.accept()
+                    conn.close()
+                except OSError:
+                    pass
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        self._thread.join(1)
+        for sock in self.sockets:
+            self.selector.unregister(sock)
+            sock.close()
+        self.selector.close()
@@ -0,0 +1,125 @@
+import os
+import json
+import sqlite3
+import threading
+import time
+
+DEFAULT_PATH = os.path.join('data', 'cache.db')
+
+# TTL (detik) per sumber data
+DEFAULT_TTLS = {
+    'http': 3600,
+    'dns': 3600,
+    'dns_negative': 300,
+    'profile': 3600,
+}
+
+MAX_ENTRIES = 50000
+
+class ResponseCache:
+    """Cache persistent berbasis SQLite dengan TTL per sumber dan eviksi LRU"""
+
+    def __init__(self, path=DEFAULT_PATH, ttls=None, max_entries=MAX_ENTRIES, enabled=True):
+        self.path = path
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.max_entries = max_entries
+        self.enabled = enabled and not os.environ.get('XTRACE_NO_CACHE')
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _connect(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS cache ('
+                ' source TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,'
+                ' expires REAL NOT NULL, accessed REAL NOT NULL,'
+                ' PRIMARY KEY (source, key))'
+            )
+            self._conn.execute('CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)')
+        return self._conn
+
+    def get(self, source, key):
+        """Ambil nilai dari cache; return (True, value) jika hit, (False, None) jika miss"""
+        if not self.enabled:
+            return False, None
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connect()
+                row = conn.execute(
+                    'SELECT value, expires FROM cache WHERE source = ? AND key = ?', (source, key)
+                ).fetchone()
+                if row is None or row[1] < now:
+                    self.misses += 1
+                    return False, None
+                conn.execute(
+                    'UPDATE cache SET accessed = ? WHERE source = ? AND key = ?', (now, source, key)
+                )
+                self.hits += 1
+            return True, json.loads(row[0])
+        except sqlite3.Error:
+            return False, None
+
+    def set(self, source, key, value, ttl=None):
+        """Simpan nilai (harus JSON-serializable) dengan TTL sumbernya"""
+        if not self.enabled:
+            return
+        if ttl is None:
+            ttl = self.ttls.get(source, 3600)
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    'INSERT OR REPLACE INTO cache (source, key, value, expires, accessed) VALUES (?, ?, ?, ?, ?)',
+                    (source, key, json.dumps(value, ensure_ascii=False), now + ttl, now)
+                )
+                self._writes += 1
+                if self._writes % 500 == 0:
+                    self._evict(conn, now)
+        except (sqlite3.Error, TypeError, ValueError):
+            pass
+
+    def _evict(self, conn, now):
+        conn.execute('DELETE FROM cache WHERE expires < ?', (now,))
+        count = conn.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+        if count > self.max_entries:
+            # Buang entri yang paling lama tidak diakses, sisakan ruang 10%
+            excess = count - int(self.max_entries * 0.9)
+            conn.execute(
+                'DELETE FROM cache WHERE rowid IN (SELECT rowid FROM cache ORDER BY accessed LIMIT ?)',
+                (excess,)
+            )
+
+    def clear(self):
+        """Hapus semua entri cache"""
+        with self._lock:
+            self._connect().execute('DELETE FROM cache')
+
+    def stats(self):
+        """Statistik hit/miss cache"""
+        total = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+cache = ResponseCache()
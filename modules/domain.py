@@ -1,23 +1,125 @@
+import os
+import sys
+import json
 import socket
-import ssl
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from .utils import make_request, save_results, generate_report
+from .utils import make_request, save_results, generate_report, log
+from .resolver import resolve_host, resolve_records, SharedLookups, DNS_AVAILABLE
+from .subdomains import enumerate_subdomains, DEFAULT_CONCURRENCY
+from .fingerprint import fingerprint_https
+from .engine import ProbeEngine
+from .jobs import JobJournal, open_journal
+from .metrics import ScanMetrics
+from .stages import StageGraph, DEFAULT_DEADLINE
 from .colors import Colors
 
-try:
-    import dns.resolver
-    DNS_AVAILABLE = True
-except ImportError:
-    DNS_AVAILABLE = False
+RECORD_TYPES = ['A', 'AAAA', 'MX', 'NS', 'TXT', 'SOA', 'CNAME']
+TECH_HEADERS = ['X-Powered-By', 'X-AspNet-Version', 'X-Framework']
+# Batch mode: total worker untuk semua stage, domain yang dianalisis bersamaan = workers // 4
+BATCH_WORKERS = 32
+RESUME_HINT = "Run the same command with --resume to continue the subdomain enumeration"
 
-def check_domain(domain, session_id):
-    """Enhanced domain OSINT dengan comprehensive checks"""
-    print(f"\n{Colors.BOLD}[*] Analyzing domain: {Colors.CYAN}{domain}{Colors.END}")
-    
-    domain = domain.replace('http://', '').replace('https://', '').replace('www.', '').split('/')[0]
-    print(f"{Colors.GREEN}[+] Cleaned domain: {domain}{Colors.END}")
+def clean_domain(domain):
+    return domain.replace('http://', '').replace('https://', '').replace('www.', '').split('/')[0]
+
+def _record_host(record):
+    # MX "10 mail.example.com." -> mail.example.com, NS "ns1.example.com." -> ns1.example.com
+    return record.split()[-1].rstrip('.').lower()
+
+def _https_active(fingerprint):
+    # Range request yang valid bisa dijawab 206 atau 416
+    return fingerprint['status'] < 400 or fingerprint['status'] == 416
+
+def build_domain_graph(domain, metrics, deadline=DEFAULT_DEADLINE, executor=None, lookups=None,
+                       wordlist=None, nameservers=None, concurrency=None, subdomains=True, found=None,
+                       journal=None, cancel=None):
+    """Susun StageGraph analisis satu domain.
+
+    ``executor`` dan ``lookups`` (SharedLookups) dipakai bersama oleh batch
+    mode; tanpa keduanya graph memakai thread pool sendiri dan resolver biasa.
+    Subdomain yang ditemukan di-append ke ``found`` selama enumerasi berjalan;
+    ``journal`` (JobJournal) membuat enumerasi bisa dilanjutkan dan ``cancel``
+    (threading.Event) menghentikannya, mis. setelah stage kena deadline.
+    """
+    host_lookup = lookups.host if lookups else resolve_host
+    records_lookup = lookups.records if lookups else resolve_records
+    graph = StageGraph(deadline=deadline, executor=executor)
+
+    def ip_resolution(done):
+        with metrics.stage('ip_resolution'):
+            return host_lookup(domain)
+
+    def reverse_dns(done):
+        with metrics.stage('reverse_dns'):
+            return socket.gethostbyaddr(done['ip_resolution'])
+
+    def dns_lookup(record_type):
+        def lookup(done):
+            with metrics.request(f"dns_{record_type.lower()}") as span:
+                try:
+                    return records_lookup(domain, record_type)
+                except Exception:
+                    span.set('no_answer')
+                    return None
+        return lookup
+
+    def dns_hosts(done):
+        # Host MX/NS sering dipakai banyak domain sekaligus, jadi lookup-nya paling untung dari cache
+        addresses = {}
+        for record_type in ('MX', 'NS'):
+            for record in done.get(f"dns_{record_type.lower()}") or []:
+                host = _record_host(record)
+                if not host or host in addresses:
+                    continue
+                with metrics.request('dns_host') as span:
+                    try:
+                        addresses[host] = host_lookup(host)
+                    except OSError:
+                        span.set('no_answer')
+                        addresses[host] = None
+        return addresses
+
+    def http_probe(done):
+        with metrics.request('http_probe') as span:
+            response = make_request(f'http://{domain}', timeout=10)
+            span.set('active' if response else 'inactive')
+        return response
+
+    def https_fingerprint(done):
+        # Sertifikat, TLS dan header HTTPS dari satu koneksi (bukan GET penuh + koneksi TLS terpisah)
+        with metrics.request('https_fingerprint') as span:
+            fingerprint = fingerprint_https(domain, timeout=10)
+            span.set('active' if _https_active(fingerprint) else 'inactive')
+        return fingerprint
+
+    def subdomain_discovery(done):
+        with metrics.stage('subdomain_discovery') as stage:
+            enumeration = enumerate_subdomains(domain, wordlist=wordlist, nameservers=nameservers,
+                                               concurrency=concurrency or DEFAULT_CONCURRENCY,
+                                               on_found=found.append if found is not None else None,
+                                               metrics=metrics, journal=journal, cancel=cancel)
+            stage.set(checked=enumeration['checked'], found=len(enumeration['found']))
+        return enumeration
     
+    # Semua stage butuh domain yang resolvable
+    graph.add('ip_resolution', ip_resolution)
+    graph.add('reverse_dns', reverse_dns, after=['ip_resolution'])
+    if DNS_AVAILABLE:
+        for record_type in RECORD_TYPES:
+            graph.add(f"dns_{record_type.lower()}", dns_lookup(record_type), after=['ip_resolution'])
+        graph.add('dns_hosts', dns_hosts, after=['dns_mx', 'dns_ns'])
+    graph.add('http_probe', http_probe, after=['ip_resolution'])
+    graph.add('https_fingerprint', https_fingerprint, after=['ip_resolution'])
+    if subdomains:
+        graph.add('subdomain_discovery', subdomain_discovery, after=['ip_resolution'])
+    return graph
+
+def collect_domain_results(domain, graph, found=()):
+    """Bentuk dict hasil dari graph yang sudah dijalankan (tanpa output ke terminal)"""
+    done = graph.results
     results = {
         'target': domain,
         'domain': domain,
@@ -28,120 +130,182 @@ def check_domain(domain, session_id):
         'security': {},
         'whois': {}
     }
+    results['stages'] = graph.status()
+    if 'ip_resolution' not in done:
+        error = graph.stages['ip_resolution'].error
+        results['ip_info']['error'] = str(error) if error else 'deadline reached'
+        return results
     
-    print(f"\n{Colors.BOLD}[*] IP Resolution...{Colors.END}")
+    results['ip_info']['ipv4'] = done['ip_resolution']
+    if 'reverse_dns' in done:
+        results['ip_info']['reverse_dns'] = done['reverse_dns'][0]
+        results['ip_info']['aliases'] = done['reverse_dns'][1]
+    
+    for record_type in RECORD_TYPES:
+        answers = done.get(f"dns_{record_type.lower()}")
+        if answers is not None:
+            results['dns_records'][record_type] = list(answers)
+    if done.get('dns_hosts'):
+        results['dns_hosts'] = done['dns_hosts']
+    
+    fingerprint = done.get('https_fingerprint')
+    responses = {
+        'http': dict(done['http_probe'].headers) if done.get('http_probe') else None,
+        'https': fingerprint['headers'] if fingerprint and _https_active(fingerprint) else None,
+    }
+    for protocol, headers in responses.items():
+        if headers is not None:
+            if 'Server' in headers:
+                results['web_server']['server'] = headers['Server']
+            technologies = {tech: headers[tech] for tech in TECH_HEADERS if tech in headers}
+            if technologies:
+                results['web_server'].setdefault('technologies', {}).update(technologies)
+            results['web_server'][protocol] = 'active'
+    
+    if fingerprint:
+        if fingerprint['title']:
+            results['web_server']['title'] = fingerprint['title']
+        cert = fingerprint['certificate'] or {}
+        results['security']['ssl'] = {
+            'issuer': cert.get('issuer'),
+            'subject': cert.get('subject'),
+            'version': cert.get('version'),
+            'notBefore': cert.get('notBefore'),
+            'notAfter': cert.get('notAfter'),
+            'subjectAltName': cert.get('subjectAltName'),
+            'verified': fingerprint['verified'],
+            'verify_error': fingerprint['verify_error'],
+            'protocol': fingerprint['protocol'],
+            'cipher': fingerprint['cipher'],
+            'cipher_bits': fingerprint['cipher_bits'],
+            'fingerprint_sha256': fingerprint['fingerprint_sha256'],
+            'chain': fingerprint['chain'],
+            'session_reused': fingerprint['session_reused'],
+        }
+    
+    found = list(found)
+    results['subdomains'] = [entry['subdomain'] for entry in found]
+    results['subdomain_ips'] = {entry['subdomain']: entry['ips'] for entry in found}
+    enumeration = done.get('subdomain_discovery')
+    if enumeration is not None:
+        results['subdomains_checked'] = enumeration['checked']
+        if enumeration['wildcard_ips']:
+            results['wildcard_dns'] = enumeration['wildcard_ips']
+    return results
+
+def check_domain(domain, session_id, wordlist=None, nameservers=None, concurrency=None, deadline=DEFAULT_DEADLINE,
+                 resume=False):
+    """Enhanced domain OSINT dengan comprehensive checks.
+
+    Enumerasi subdomain yang terhenti (Ctrl-C atau deadline) disimpan ke job
+    journal dan hanya dilanjutkan jika ``resume`` True.
+    """
+    metrics = ScanMetrics('domain')
+    print(f"\n{Colors.BOLD}[*] Analyzing domain: {Colors.CYAN}{domain}{Colors.END}")
+    
+    domain = clean_domain(domain)
+    print(f"{Colors.GREEN}[+] Cleaned domain: {domain}{Colors.END}")
+    
+    found = []
+    # Query subdomain dicatat di memori; journal baru ditulis ke disk jika enumerasi terhenti
+    journal = JobJournal('subdomains', {'domain': domain, 'nameservers': nameservers,
+                                        'wordlist': os.path.abspath(wordlist) if wordlist else None},
+                         restart=not resume, lazy=True)
+    if journal.resumed:
+        print(f"{Colors.CYAN}[i] Resuming subdomain enumeration: {len(journal)} names already checked{Colors.END}")
+    graph = build_domain_graph(domain, metrics, deadline=deadline, wordlist=wordlist, nameservers=nameservers,
+                               concurrency=concurrency, found=found, journal=journal)
+    print(f"{Colors.CYAN}[i] Running {len(graph.stages)} stages concurrently (deadline {deadline:.0f}s)...{Colors.END}")
     try:
-        ip = socket.gethostbyname(domain)
-        results['ip_info']['ipv4'] = ip
-        print(f"  {Colors.GREEN}[✓] IPv4: {ip}{Colors.END}")
-        
-        try:
-            hostname = socket.gethostbyaddr(ip)
-            results['ip_info']['reverse_dns'] = hostname[0]
-            results['ip_info']['aliases'] = hostname[1]
-            print(f"  {Colors.GREEN}[✓] Reverse DNS: {hostname[0]}{Colors.END}")
-        except:
-            print(f"  {Colors.YELLOW}[!] No reverse DNS{Colors.END}")
-        
-        print(f"  {Colors.CYAN}→ Check location: https://ipinfo.io/{ip}{Colors.END}")
-        
-    except Exception as e:
-        print(f"  {Colors.RED}[×] Cannot resolve domain: {e}{Colors.END}")
+        graph.run()
+    except KeyboardInterrupt:
+        journal.interrupted(hint=RESUME_HINT)
+        # Hasil stage yang sudah selesai tetap disimpan
+        results = collect_domain_results(domain, graph, found)
+        results['partial'] = True
+        save_results('domain', results, session_id, metrics=metrics)
+        raise
+    stages = graph.stages
+    results = collect_domain_results(domain, graph, found)
+    if stages['subdomain_discovery'].status == 'timeout':
+        # Enumerasi yang kena deadline dihentikan dan bisa dilanjutkan dengan --resume
+        journal.cancel()
+        journal.persist()
+        journal.close()
+    else:
+        journal.finish()
+    
+    print(f"\n{Colors.BOLD}[*] IP Resolution...{Colors.END}")
+    if 'ipv4' not in results['ip_info']:
+        print(f"  {Colors.RED}[×] Cannot resolve domain: {results['ip_info']['error']}{Colors.END}")
         return results
+    ip = results['ip_info']['ipv4']
+    print(f"  {Colors.GREEN}[✓] IPv4: {ip}{Colors.END}")
+    
+    if 'reverse_dns' in results['ip_info']:
+        print(f"  {Colors.GREEN}[✓] Reverse DNS: {results['ip_info']['reverse_dns']}{Colors.END}")
+    else:
+        print(f"  {Colors.YELLOW}[!] No reverse DNS{Colors.END}")
+    
+    print(f"  {Colors.CYAN}→ Check location: https://ipinfo.io/{ip}{Colors.END}")
     
     if DNS_AVAILABLE:
         print(f"\n{Colors.BOLD}[*] DNS Records Analysis...{Colors.END}")
-        record_types = ['A', 'AAAA', 'MX', 'NS', 'TXT', 'SOA', 'CNAME']
-        
-        for record_type in record_types:
-            try:
-                answers = dns.resolver.resolve(domain, record_type)
-                results['dns_records'][record_type] = []
-                print(f"  {Colors.GREEN}[✓] {record_type} Records:{Colors.END}")
-                for rdata in answers:
-                    record_data = str(rdata)
-                    results['dns_records'][record_type].append(record_data)
-                    print(f"      {record_data}")
-            except:
-                pass
+        for record_type, answers in results['dns_records'].items():
+            print(f"  {Colors.GREEN}[✓] {record_type} Records:{Colors.END}")
+            for record_data in answers:
+                print(f"      {record_data}")
+        if results.get('dns_hosts'):
+            print(f"  {Colors.GREEN}[✓] MX/NS Host Addresses:{Colors.END}")
+            for host, address in results['dns_hosts'].items():
+                print(f"      {host}: {address or 'unresolved'}")
     else:
         print(f"\n{Colors.YELLOW}[!] dnspython not installed, skipping DNS record analysis.{Colors.END}")
-
+    
     print(f"\n{Colors.BOLD}[*] Web Server Detection...{Colors.END}")
     for protocol in ['http', 'https']:
-        url = f'{protocol}://{domain}'
-        try:
-            response = make_request(url, timeout=10)
-            if response:
-                print(f"  {Colors.GREEN}[✓] {protocol.upper()}: Active{Colors.END}")
-                headers = dict(response.headers)
-                if 'Server' in headers:
-                    results['web_server']['server'] = headers['Server']
-                    print(f"      Server: {headers['Server']}")
-                
-                tech_headers = ['X-Powered-By', 'X-AspNet-Version', 'X-Framework']
-                for tech in tech_headers:
-                    if tech in headers:
-                        print(f"      {tech}: {headers[tech]}")
-                
-                results['web_server'][protocol] = 'active'
-        except:
-            results['web_server'][protocol] = 'inactive'
-    
-    if results['web_server'].get('https') == 'active':
+        if results['web_server'].get(protocol) == 'active':
+            print(f"  {Colors.GREEN}[✓] {protocol.upper()}: Active{Colors.END}")
+    if 'title' in results['web_server']:
+        print(f"      Title: {results['web_server']['title']}")
+    if 'server' in results['web_server']:
+        print(f"      Server: {results['web_server']['server']}")
+    for tech, value in results['web_server'].get('technologies', {}).items():
+        print(f"      {tech}: {value}")
+    
+    ssl_info = results['security'].get('ssl')
+    if ssl_info:
         print(f"\n{Colors.BOLD}[*] SSL/TLS Certificate...{Colors.END}")
-        try:
-            context = ssl.create_default_context()
-            with socket.create_connection((domain, 443), timeout=5) as sock:
-                with context.wrap_socket(sock, server_hostname=domain) as ssock:
-                    cert = ssock.getpeercert()
-                    results['security']['ssl'] = {
-                        'issuer': dict(x[0] for x in cert['issuer']),
-                        'subject': dict(x[0] for x in cert['subject']),
-                        'version': cert['version'],
-                        'notBefore': cert['notBefore'],
-                        'notAfter': cert['notAfter']
-                    }
-                    print(f"  {Colors.GREEN}[✓] SSL Certificate Valid{Colors.END}")
-                    print(f"      Issued to: {cert['subject']}")
-                    print(f"      Valid until: {cert['notAfter']}")
-        except:
-            print(f"  {Colors.YELLOW}[!] SSL Certificate check failed{Colors.END}")
+        if ssl_info['verified']:
+            print(f"  {Colors.GREEN}[✓] SSL Certificate Valid{Colors.END}")
+        else:
+            print(f"  {Colors.YELLOW}[!] SSL Certificate not trusted: {ssl_info['verify_error']}{Colors.END}")
+        print(f"      Issued to: {ssl_info['subject']}")
+        print(f"      Valid until: {ssl_info['notAfter']}")
+        print(f"      Protocol: {ssl_info['protocol']} ({ssl_info['cipher']}, {ssl_info['cipher_bits']} bits)")
+        if ssl_info['chain']:
+            print(f"      Chain: {len(ssl_info['chain'])} certificates")
     
     print(f"\n{Colors.BOLD}[*] Subdomain Discovery...{Colors.END}")
-    common_subdomains = [
-        'www', 'mail', 'webmail', 'ftp', 'smtp', 'pop', 'imap',
-        'admin', 'administrator', 'api', 'app', 'blog', 'dev', 
-        'development', 'test', 'testing', 'staging', 'stage',
-        'cdn', 'static', 'assets', 'img', 'images', 'video',
-        'vpn', 'remote', 'portal', 'dashboard', 'panel',
-        'shop', 'store', 'payment', 'pay', 'checkout',
-        'support', 'help', 'docs', 'wiki', 'forum',
-        'm', 'mobile', 'amp', 'beta', 'demo'
-    ]
-    
-    found_subs = []
-    
-    def check_subdomain(sub):
-        subdomain = f"{sub}.{domain}"
-        try:
-            socket.gethostbyname(subdomain)
-            found_subs.append(subdomain)
-            print(f"  {Colors.GREEN}[✓] {subdomain}{Colors.END}")
-        except:
-            pass
+    for subdomain in results['subdomains']:
+        print(f"  {Colors.GREEN}[✓] {subdomain} ({', '.join(results['subdomain_ips'][subdomain])}){Colors.END}")
+    discovery = stages['subdomain_discovery']
+    if 'subdomains_checked' in results:
+        if 'wildcard_dns' in results:
+            print(f"  {Colors.YELLOW}[!] Wildcard DNS detected ({', '.join(results['wildcard_dns'])}), filtered{Colors.END}")
+        print(f"\n{Colors.GREEN}[✓] Found {len(results['subdomains'])} subdomains "
+              f"({results['subdomains_checked']} checked){Colors.END}")
+    elif discovery.status == 'timeout':
+        print(f"  {Colors.YELLOW}[!] Deadline reached, partial results: {len(results['subdomains'])} subdomains{Colors.END}")
+        print(f"  {Colors.CYAN}[i] {RESUME_HINT}{Colors.END}")
+    elif isinstance(discovery.error, OSError):
+        print(f"  {Colors.RED}[×] Cannot read wordlist: {discovery.error}{Colors.END}")
+    elif discovery.error is not None:
+        print(f"  {Colors.RED}[×] Subdomain discovery failed: {discovery.error}{Colors.END}")
     
-    threads = []
-    for sub in common_subdomains:
-        thread = threading.Thread(target=check_subdomain, args=(sub,))
-        thread.start()
-        threads.append(thread)
-    
-    for thread in threads:
-        thread.join()
-    
-    results['subdomains'] = found_subs
-    print(f"\n{Colors.GREEN}[✓] Found {len(found_subs)} subdomains{Colors.END}")
+    timed_out = [name for name, stage in stages.items() if stage.status == 'timeout']
+    if timed_out:
+        print(f"\n{Colors.YELLOW}[!] Deadline of {deadline:.0f}s reached, unfinished: {', '.join(timed_out)}{Colors.END}")
     
     print(f"\n{Colors.BOLD}[*] External Resources:{Colors.END}")
     resources = [
@@ -156,7 +320,117 @@ def check_domain(domain, session_id):
     for resource in resources:
         print(f"  {Colors.CYAN}→ {resource}{Colors.END}")
     
-    save_results('domain', results, session_id)
+    save_results('domain', results, session_id, metrics=metrics)
     generate_report('domain', results, session_id)
     
     return results
+
+def iter_domains(source):
+    """Baca domain satu per baris dari file atau stdin ('-')"""
+    f = sys.stdin if source == '-' else open(source, encoding='utf-8')
+    try:
+        for line in f:
+            domain = clean_domain(line.strip())
+            if domain and not domain.startswith('#'):
+                yield domain
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+def check_domains_batch(source, session_id, output=None, workers=None, wordlist=None, nameservers=None,
+                        deadline=DEFAULT_DEADLINE, restart=False):
+    """Batch domain analysis: semua stage dari semua domain berbagi satu worker pool dan satu DNS memo.
+
+    Jumlah thread dibatasi ``workers`` berapa pun jumlah domain. Subdomain
+    enumeration hanya dijalankan jika wordlist diberikan. Satu record JSONL
+    ditulis per domain begitu analisisnya selesai dan dicatat di job journal,
+    jadi command yang sama hanya menganalisis domain sisanya.
+    """
+    journal = open_journal('domain_batch', source, restart=restart, nameservers=nameservers,
+                           wordlist=os.path.abspath(wordlist) if wordlist else None)
+    if output is None and journal is not None:
+        output = journal.meta.get('output')
+    if output is None:
+        output = f"result/domain_batch_{session_id}.jsonl"
+    if journal is not None and 'output' not in journal.meta:
+        journal.set_meta(output=output)
+    out = sys.stdout if output == '-' else open(output, 'a', encoding='utf-8')
+    status = sys.stderr if out is sys.stdout else sys.stdout
+    workers = workers or BATCH_WORKERS
+    drivers = max(1, workers // 4)
+    # Thread enumerasi subdomain semua domain yang berjalan bersamaan tetap dalam budget workers
+    enumeration_workers = max(1, workers // drivers)
+    
+    print(f"\n{Colors.BOLD}[*] Batch domain analysis from: {Colors.CYAN}{source}{Colors.END}", file=status)
+    start_time = time.time()
+    metrics = ScanMetrics('domain_batch')
+    lookups = SharedLookups()
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='xtrace-domain')
+    counts = {'resolved': 0, 'unresolved': 0}
+    if journal is not None and journal.resumed:
+        for outcome in journal.done.values():
+            counts[outcome] += 1
+        print(f"{Colors.CYAN}[i] Resuming job: {len(journal)} domains already analyzed{Colors.END}", file=status)
+
+    def analyze(domain):
+        found = []
+        cancel = threading.Event()
+        started = time.perf_counter()
+        graph = build_domain_graph(domain, metrics, deadline=deadline, executor=executor, lookups=lookups,
+                                   wordlist=wordlist, nameservers=nameservers, concurrency=enumeration_workers,
+                                   subdomains=wordlist is not None, found=found, cancel=cancel)
+        try:
+            graph.run()
+        finally:
+            # Enumerasi yang kena deadline tidak bisa dihentikan lewat future.cancel(), jadi diberi sinyal
+            cancel.set()
+        results = collect_domain_results(domain, graph, found)
+        results['scan_duration'] = f"{time.perf_counter() - started:.2f}s"
+        return results
+
+    def on_result(domain, results, error):
+        if error is not None:
+            results = {'target': domain, 'domain': domain, 'error': str(error)}
+        resolved = 'ipv4' in results.get('ip_info', {})
+        counts['resolved' if resolved else 'unresolved'] += 1
+        record = {'session_id': session_id, 'timestamp': datetime.now().isoformat()}
+        record.update(results)
+        out.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+        out.flush()
+        if journal is not None and error is None:
+            journal.record((domain,), 'resolved' if resolved else 'unresolved')
+        if resolved:
+            web = ', '.join(protocol for protocol in ('http', 'https') if results['web_server'].get(protocol))
+            print(f"  {Colors.GREEN}[✓] {domain}{Colors.END} {results['ip_info']['ipv4']} "
+                  f"{web or 'no web'} ({results['scan_duration']})", file=status)
+        else:
+            print(f"  {Colors.RED}[×] {domain}{Colors.END}", file=status)
+    
+    # Driver per domain hanya menunggu graph-nya; pekerjaan jaringan ada di executor bersama
+    jobs = ((domain, (domain,)) for domain in iter_domains(source) if journal is None or (domain,) not in journal)
+    try:
+        ProbeEngine(limit=drivers).run(jobs, analyze, on_result,
+                                                    cancel=journal.cancelled if journal else None)
+    except KeyboardInterrupt:
+        if journal is not None:
+            journal.interrupted(status)
+        raise
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        if out is not sys.stdout:
+            out.close()
+    if journal is not None:
+        journal.finish()
+    
+    scan_duration = time.time() - start_time
+    total = sum(counts.values())
+    print(f"\n{Colors.GREEN}[✓] Resolved: {counts['resolved']}{Colors.END}", file=status)
+    print(f"{Colors.RED}[×] Unresolved: {counts['unresolved']}{Colors.END}", file=status)
+    print(f"{Colors.CYAN}[i] {total} domains in {scan_duration:.2f} seconds, "
+          f"shared DNS lookups: {lookups.stats()['hits']} reused{Colors.END}", file=status)
+    if out is not sys.stdout:
+        print(f"{Colors.GREEN}[✓] Results streamed to: {output}{Colors.END}", file=status)
+    log(f"Batch domain scan: {total} domains, {counts['resolved']} resolved, output {output}",
+        latency_ms=round(scan_duration * 1000, 1), dns=lookups.stats(), timings=metrics.summary()['requests'])
+    
+    return counts
@@ -1,21 +1,53 @@
+import os
 import re
+import sys
+import json
+import time
+import shutil
 import hashlib
-import socket
+import tempfile
 from datetime import datetime
-from .utils import save_results, generate_report
+from .utils import save_results, generate_report, log
+from .resolver import resolve_host, resolve_records, DNSLookupError, DNS_AVAILABLE
+from .engine import ProbeEngine
+from .jobs import open_journal
+from .metrics import ScanMetrics
 from .colors import Colors
 
-try:
-    import dns.resolver
-    DNS_AVAILABLE = True
-except ImportError:
-    DNS_AVAILABLE = False
+EMAIL_RE = re.compile(r'^[\w.-]+@[\w.-]+\.\w+$')
+
+PROVIDERS = {
+    'gmail.com': {'name': 'Google Gmail', 'type': 'Free', 'country': 'USA'},
+    'yahoo.com': {'name': 'Yahoo Mail', 'type': 'Free', 'country': 'USA'},
+    'outlook.com': {'name': 'Microsoft Outlook', 'type': 'Free', 'country': 'USA'},
+    'hotmail.com': {'name': 'Microsoft Hotmail', 'type': 'Free', 'country': 'USA'},
+    'protonmail.com': {'name': 'ProtonMail', 'type': 'Encrypted', 'country': 'Switzerland'},
+    'proton.me': {'name': 'Proton Mail', 'type': 'Encrypted', 'country': 'Switzerland'},
+    'icloud.com': {'name': 'Apple iCloud', 'type': 'Free', 'country': 'USA'},
+    'aol.com': {'name': 'AOL Mail', 'type': 'Free', 'country': 'USA'},
+    'mail.ru': {'name': 'Mail.ru', 'type': 'Free', 'country': 'Russia'},
+    'yandex.com': {'name': 'Yandex Mail', 'type': 'Free', 'country': 'Russia'},
+}
+
+def normalize_email(email):
+    """Bentuk kanonik alamat email yang dipakai untuk hashing"""
+    return email.lower().strip()
+
+def email_hashes(email):
+    """md5/sha1/sha256 dari alamat yang sudah dinormalisasi"""
+    data = normalize_email(email).encode()
+    return {
+        'md5': hashlib.md5(data).hexdigest(),
+        'sha1': hashlib.sha1(data).hexdigest(),
+        'sha256': hashlib.sha256(data).hexdigest()
+    }
 
 def check_email(email, session_id):
     """Enhanced email OSINT dengan validasi lengkap"""
+    metrics = ScanMetrics('email')
     print(f"\n{Colors.BOLD}[*] Analyzing email: {Colors.CYAN}{email}{Colors.END}")
     
-    if not re.match(r'^[\w.-]+@[\w.-]+\.\w+$', email):
+    if not EMAIL_RE.match(email):
         print(f"{Colors.RED}[!] Invalid email format{Colors.END}")
         return None
     
@@ -37,33 +69,15 @@ def check_email(email, session_id):
     }
     
     print(f"\n{Colors.BOLD}[*] Generating Hashes...{Colors.END}")
-    email_lower = email.lower().strip()
-    results['hashes'] = {
-        'md5': hashlib.md5(email_lower.encode()).hexdigest(),
-        'sha1': hashlib.sha1(email_lower.encode()).hexdigest(),
-        'sha256': hashlib.sha256(email_lower.encode()).hexdigest()
-    }
+    results['hashes'] = email_hashes(email)
     
     print(f"  {Colors.CYAN}MD5:    {results['hashes']['md5']}{Colors.END}")
     print(f"  {Colors.CYAN}SHA1:   {results['hashes']['sha1']}{Colors.END}")
     print(f"  {Colors.CYAN}SHA256: {results['hashes']['sha256'][:50]}...{Colors.END}")
     
     print(f"\n{Colors.BOLD}[*] Provider Detection...{Colors.END}")
-    providers = {
-        'gmail.com': {'name': 'Google Gmail', 'type': 'Free', 'country': 'USA'},
-        'yahoo.com': {'name': 'Yahoo Mail', 'type': 'Free', 'country': 'USA'},
-        'outlook.com': {'name': 'Microsoft Outlook', 'type': 'Free', 'country': 'USA'},
-        'hotmail.com': {'name': 'Microsoft Hotmail', 'type': 'Free', 'country': 'USA'},
-        'protonmail.com': {'name': 'ProtonMail', 'type': 'Encrypted', 'country': 'Switzerland'},
-        'proton.me': {'name': 'Proton Mail', 'type': 'Encrypted', 'country': 'Switzerland'},
-        'icloud.com': {'name': 'Apple iCloud', 'type': 'Free', 'country': 'USA'},
-        'aol.com': {'name': 'AOL Mail', 'type': 'Free', 'country': 'USA'},
-        'mail.ru': {'name': 'Mail.ru', 'type': 'Free', 'country': 'Russia'},
-        'yandex.com': {'name': 'Yandex Mail', 'type': 'Free', 'country': 'Russia'},
-    }
-    
-    if domain in providers:
-        results['provider'] = providers[domain]
+    if domain in PROVIDERS:
+        results['provider'] = PROVIDERS[domain]
         print(f"  {Colors.GREEN}[+] Provider: {results['provider']['name']}{Colors.END}")
         print(f"  {Colors.GREEN}[+] Type: {results['provider']['type']}{Colors.END}")
         print(f"  {Colors.GREEN}[+] Country: {results['provider']['country']}{Colors.END}")
@@ -73,18 +87,20 @@ def check_email(email, session_id):
     
     print(f"\n{Colors.BOLD}[*] Domain Validation...{Colors.END}")
     try:
-        ip = socket.gethostbyname(domain)
+        with metrics.request('domain_a'):
+            ip = resolve_host(domain)
         results['validation']['domain_ip'] = ip
         results['validation']['domain_valid'] = True
         print(f"  {Colors.GREEN}[✓] Domain resolves to: {ip}{Colors.END}")
         
         if DNS_AVAILABLE:
             try:
-                mx_records = dns.resolver.resolve(domain, 'MX')
+                with metrics.request('domain_mx'):
+                    mx_records = resolve_records(domain, 'MX')
                 results['validation']['mx_records'] = []
                 print(f"  {Colors.GREEN}[✓] MX Records found:{Colors.END}")
                 for mx in mx_records:
-                    mx_str = str(mx).split()
+                    mx_str = mx.split()
                     results['validation']['mx_records'].append(mx_str)
                     print(f"      Priority {mx_str[0]}: {mx_str[1]}")
             except:
@@ -134,7 +150,169 @@ def check_email(email, session_id):
     
     results['username_variations'] = list(set(variations))
     
-    save_results('email', results, session_id)
+    save_results('email', results, session_id, metrics=metrics)
     generate_report('email', results, session_id)
     
     return results
+
+def iter_emails(path):
+    """Baca alamat email satu per baris, lewati baris kosong dan komentar"""
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for line in f:
+            email = line.strip()
+            if email and not email.startswith('#'):
+                yield email
+
+def lookup_email_domain(domain):
+    """Resolve A dan MX satu domain lewat resolver ber-cache (termasuk negative cache)"""
+    start = time.perf_counter()
+    info = {'domain': domain, 'domain_valid': False, 'domain_ip': None, 'mx_records': []}
+    try:
+        info['domain_ip'] = resolve_host(domain)
+        info['domain_valid'] = True
+    except OSError as e:
+        info['error'] = str(e)
+    if DNS_AVAILABLE:
+        try:
+            info['mx_records'] = [mx.split() for mx in resolve_records(domain, 'MX')]
+        except DNSLookupError:
+            pass
+    info['lookup_ms'] = round((time.perf_counter() - start) * 1000, 2)
+    return info
+
+def check_emails_batch(source, session_id, output=None, concurrency=50, restart=False):
+    """Bulk email validation: A/MX di-resolve sekali per domain lalu dibagikan ke setiap alamat.
+
+    Pass pertama mengumpulkan domain unik dan me-resolve semuanya secara
+    paralel; pass kedua men-stream record per alamat ke JSONL. Memori hanya
+    sebanding jumlah domain, bukan jumlah alamat. Statistik per domain
+    ditulis ke file ``*_domains.jsonl`` terpisah. Hasil lookup domain dicatat
+    di job journal, jadi command yang sama hanya me-resolve domain sisanya.
+    """
+    journal = open_journal('email_batch', source, restart=restart)
+    if output is None and journal is not None:
+        output = journal.meta.get('output')
+    if output is None:
+        output = f"result/email_batch_{session_id}.jsonl"
+    if journal is not None and 'output' not in journal.meta:
+        journal.set_meta(output=output)
+    if output == '-':
+        domains_output = f"result/email_batch_{session_id}_domains.jsonl"
+    else:
+        domains_output = f"{output[:-6] if output.endswith('.jsonl') else output}_domains.jsonl"
+    status = sys.stderr if output == '-' else sys.stdout
+    
+    spool = None
+    if source == '-':
+        # stdin dibaca dua kali, jadi disimpan dulu ke file sementara
+        spool = tempfile.NamedTemporaryFile('w', encoding='utf-8', suffix='.txt', delete=False)
+        shutil.copyfileobj(sys.stdin, spool)
+        spool.close()
+        path = spool.name
+    else:
+        path = source
+    
+    print(f"\n{Colors.BOLD}[*] Bulk email validation from: {Colors.CYAN}{source}{Colors.END}", file=status)
+    metrics = ScanMetrics('email_batch')
+    start_time = time.time()
+    domains = {}
+    if journal is not None and journal.resumed:
+        domains = {domain: dict(info, addresses=0) for (domain,), info in journal.done.items()}
+        print(f"{Colors.CYAN}[i] Resuming job: {len(domains)} domains already resolved{Colors.END}", file=status)
+    
+    def jobs():
+        seen = set(domains)
+        for email in iter_emails(path):
+            if EMAIL_RE.match(email):
+                domain = email.rsplit('@', 1)[1].lower()
+                if domain not in seen:
+                    seen.add(domain)
+                    yield domain, (domain,)
+    
+    def on_result(domain, info, error):
+        if error is not None:
+            info = {'domain': domain, 'domain_valid': False, 'domain_ip': None, 'mx_records': [],
+                    'error': str(error), 'lookup_ms': None}
+        elif journal is not None:
+            journal.record((domain,), info)
+        info['addresses'] = 0
+        domains[domain] = info
+        metrics.record('domain_lookup', (info['lookup_ms'] or 0) / 1000,
+                       'ok' if info['domain_valid'] else 'unresolved')
+    
+    try:
+        with metrics.stage('domain_resolution'):
+            ProbeEngine(limit=concurrency).run(jobs(), lookup_email_domain, on_result,
+                                               cancel=journal.cancelled if journal else None)
+        print(f"{Colors.CYAN}[i] {len(domains)} unique domains resolved in "
+              f"{time.time() - start_time:.2f} seconds{Colors.END}", file=status)
+        
+        counts = {'addresses': 0, 'valid': 0, 'invalid_format': 0, 'unresolved_domain': 0}
+        out = sys.stdout if output == '-' else open(output, 'a', encoding='utf-8')
+        if journal is not None and out is not sys.stdout:
+            # Fan-out yang terhenti ditulis ulang dari awal, bukan disambung
+            if 'fan_out_start' in journal.meta:
+                out.truncate(journal.meta['fan_out_start'])
+            else:
+                journal.set_meta(fan_out_start=out.tell())
+        try:
+            with metrics.stage('fan_out'):
+                for email in iter_emails(path):
+                    counts['addresses'] += 1
+                    record = {'session_id': session_id, 'email': email}
+                    if not EMAIL_RE.match(email):
+                        record['status'] = 'invalid_format'
+                    else:
+                        username, domain = email.rsplit('@', 1)
+                        info = domains[domain.lower()]
+                        info['addresses'] += 1
+                        record.update({
+                            'status': 'valid' if info['domain_valid'] else 'unresolved_domain',
+                            'username': username,
+                            'domain': info['domain'],
+                            'provider': PROVIDERS.get(info['domain'], {}).get('name', 'Custom/Corporate Domain'),
+                            'domain_valid': info['domain_valid'],
+                            'domain_ip': info['domain_ip'],
+                            'mx_records': info['mx_records'],
+                            'hashes': email_hashes(email),
+                        })
+                    counts[record['status']] += 1
+                    out.write(json.dumps(record, ensure_ascii=False) + '\n')
+        finally:
+            if out is not sys.stdout:
+                out.close()
+    except KeyboardInterrupt:
+        if journal is not None:
+            journal.interrupted(status)
+        raise
+    finally:
+        if spool is not None:
+            os.unlink(spool.name)
+    if journal is not None:
+        journal.finish()
+    
+    with open(domains_output, 'w', encoding='utf-8') as f:
+        for info in sorted(domains.values(), key=lambda info: -info['addresses']):
+            f.write(json.dumps(info, ensure_ascii=False) + '\n')
+    
+    scan_duration = time.time() - start_time
+    print(f"{Colors.GREEN}[✓] {counts['addresses']} addresses: {counts['valid']} valid, "
+          f"{counts['unresolved_domain']} unresolved domain, {counts['invalid_format']} invalid format{Colors.END}",
+          file=status)
+    slowest = sorted((info for info in domains.values() if info['lookup_ms'] is not None),
+                     key=lambda info: -info['lookup_ms'])[:5]
+    if slowest:
+        print(f"{Colors.BOLD}[*] Slowest domains:{Colors.END}", file=status)
+        for info in slowest:
+            print(f"  {Colors.CYAN}{info['domain']:30s} {info['lookup_ms']:8.1f} ms  "
+                  f"({info['addresses']} addresses){Colors.END}", file=status)
+    print(f"{Colors.CYAN}[i] Scan duration: {scan_duration:.2f} seconds{Colors.END}", file=status)
+    if output != '-':
+        print(f"{Colors.GREEN}[✓] Results streamed to: {output}{Colors.END}", file=status)
+    print(f"{Colors.GREEN}[✓] Domain stats: {domains_output}{Colors.END}", file=status)
+    log(f"Bulk email scan: {counts['addresses']} addresses, {len(domains)} domains, output {output}",
+        latency_ms=round(scan_duration * 1000, 1))
+    
+    counts['domains'] = len(domains)
+    counts['scan_duration'] = f"{scan_duration:.2f}s"
+    return counts
@@ -0,0 +1,76 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_LIMIT = 32
+
+class ProbeEngine:
+    """Event-loop scheduler untuk menjalankan banyak probe secara bersamaan.
+
+    Setiap job adalah tuple ``(key, args)``. Worker biasa (blocking) dijalankan
+    di thread pool berukuran ``limit``; worker coroutine langsung di-await di
+    event loop. Begitu satu probe selesai, slot-nya langsung dipakai job
+    berikutnya, jadi tidak ada lagi grup yang menunggu probe paling lambat.
+    """
+
+    def __init__(self, limit=DEFAULT_LIMIT):
+        self.limit = max(1, int(limit))
+
+    def run(self, jobs, worker, on_result=None, cancel=None):
+        """Jalankan semua job, panggil on_result(key, result, error) per job selesai.
+
+        Jika on_result tidak diberikan, hasil dikumpulkan dan dikembalikan sebagai
+        list ``(key, result, error)`` sesuai urutan selesai. Setelah ``cancel``
+        (threading.Event) di-set, job baru tidak lagi dijadwalkan dan run()
+        kembali begitu probe yang sedang berjalan selesai.
+        """
+        collected = []
+        if on_result is None:
+            on_result = lambda key, result, error: collected.append((key, result, error))
+
+        loop = asyncio.new_event_loop()
+        executor = ThreadPoolExecutor(max_workers=self.limit, thread_name_prefix='xtrace-probe')
+        try:
+            loop.run_until_complete(self._drive(loop, executor, iter(jobs), worker, on_result, cancel))
+        finally:
+            # Setelah KeyboardInterrupt masih ada task yang menunggu thread; batalkan sebelum loop ditutup
+            leftover = asyncio.all_tasks(loop)
+            for task in leftover:
+                task.cancel()
+            if leftover:
+                loop.run_until_complete(asyncio.gather(*leftover, return_exceptions=True))
+            executor.shutdown(wait=False, cancel_futures=True)
+            loop.close()
+        return collected
+
+    async def _drive(self, loop, executor, jobs, worker, on_result, cancel):
+        pending = set()
+        exhausted = False
+
+        while True:
+            if cancel is not None and cancel.is_set():
+                exhausted = True
+            # Isi slot kosong secara lazy supaya input besar tidak dimuat sekaligus
+            while not exhausted and len(pending) < self.limit:
+                try:
+                    key, args = next(jobs)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending.add(loop.create_task(self._call(loop, executor, worker, key, args)))
+
+            if not pending:
+                break
+
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                on_result(*task.result())
+
+    async def _call(self, loop, executor, worker, key, args):
+        try:
+            if asyncio.iscoroutinefunction(worker):
+                result = await worker(*args)
+            else:
+                result = await loop.run_in_executor(executor, worker, *args)
+            return key, result, None
+        except Exception as e:
+            return key, None, e
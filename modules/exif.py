@@ -0,0 +1,175 @@
+import mmap
+import struct
+
+# Ukuran per komponen untuk tiap tipe field TIFF
+TYPE_SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 6: 1, 7: 1, 8: 2, 9: 4, 10: 8, 11: 4, 12: 8, 13: 4}
+TYPE_FORMATS = {3: 'H', 4: 'L', 6: 'b', 8: 'h', 9: 'l', 11: 'f', 12: 'd', 13: 'L'}
+
+EXIF_IFD_TAG = 0x8769
+GPS_IFD_TAG = 0x8825
+
+# Marker SOF yang memuat dimensi gambar (C4, C8 dan CC bukan frame header)
+SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+JPEG_MODES = {1: 'L', 3: 'RGB', 4: 'CMYK'}
+
+class Rational:
+    """Nilai RATIONAL TIFF; repr-nya sama dengan IFDRational milik Pillow"""
+
+    __slots__ = ('numerator', 'denominator')
+
+    def __init__(self, numerator, denominator):
+        self.numerator = numerator
+        self.denominator = denominator
+
+    def __float__(self):
+        if self.denominator == 0:
+            return float('nan')
+        return self.numerator / self.denominator
+
+    def __repr__(self):
+        return str(float(self))
+
+    __str__ = __repr__
+
+
+def _read_value(buf, base, endian, field_type, count, value_offset_pos):
+    size = TYPE_SIZES[field_type] * count
+    if size <= 4:
+        start = value_offset_pos
+    else:
+        start = base + struct.unpack_from(endian + 'L', buf, value_offset_pos)[0]
+    if start + size > len(buf):
+        raise ValueError("EXIF value out of bounds")
+    data = bytes(buf[start:start + size])
+
+    if field_type == 2:
+        return data[:-1].decode('latin-1', 'replace') if data.endswith(b'\0') else data.decode('latin-1', 'replace')
+    if field_type in (1, 7):
+        return data
+    if field_type in (5, 10):
+        fmt = 'L' if field_type == 5 else 'l'
+        pairs = struct.unpack(endian + fmt * (2 * count), data)
+        values = tuple(Rational(pairs[i], pairs[i + 1]) for i in range(0, len(pairs), 2))
+    else:
+        values = struct.unpack(endian + TYPE_FORMATS[field_type] * count, data)
+    return values[0] if len(values) == 1 else values
+
+def _read_ifd(buf, base, endian, offset):
+    """Baca satu IFD menjadi dict tag -> value"""
+    entries = {}
+    position = base + offset
+    if position + 2 > len(buf):
+        return entries
+    count = struct.unpack_from(endian + 'H', buf, position)[0]
+    for i in range(count):
+        entry = position + 2 + i * 12
+        if entry + 12 > len(buf):
+            break
+        tag, field_type, value_count = struct.unpack_from(endian + 'HHL', buf, entry)
+        if field_type not in TYPE_SIZES:
+            continue
+        try:
+            entries[tag] = _read_value(buf, base, endian, field_type, value_count, entry + 8)
+        except (ValueError, struct.error):
+            continue
+    return entries
+
+def parse_tiff(buf, base=0):
+    """Parse struktur TIFF (file TIFF atau payload EXIF); return dict seperti _getexif()"""
+    order = bytes(buf[base:base + 2])
+    if order == b'II':
+        endian = '<'
+    elif order == b'MM':
+        endian = '>'
+    else:
+        return None
+    magic, ifd0 = struct.unpack_from(endian + 'HL', buf, base + 2)
+    if magic != 42:
+        return None
+
+    tags = _read_ifd(buf, base, endian, ifd0)
+    if isinstance(tags.get(EXIF_IFD_TAG), int):
+        tags.update(_read_ifd(buf, base, endian, tags[EXIF_IFD_TAG]))
+    if isinstance(tags.get(GPS_IFD_TAG), int):
+        tags[GPS_IFD_TAG] = _read_ifd(buf, base, endian, tags[GPS_IFD_TAG])
+    return tags
+
+def _read_jpeg(f):
+    info = {'format': 'JPEG', 'exif': None}
+    while True:
+        byte = f.read(1)
+        if not byte:
+            break
+        if byte != b'\xff':
+            continue
+        marker = f.read(1)
+        while marker == b'\xff':
+            marker = f.read(1)
+        if not marker:
+            break
+        code = marker[0]
+        if code == 0xD8 or code == 0x01 or 0xD0 <= code <= 0xD7:
+            continue
+        if code in (0xD9, 0xDA):
+            # EOI / Start of Scan: setelah ini hanya data piksel
+            break
+        length = struct.unpack('>H', f.read(2))[0] - 2
+        if code == 0xE1 and info['exif'] is None:
+            segment = f.read(length)
+            if segment.startswith(b'Exif\x00\x00'):
+                info['exif'] = parse_tiff(segment, 6) or {}
+        elif code in SOF_MARKERS:
+            segment = f.read(length)
+            height, width, components = struct.unpack_from('>HHB', segment, 1)
+            info['width'], info['height'] = width, height
+            info['mode'] = JPEG_MODES.get(components)
+        else:
+            f.seek(length, 1)
+        if 'width' in info and info['exif'] is not None:
+            break
+    if 'width' not in info or info.get('mode') is None:
+        return None
+    return info
+
+def _tiff_mode(tags):
+    photometric = tags.get(262)
+    samples = tags.get(277, 1)
+    bits = tags.get(258, 1)
+    if isinstance(bits, tuple):
+        bits = bits[0]
+    if photometric in (0, 1):
+        return '1' if bits == 1 else ('L' if bits == 8 else None)
+    if photometric == 2:
+        return {3: 'RGB', 4: 'RGBA'}.get(samples)
+    if photometric == 5:
+        return 'CMYK'
+    return None
+
+def _read_tiff(f):
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        tags = parse_tiff(buf)
+    if not tags or 256 not in tags or 257 not in tags:
+        return None
+    mode = _tiff_mode(tags)
+    if mode is None:
+        return None
+    return {'format': 'TIFF', 'width': tags[256], 'height': tags[257], 'mode': mode, 'exif': tags}
+
+def read_metadata(path):
+    """Baca dimensi dan EXIF dari header JPEG/TIFF tanpa decode data piksel.
+
+    Return dict ``format``, ``width``, ``height``, ``mode`` dan ``exif`` (dict
+    tag id -> value, GPS IFD sebagai dict), atau None jika format tidak
+    didukung sehingga caller perlu fallback ke Pillow.
+    """
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(4)
+            if head[:2] == b'\xff\xd8':
+                f.seek(2)
+                return _read_jpeg(f)
+            if head in (b'II*\x00', b'MM\x00*'):
+                return _read_tiff(f)
+    except (OSError, ValueError, struct.error):
+        return None
+    return None
@@ -0,0 +1,167 @@
+import re
+import ssl
+import socket
+import hashlib
+import threading
+import http.client
+from collections import OrderedDict
+from .utils import headers as DEFAULT_HEADERS
+
+BODY_LIMIT = 4096
+MAX_SESSIONS = 1024
+TITLE_RE = re.compile(rb'<title[^>]*>(.*?)</title>', re.IGNORECASE | re.DOTALL)
+
+_contexts = {}
+_contexts_lock = threading.Lock()
+
+def _default_context(verify):
+    """SSLContext bersama: TLS session hanya bisa dipakai ulang oleh context yang membuatnya"""
+    with _contexts_lock:
+        context = _contexts.get(verify)
+        if context is None:
+            context = ssl.create_default_context() if verify else ssl._create_unverified_context()
+            context.set_alpn_protocols(['http/1.1'])
+            _contexts[verify] = context
+        return context
+
+class TLSSessionCache:
+    """Session TLS terakhir per (host, port), LRU dengan batas max_entries.
+
+    Setiap entry menyimpan session beserta hasil verifikasi dan detail
+    sertifikat dari full handshake, karena handshake yang di-resume tidak
+    mengirim ulang chain sertifikat.
+    """
+
+    def __init__(self, max_entries=MAX_SESSIONS):
+        self.max_entries = max_entries
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is not None:
+                self._sessions.move_to_end(key)
+            return session
+
+    def put(self, key, session):
+        with self._lock:
+            self._sessions[key] = session
+            self._sessions.move_to_end(key)
+            while len(self._sessions) > self.max_entries:
+                self._sessions.popitem(last=False)
+
+
+sessions = TLSSessionCache()
+
+def _cert_info(cert):
+    return {
+        'subject': dict(x[0] for x in cert.get('subject', ())),
+        'issuer': dict(x[0] for x in cert.get('issuer', ())),
+        'version': cert.get('version'),
+        'serialNumber': cert.get('serialNumber'),
+        'notBefore': cert.get('notBefore'),
+        'notAfter': cert.get('notAfter'),
+        'subjectAltName': [value for _, value in cert.get('subjectAltName', ())],
+    }
+
+def _peer_chain(ssock, verified):
+    """Chain sertifikat sebagai list dict getpeercert(); kosong jika Python tidak menyediakannya"""
+    # Public sejak Python 3.13, sebelumnya hanya ada di objek _ssl internal
+    owner = ssock if hasattr(ssock, 'get_verified_chain') else getattr(ssock, '_sslobj', None)
+    method = getattr(owner, 'get_verified_chain' if verified else 'get_unverified_chain', None)
+    if method is None:
+        return []
+    try:
+        return [cert.get_info() for cert in method() or []]
+    except (ssl.SSLError, ValueError, AttributeError):
+        return []
+
+def _connect(host, port, context, timeout, session):
+    sock = socket.create_connection((host, port), timeout=timeout)
+    try:
+        return context.wrap_socket(sock, server_hostname=host, session=session)
+    except BaseException:
+        sock.close()
+        raise
+
+def fingerprint_https(host, port=443, timeout=10, body_limit=BODY_LIMIT, context=None, session_cache=sessions):
+    """Satu koneksi TLS: sertifikat (dan chain), protocol/cipher, header dan awal body.
+
+    Request memakai GET dengan Range sebesar body_limit (atau HEAD jika
+    body_limit=0), lalu koneksi ditutup tanpa membaca sisa body. Jika
+    sertifikat tidak lolos verifikasi, koneksi diulang tanpa verifikasi
+    supaya header dan detail sertifikat tetap didapat (verified=False).
+    Session TLS disimpan di session_cache sehingga probe berikutnya ke host
+    yang sama cukup abbreviated handshake.
+    """
+    cached = session_cache.get((host, port)) if session_cache is not None else None
+    if cached is not None and cached['verified']:
+        verified, verify_error = True, None
+    elif cached is not None:
+        # Host yang sudah diketahui tidak trusted langsung ke koneksi tanpa verifikasi
+        verified, verify_error = False, cached['verify_error']
+    else:
+        verified, verify_error = True, None
+
+    used_context = (context or _default_context(True)) if verified else _default_context(False)
+    # Session hanya valid untuk SSLContext yang membuatnya
+    session = cached['session'] if cached is not None and cached['context'] is used_context else None
+    try:
+        ssock = _connect(host, port, used_context, timeout, session)
+    except ssl.SSLCertVerificationError as e:
+        verified, verify_error = False, e.verify_message or str(e)
+        used_context = _default_context(False)
+        ssock = _connect(host, port, used_context, timeout, None)
+
+    try:
+        cipher = ssock.cipher() or (None, None, None)
+        der = ssock.getpeercert(binary_form=True)
+        if ssock.session_reused and cached is not None:
+            certificate, chain = cached['certificate'], cached['chain']
+        else:
+            raw_chain = _peer_chain(ssock, verified)
+            leaf = ssock.getpeercert() if verified else (raw_chain[0] if raw_chain else None)
+            certificate = _cert_info(leaf) if leaf else None
+            chain = [_cert_info(cert) for cert in raw_chain]
+        result = {
+            'host': host,
+            'port': port,
+            'verified': verified,
+            'verify_error': verify_error,
+            'protocol': ssock.version(),
+            'cipher': cipher[0],
+            'cipher_bits': cipher[2],
+            'alpn': ssock.selected_alpn_protocol(),
+            'session_reused': ssock.session_reused,
+            'fingerprint_sha256': hashlib.sha256(der).hexdigest() if der else None,
+            'certificate': certificate,
+            'chain': chain,
+        }
+
+        # Koneksi TLS yang sama dipakai untuk request HTTP
+        conn = http.client.HTTPSConnection(host, port, timeout=timeout)
+        conn.sock = ssock
+        request_headers = dict(DEFAULT_HEADERS, **{'Accept-Encoding': 'identity', 'Connection': 'close'})
+        if body_limit:
+            request_headers['Range'] = f"bytes=0-{body_limit - 1}"
+        conn.request('GET' if body_limit else 'HEAD', '/', headers=request_headers)
+        response = conn.getresponse()
+        body = response.read(body_limit) if body_limit else b''
+        title = TITLE_RE.search(body)
+        result.update({
+            'status': response.status,
+            'reason': response.reason,
+            'headers': dict(response.headers),
+            'body': body,
+            'title': title.group(1).decode('utf-8', 'replace').strip() if title else None,
+        })
+
+        # Ticket TLS 1.3 baru dikirim server setelah handshake, jadi session diambil setelah response
+        if session_cache is not None and ssock.session is not None:
+            session_cache.put((host, port), {'session': ssock.session, 'context': used_context,
+                                             'verified': verified, 'verify_error': verify_error,
+                                             'certificate': certificate, 'chain': chain})
+        return result
+    finally:
+        ssock.close()
@@ -0,0 +1,310 @@
+import os
+import sys
+import json
+import mmap
+import heapq
+import struct
+import hashlib
+import tempfile
+from .email import EMAIL_RE, normalize_email
+from .utils import log
+from .colors import Colors
+
+DEFAULT_DIRECTORY = os.path.join('data', 'hashindex')
+CORPUS_FILE = 'emails.dat'
+# Lebar digest (byte) per algoritma, sama dengan email_hashes()
+ALGORITHMS = {'md5': 16, 'sha1': 20, 'sha256': 32}
+HEX_LENGTHS = {width * 2: name for name, width in ALGORITHMS.items()}
+
+MAGIC = b'XTHIDX01'
+HEADER = struct.Struct('>8sQ')
+OFFSET = struct.Struct('>Q')
+# Record per run saat external sort; 200k x 3 algoritma tetap di bawah ~60 MB
+RUN_RECORDS = 200000
+MAX_SEGMENTS = 8
+READ_RECORDS = 4096
+
+def _iter_lines(source):
+    f = sys.stdin if source == '-' else open(source, encoding='utf-8', errors='replace')
+    try:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield line
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+def _read_records(f, record_size):
+    """Baca record fixed-width secara berurutan dari file yang sudah di-seek"""
+    while True:
+        chunk = f.read(record_size * READ_RECORDS)
+        if not chunk:
+            return
+        for i in range(0, len(chunk), record_size):
+            yield chunk[i:i + record_size]
+
+def _iter_run(path, record_size):
+    with open(path, 'rb') as f:
+        yield from _read_records(f, record_size)
+
+def _write_segment(path, records, width):
+    """Tulis record terurut ke segment; digest duplikat hanya disimpan sekali (offset terkecil)"""
+    tmp_path = f"{path}.tmp"
+    count = 0
+    previous = None
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, 0))
+        for record in records:
+            digest = record[:width]
+            if digest == previous:
+                continue
+            previous = digest
+            f.write(record)
+            count += 1
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, count))
+    os.replace(tmp_path, path)
+    return count
+
+
+class Segment:
+    """Satu file index terurut (digest || offset) yang di-mmap read-only"""
+
+    def __init__(self, path, width):
+        self.path = path
+        self.width = width
+        self.record_size = width + OFFSET.size
+        self._file = open(path, 'rb')
+        magic, self.count = HEADER.unpack(self._file.read(HEADER.size))
+        size = os.fstat(self._file.fileno()).st_size
+        if magic != MAGIC or size != HEADER.size + self.count * self.record_size:
+            self._file.close()
+            raise ValueError(f"Corrupt index segment: {path}")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.count else None
+
+    def find(self, digest):
+        """Binary search; return offset record di corpus atau None"""
+        data, width, record_size = self._map, self.width, self.record_size
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            pos = HEADER.size + mid * record_size
+            if data[pos:pos + width] < digest:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count:
+            pos = HEADER.size + lo * record_size
+            if data[pos:pos + width] == digest:
+                return OFFSET.unpack_from(data, pos + width)[0]
+        return None
+
+    def records(self):
+        with open(self.path, 'rb') as f:
+            f.seek(HEADER.size)
+            yield from _read_records(f, self.record_size)
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+
+class HashIndex:
+    """Reverse index digest email -> alamat email.
+
+    Alamat (sudah dinormalisasi seperti check_email) disimpan sekali di
+    ``emails.dat``. Setiap algoritma punya segment biner terurut berisi
+    digest dan offset ke corpus; lookup memakai mmap + binary search sehingga
+    corpus tidak pernah dimuat ke RAM. add() menulis segment baru (external
+    sort untuk input besar); segment digabung otomatis lewat compact() saat
+    jumlahnya melewati MAX_SEGMENTS.
+    """
+
+    def __init__(self, directory=DEFAULT_DIRECTORY):
+        self.directory = directory
+        self.corpus_path = os.path.join(directory, CORPUS_FILE)
+        self._segments = None
+        self._corpus_file = None
+        self._corpus = None
+
+    def _segment_paths(self, algorithm):
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                      if name.startswith(f"{algorithm}.") and name.endswith('.idx'))
+
+    def _next_generation(self):
+        generations = [int(os.path.basename(path).split('.')[1])
+                       for algorithm in ALGORITHMS for path in self._segment_paths(algorithm)]
+        return max(generations, default=0) + 1
+
+    def add(self, emails):
+        """Tambahkan alamat ke corpus dan tulis satu generasi segment baru"""
+        os.makedirs(self.directory, exist_ok=True)
+        self.close()
+        generation = self._next_generation()
+        stats = {'added': 0, 'invalid': 0}
+        buffers = {algorithm: [] for algorithm in ALGORITHMS}
+        runs = {algorithm: [] for algorithm in ALGORITHMS}
+        constructors = {algorithm: getattr(hashlib, algorithm) for algorithm in ALGORITHMS}
+
+        with tempfile.TemporaryDirectory(prefix='runs-', dir=self.directory) as run_dir:
+            def flush_run(algorithm):
+                buffer = buffers[algorithm]
+                buffer.sort()
+                path = os.path.join(run_dir, f"{algorithm}.{len(runs[algorithm])}.run")
+                with open(path, 'wb') as f:
+                    f.write(b''.join(buffer))
+                runs[algorithm].append(path)
+                buffer.clear()
+
+            with open(self.corpus_path, 'ab') as corpus:
+                offset = corpus.tell()
+                for email in emails:
+                    if not EMAIL_RE.match(email.strip()):
+                        stats['invalid'] += 1
+                        continue
+                    encoded = normalize_email(email).encode('utf-8')
+                    corpus.write(encoded + b'\n')
+                    packed_offset = OFFSET.pack(offset)
+                    for algorithm, constructor in constructors.items():
+                        buffers[algorithm].append(constructor(encoded).digest() + packed_offset)
+                    offset += len(encoded) + 1
+                    stats['added'] += 1
+                    if len(buffers['md5']) >= RUN_RECORDS:
+                        for algorithm in ALGORITHMS:
+                            flush_run(algorithm)
+
+            if not stats['added']:
+                return stats
+            for algorithm, width in ALGORITHMS.items():
+                path = os.path.join(self.directory, f"{algorithm}.{generation:06d}.idx")
+                if runs[algorithm]:
+                    if buffers[algorithm]:
+                        flush_run(algorithm)
+                    record_size = width + OFFSET.size
+                    merged = heapq.merge(*(_iter_run(run, record_size) for run in runs[algorithm]))
+                    _write_segment(path, merged, width)
+                else:
+                    buffers[algorithm].sort()
+                    _write_segment(path, buffers[algorithm], width)
+                    buffers[algorithm].clear()
+
+        if len(self._segment_paths('md5')) > MAX_SEGMENTS:
+            self.compact()
+        return stats
+
+    def compact(self):
+        """Gabungkan semua segment per algoritma menjadi satu (merge k-way, tanpa sort ulang)"""
+        self.close()
+        generation = self._next_generation()
+        for algorithm, width in ALGORITHMS.items():
+            paths = self._segment_paths(algorithm)
+            if len(paths) < 2:
+                continue
+            segments = [Segment(path, width) for path in paths]
+            try:
+                merged = heapq.merge(*(segment.records() for segment in segments))
+                _write_segment(os.path.join(self.directory, f"{algorithm}.{generation:06d}.idx"), merged, width)
+            finally:
+                for segment in segments:
+                    segment.close()
+            for path in paths:
+                os.remove(path)
+
+    def _open(self):
+        if self._segments is None:
+            self._segments = {algorithm: [Segment(path, width) for path in self._segment_paths(algorithm)]
+                              for algorithm, width in ALGORITHMS.items()}
+            if os.path.exists(self.corpus_path) and os.path.getsize(self.corpus_path):
+                self._corpus_file = open(self.corpus_path, 'rb')
+                self._corpus = mmap.mmap(self._corpus_file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._segments
+
+    def lookup(self, digest_hex):
+        """Return (algorithm, email) untuk digest hex md5/sha1/sha256, atau None"""
+        digest_hex = digest_hex.strip().lower()
+        algorithm = HEX_LENGTHS.get(len(digest_hex))
+        if algorithm is None:
+            return None
+        try:
+            digest = bytes.fromhex(digest_hex)
+        except ValueError:
+            return None
+        for segment in self._open()[algorithm]:
+            offset = segment.find(digest)
+            if offset is not None:
+                end = self._corpus.find(b'\n', offset)
+                return algorithm, self._corpus[offset:end].decode('utf-8')
+        return None
+
+    def lookup_many(self, hashes):
+        """Generator (hash, algorithm, email) untuk setiap hash yang cocok"""
+        for digest_hex in hashes:
+            match = self.lookup(digest_hex)
+            if match is not None:
+                yield (digest_hex.strip().lower(),) + match
+
+    def stats(self):
+        segments = self._open()
+        return {
+            'segments': len(segments['md5']),
+            'records': {algorithm: sum(segment.count for segment in items) for algorithm, items in segments.items()},
+            'corpus_bytes': os.path.getsize(self.corpus_path) if os.path.exists(self.corpus_path) else 0,
+        }
+
+    def close(self):
+        if self._segments is not None:
+            for items in self._segments.values():
+                for segment in items:
+                    segment.close()
+            self._segments = None
+        if self._corpus is not None:
+            self._corpus.close()
+            self._corpus_file.close()
+            self._corpus = self._corpus_file = None
+
+
+def build_hash_index(source, directory=DEFAULT_DIRECTORY):
+    """Tambahkan daftar email (file atau '-' untuk stdin) ke reverse index"""
+    print(f"\n{Colors.BOLD}[*] Indexing email hashes from: {Colors.CYAN}{source}{Colors.END}")
+    index = HashIndex(directory)
+    try:
+        stats = index.add(_iter_lines(source))
+        summary = index.stats()
+    finally:
+        index.close()
+    print(f"{Colors.GREEN}[✓] Indexed {stats['added']} addresses ({stats['invalid']} invalid skipped){Colors.END}")
+    print(f"{Colors.CYAN}[i] Index: {directory} - {summary['records']['md5']} indexed digests per algorithm "
+          f"in {summary['segments']} segment(s){Colors.END}")
+    log(f"Hash index updated: {stats['added']} added, {stats['invalid']} invalid, directory {directory}")
+    return stats
+
+def lookup_hashes(source, directory=DEFAULT_DIRECTORY, output=None):
+    """Cari hash (satu digest, file berisi digest, atau '-' untuk stdin) di reverse index"""
+    if HEX_LENGTHS.get(len(source)) and not os.path.exists(source):
+        hashes = [source]
+    else:
+        hashes = _iter_lines(source)
+    status = sys.stderr if output == '-' else sys.stdout
+    index = HashIndex(directory)
+    matches = 0
+    out = None
+    if output:
+        out = sys.stdout if output == '-' else open(output, 'a', encoding='utf-8')
+    try:
+        for digest, algorithm, email in index.lookup_many(hashes):
+            matches += 1
+            if out is not None:
+                out.write(json.dumps({'hash': digest, 'algorithm': algorithm, 'email': email}) + '\n')
+            else:
+                print(f"  {Colors.GREEN}[{algorithm}]{Colors.END} {digest} → {Colors.CYAN}{email}{Colors.END}")
+    finally:
+        index.close()
+        if out is not None and out is not sys.stdout:
+            out.close()
+    print(f"{Colors.GREEN}[✓] {matches} matching hashes{Colors.END}", file=status)
+    log(f"Hash index lookup from {source}: {matches} matches")
+    return matches
@@ -0,0 +1,34 @@
+import hashlib
+
+DEFAULT_ALGORITHMS = ('md5', 'sha256')
+SUPPORTED_ALGORITHMS = ('md5', 'sha1', 'sha256', 'blake2b')
+CHUNK_SIZE = 1024 * 1024
+
+def _new_hasher(name):
+    if name == 'blake2':
+        name = 'blake2b'
+    if name not in SUPPORTED_ALGORITHMS:
+        raise ValueError(f"Unsupported hash algorithm: {name}")
+    return hashlib.new(name)
+
+def hash_file(path, algorithms=DEFAULT_ALGORITHMS, chunk_size=CHUNK_SIZE):
+    """Hitung beberapa digest sekaligus dalam satu kali baca file.
+
+    File dibaca per chunk ke buffer yang dipakai ulang (readinto), lalu setiap
+    chunk diberikan ke semua hasher. hashlib melepas GIL untuk update besar,
+    jadi beberapa file bisa di-hash paralel di thread berbeda.
+    """
+    hashers = [(name, _new_hasher(name)) for name in algorithms]
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+
+    with open(path, 'rb', buffering=0) as f:
+        while True:
+            size = f.readinto(buffer)
+            if not size:
+                break
+            chunk = view[:size]
+            for _, hasher in hashers:
+                hasher.update(chunk)
+
+    return {name: hasher.hexdigest() for name, hasher in hashers}
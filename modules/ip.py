@@ -1,91 +1,125 @@
 import socket
-import threading
+import ipaddress
 from .utils import save_results, generate_report
+from .portscan import PortScanner, ScopeError, ensure_in_scope, parse_ports, DEFAULT_IN_FLIGHT
+from .metrics import ScanMetrics
 from .colors import Colors
 
-def check_ip(ip, session_id):
+COMMON_PORTS = {
+    20: 'FTP Data', 21: 'FTP', 22: 'SSH', 23: 'Telnet',
+    25: 'SMTP', 53: 'DNS', 80: 'HTTP', 110: 'POP3',
+    143: 'IMAP', 443: 'HTTPS', 445: 'SMB', 465: 'SMTPS',
+    587: 'SMTP', 993: 'IMAPS', 995: 'POP3S', 1433: 'MSSQL',
+    3306: 'MySQL', 3389: 'RDP', 5432: 'PostgreSQL',
+    5900: 'VNC', 6379: 'Redis', 8000: 'HTTP Alt',
+    8080: 'HTTP Proxy', 8443: 'HTTPS Alt', 27017: 'MongoDB'
+}
+
+PRIVATE_CLASSES = (
+    (ipaddress.ip_network('10.0.0.0/8'), 'Private (Class A)'),
+    (ipaddress.ip_network('172.16.0.0/12'), 'Private (Class B)'),
+    (ipaddress.ip_network('192.168.0.0/16'), 'Private (Class C)'),
+)
+
+def _address_type(address):
+    """Jenis alamat dari properti ipaddress (IPv4 dan IPv6)"""
+    if address.is_loopback:
+        return 'Loopback'
+    if address.is_multicast:
+        return 'Multicast'
+    if address.is_unspecified:
+        return 'Reserved'
+    if address.is_private:
+        for network, label in PRIVATE_CLASSES:
+            if address.version == network.version and address in network:
+                return label
+        return 'Private/Reserved'
+    if address.is_reserved:
+        return 'Reserved'
+    return 'Public'
+
+def _service_name(port):
+    try:
+        return socket.getservbyport(port, 'tcp').upper()
+    except OSError:
+        return 'Unknown'
+
+def check_ip(ip, session_id, port_spec=None, scope_file=None, concurrency=None):
     """Enhanced IP address OSINT"""
+    metrics = ScanMetrics('ip')
     print(f"\n{Colors.BOLD}[*] Analyzing IP: {Colors.CYAN}{ip}{Colors.END}")
     
     try:
-        socket.inet_aton(ip)
-    except:
+        # inet_aton menerima bentuk pendek ('10.1', '0x7f.1'), ipaddress tidak
+        address = ipaddress.ip_address(ip)
+    except ValueError:
         print(f"{Colors.RED}[!] Invalid IP format{Colors.END}")
         return None
     
     results = {
         'target': ip,
         'ip': ip,
-        'type': None,
+        'type': _address_type(address),
         'reverse_dns': None,
         'open_ports': [],
         'services': []
     }
     
-    parts = list(map(int, ip.split('.')))
-    
-    if parts[0] == 10:
-        results['type'] = 'Private (Class A)'
-    elif parts[0] == 172 and 16 <= parts[1] <= 31:
-        results['type'] = 'Private (Class B)'
-    elif parts[0] == 192 and parts[1] == 168:
-        results['type'] = 'Private (Class C)'
-    elif parts[0] == 127:
-        results['type'] = 'Loopback'
-    elif parts[0] >= 224:
-        results['type'] = 'Reserved/Multicast'
-    else:
-        results['type'] = 'Public'
-    
     print(f"{Colors.GREEN}[+] Type: {results['type']}{Colors.END}")
     
     print(f"\n{Colors.BOLD}[*] Reverse DNS Lookup...{Colors.END}")
     try:
-        hostname = socket.gethostbyaddr(ip)
+        with metrics.stage('reverse_dns'):
+            hostname = socket.gethostbyaddr(ip)
         results['reverse_dns'] = hostname[0]
         print(f"  {Colors.GREEN}[✓] Hostname: {hostname[0]}{Colors.END}")
     except:
         print(f"  {Colors.YELLOW}[!] No reverse DNS record{Colors.END}")
     
-    print(f"\n{Colors.BOLD}[*] Port Scanning (Top 25 ports)...{Colors.END}")
-    ports = {
-        20: 'FTP Data', 21: 'FTP', 22: 'SSH', 23: 'Telnet',
-        25: 'SMTP', 53: 'DNS', 80: 'HTTP', 110: 'POP3',
-        143: 'IMAP', 443: 'HTTPS', 445: 'SMB', 465: 'SMTPS',
-        587: 'SMTP', 993: 'IMAPS', 995: 'POP3S', 1433: 'MSSQL',
-        3306: 'MySQL', 3389: 'RDP', 5432: 'PostgreSQL',
-        5900: 'VNC', 6379: 'Redis', 8000: 'HTTP Alt',
-        8080: 'HTTP Proxy', 8443: 'HTTPS Alt', 27017: 'MongoDB'
-    }
+    ports = dict(COMMON_PORTS)
+    if port_spec:
+        try:
+            ports = {port: COMMON_PORTS.get(port) or _service_name(port) for port in parse_ports(port_spec)}
+        except ValueError as e:
+            print(f"{Colors.RED}[!] Invalid port list: {e}{Colors.END}")
+            return None
     
-    open_ports = []
+    label = f"{len(ports)} ports" if port_spec else "Top 25 ports"
+    print(f"\n{Colors.BOLD}[*] Port Scanning ({label})...{Colors.END}")
     
-    def scan_port(port, service):
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(2)
-        result = sock.connect_ex((ip, port))
-        sock.close()
+    open_ports = []
+    try:
+        ensure_in_scope(ip, scope_file)
         
-        if result == 0:
-            open_ports.append({'port': port, 'service': service, 'state': 'open'})
-            print(f"  {Colors.GREEN}[✓] Port {port:5d} ({service:15s}) OPEN{Colors.END}")
-    
-    threads = []
-    for port, service in ports.items():
-        thread = threading.Thread(target=scan_port, args=(port, service))
-        thread.start()
-        threads.append(thread)
-    
-    for thread in threads:
-        thread.join()
+        def on_open(port):
+            print(f"  {Colors.GREEN}[✓] Port {port:5d} ({ports[port]:15s}) OPEN{Colors.END}")
+        
+        scanner = PortScanner(max_in_flight=concurrency or DEFAULT_IN_FLIGHT)
+        with metrics.stage('port_scan') as stage:
+            states = scanner.scan(ip, list(ports), on_open=on_open)
+            stage.set(ports=len(ports))
+        open_ports = [{'port': port, 'service': ports[port], 'state': 'open'}
+                      for port in sorted(states) if states[port] == 'open']
+        results['port_scan'] = {
+            'ports_scanned': len(ports),
+            'closed': sum(1 for state in states.values() if state == 'closed'),
+            'filtered': sum(1 for state in states.values() if state == 'filtered')
+        }
+        
+        if not open_ports:
+            print(f"  {Colors.YELLOW}[!] No common ports open or filtered{Colors.END}")
+        else:
+            print(f"\n{Colors.GREEN}[✓] Found {len(open_ports)} open ports{Colors.END}")
+    except ScopeError as e:
+        results['port_scan'] = {'skipped': str(e)}
+        print(f"  {Colors.YELLOW}[!] Port scan skipped: {e}{Colors.END}")
+        print(f"  {Colors.CYAN}[i] Add authorized targets (IP/CIDR) to the scope file to enable scanning{Colors.END}")
+    except OSError as e:
+        results['port_scan'] = {'error': str(e)}
+        print(f"  {Colors.RED}[!] Port scan failed: {e}{Colors.END}")
     
     results['open_ports'] = open_ports
     
-    if not open_ports:
-        print(f"  {Colors.YELLOW}[!] No common ports open or filtered{Colors.END}")
-    else:
-        print(f"\n{Colors.GREEN}[✓] Found {len(open_ports)} open ports{Colors.END}")
-    
     print(f"\n{Colors.BOLD}[*] IP Intelligence Resources:{Colors.END}")
     resources = [
         {'name': 'IPInfo', 'url': f"https://ipinfo.io/{ip}"},
@@ -101,7 +135,7 @@ def check_ip(ip, session_id):
     for resource in resources:
         print(f"  {Colors.CYAN}→ {resource['name']}: {resource['url']}{Colors.END}")
     
-    save_results('ip', results, session_id)
+    save_results('ip', results, session_id, metrics=metrics)
     generate_report('ip', results, session_id)
     
     return results
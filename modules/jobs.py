@@ -0,0 +1,143 @@
+import os
+import sys
+import json
+import hashlib
+import threading
+from datetime import datetime
+from .colors import Colors
+
+JOBS_DIR = 'data/jobs'
+
+def job_id(kind, params):
+    """ID stabil dari jenis job dan parameternya, jadi command yang sama memakai journal yang sama"""
+    return hashlib.sha1(json.dumps([kind, params], sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+class JobJournal:
+    """Journal append-only (JSONL) berisi unit kerja yang sudah selesai.
+
+    Baris ``{"meta": ...}`` menyimpan metadata job (mis. path output), baris
+    lain satu unit (list key) beserta hasilnya. Job yang dijalankan ulang
+    dengan parameter sama melewati unit yang sudah ada di journal. Journal
+    dihapus lewat finish() setelah job selesai; jika proses terhenti,
+    journal tetap ada untuk resume. Dengan ``lazy=True`` entry hanya disimpan
+    di memori dan baru ditulis ke disk lewat persist() (mis. saat terhenti).
+    """
+
+    RESUME_HINT = "Run the same command again to resume (--restart to start over)"
+
+    def __init__(self, kind, params, directory=JOBS_DIR, restart=False, lazy=False):
+        self.kind = kind
+        self.job_id = job_id(kind, params)
+        self.path = os.path.join(directory, f"{kind}_{self.job_id}.jsonl")
+        self.meta = {}
+        self.done = {}
+        # Di-set saat job dibatalkan supaya probe yang belum mulai tidak dijadwalkan
+        self.cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._file = None
+        self._pending = []
+        self._closed = False
+
+        if restart and os.path.exists(self.path):
+            os.unlink(self.path)
+        self.resumed = os.path.exists(self.path)
+        if self.resumed:
+            self._load()
+        if not lazy:
+            self._open()
+        if not self.resumed:
+            self.set_meta(kind=kind, params=params, started=datetime.now().isoformat())
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._file = open(self.path, 'a', encoding='utf-8')
+        for entry in self._pending:
+            self._file.write(json.dumps(entry, ensure_ascii=False, default=str) + '\n')
+        self._pending = []
+        self._file.flush()
+
+    def _load(self):
+        valid = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                # Baris terakhir bisa terpotong jika proses mati saat menulis
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                valid += len(line)
+                if 'meta' in entry:
+                    self.meta.update(entry['meta'])
+                else:
+                    self.done[tuple(entry['unit'])] = entry.get('result')
+        with open(self.path, 'r+b') as f:
+            f.truncate(valid)
+
+    def __contains__(self, unit):
+        return tuple(unit) in self.done
+
+    def __len__(self):
+        return len(self.done)
+
+    def _write(self, entry):
+        with self._lock:
+            # Worker yang masih berjalan setelah close() tidak lagi menulis
+            if self._closed:
+                return False
+            if self._file is None:
+                self._pending.append(entry)
+                return True
+            self._file.write(json.dumps(entry, ensure_ascii=False, default=str) + '\n')
+            self._file.flush()
+            return True
+
+    def set_meta(self, **meta):
+        if self._write({'meta': meta}):
+            self.meta.update(meta)
+
+    def record(self, unit, result=None):
+        """Tandai unit selesai; langsung di-flush supaya bertahan jika proses terhenti"""
+        if self._write({'unit': list(unit), 'result': result}):
+            self.done[tuple(unit)] = result
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def persist(self):
+        """Tulis journal lazy ke disk supaya job bisa dilanjutkan"""
+        with self._lock:
+            if self._file is None and not self._closed:
+                self._open()
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            if self._file is not None:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._file.close()
+                self._file = None
+
+    def finish(self):
+        """Job selesai: journal tidak diperlukan lagi"""
+        self.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def interrupted(self, file=sys.stdout, hint=RESUME_HINT):
+        """Batalkan job, simpan journal dan tampilkan cara melanjutkan"""
+        self.cancel()
+        self.persist()
+        self.close()
+        print(f"\n{Colors.YELLOW}[!] Interrupted: {len(self.done)} completed units saved to {self.path}{Colors.END}",
+              file=file)
+        print(f"{Colors.CYAN}[i] {hint}{Colors.END}", file=file)
+
+
+def open_journal(kind, source, restart=False, **params):
+    """Journal untuk job dari file input; None untuk stdin karena isinya tidak bisa dibaca ulang"""
+    if source == '-':
+        return None
+    return JobJournal(kind, dict(params, source=os.path.abspath(source)), restart=restart)
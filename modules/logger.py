@@ -0,0 +1,143 @@
+import os
+import json
+import queue
+import threading
+import time
+import atexit
+from datetime import datetime
+
+DEFAULT_DIRECTORY = 'logs'
+MAX_BYTES = 10 * 1024 * 1024
+FLUSH_INTERVAL = 0.5
+BATCH_SIZE = 512
+
+_STOP = object()
+
+class BackgroundLogger:
+    """Logger JSON-lines dengan satu writer thread.
+
+    log() hanya membuat dict dan memasukkannya ke SimpleQueue (tanpa lock
+    maupun syscall di thread pemanggil). Writer thread mengambil record per
+    batch, memformat timestamp, menulis sekaligus, dan merotasi file per hari
+    atau saat ukurannya melewati max_bytes.
+    """
+
+    def __init__(self, directory=DEFAULT_DIRECTORY, max_bytes=MAX_BYTES, flush_interval=FLUSH_INTERVAL,
+                 batch_size=BATCH_SIZE):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.session_id = None
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._file = None
+        self._file_day = None
+
+    def log(self, message, level='INFO', module=None, **fields):
+        record = {'timestamp': time.time(), 'level': level, 'session_id': self.session_id,
+                  'module': module, 'message': message}
+        if fields:
+            record.update(fields)
+        self._queue.put(record)
+        if self._thread is None:
+            self._start()
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='xtrace-logger', daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _run(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch = [first]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = any(record is _STOP for record in batch)
+            self._write([record for record in batch if record is not _STOP])
+            if stop:
+                self._close_file()
+                return
+
+    def _write(self, records):
+        if not records:
+            return
+        try:
+            lines = []
+            for record in records:
+                record['timestamp'] = datetime.fromtimestamp(record['timestamp']).isoformat(timespec='milliseconds')
+                lines.append(json.dumps(record, ensure_ascii=False, default=str))
+            f = self._open_file()
+            f.write('\n'.join(lines) + '\n')
+            f.flush()
+        except (OSError, ValueError):
+            pass
+
+    def _open_file(self):
+        day = datetime.now().strftime('%Y%m%d')
+        path = os.path.join(self.directory, f"xtrace_{day}.log")
+        if self._file is not None and (day != self._file_day or self._file.tell() >= self.max_bytes):
+            self._close_file()
+            if day == self._file_day:
+                self._rotate(path)
+        if self._file is None:
+            os.makedirs(self.directory, exist_ok=True)
+            if os.path.exists(path) and os.path.getsize(path) >= self.max_bytes:
+                self._rotate(path)
+            self._file = open(path, 'a', encoding='utf-8')
+            self._file_day = day
+        return self._file
+
+    def _rotate(self, path):
+        # xtrace_YYYYMMDD.log -> xtrace_YYYYMMDD.1.log, .1 -> .2, dst.
+        base = path[:-len('.log')]
+        index = 1
+        while os.path.exists(f"{base}.{index}.log"):
+            index += 1
+        for i in range(index, 1, -1):
+            os.replace(f"{base}.{i - 1}.log", f"{base}.{i}.log")
+        os.replace(path, f"{base}.1.log")
+
+    def _close_file(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+
+    def close(self, timeout=2.0):
+        """Flush semua record yang tersisa dan hentikan writer thread"""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+
+    def _reset_after_fork(self):
+        # Child process (mis. process pool) tidak mewarisi writer thread
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._file = None
+
+
+logger = BackgroundLogger()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=logger._reset_after_fork)
+
+def set_session(session_id):
+    """Session ID yang ikut dicatat di setiap record log"""
+    logger.session_id = session_id
@@ -0,0 +1,226 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Bucket histogram durasi (detik), dipakai untuk stage maupun request
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_local = threading.local()
+
+class Span:
+    """Satu stage atau request yang sedang diukur"""
+
+    __slots__ = ('name', 'kind', 'start', 'duration', 'outcome', 'retries', 'attrs')
+
+    def __init__(self, name, kind):
+        self.name = name
+        self.kind = kind
+        self.start = time.perf_counter()
+        self.duration = None
+        self.outcome = 'ok'
+        self.retries = 0
+        self.attrs = {}
+
+    def set(self, outcome=None, **attrs):
+        if outcome is not None:
+            self.outcome = outcome
+        self.attrs.update(attrs)
+
+
+def current_span():
+    """Span terdalam yang aktif di thread ini (None jika tidak ada)"""
+    stack = getattr(_local, 'stack', None)
+    return stack[-1] if stack else None
+
+def note_retry(count=1):
+    """Tambah retry count ke span aktif; dipanggil dari request layer"""
+    span = current_span()
+    if span is not None:
+        span.retries += count
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(**labels):
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+class MetricsRegistry:
+    """Agregat semua span dalam proses ini (histogram durasi, outcome dan retry)"""
+
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._outcomes = {}
+        self._retries = {}
+
+    def observe(self, mode, kind, name, duration, outcome='ok', retries=0):
+        key = (mode, kind, name)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if duration <= bound:
+                    histogram['buckets'][i] += 1
+                    break
+            histogram['sum'] += duration
+            histogram['count'] += 1
+            outcome_key = key + (outcome,)
+            self._outcomes[outcome_key] = self._outcomes.get(outcome_key, 0) + 1
+            if retries:
+                self._retries[key] = self._retries.get(key, 0) + retries
+
+    def snapshot(self):
+        """Salinan metrik saat ini sebagai dict biasa"""
+        with self._lock:
+            spans = []
+            for (mode, kind, name), histogram in sorted(self._histograms.items()):
+                cumulative, buckets = 0, {}
+                for bound, count in zip(self.buckets, histogram['buckets']):
+                    cumulative += count
+                    buckets[str(bound)] = cumulative
+                buckets['+Inf'] = histogram['count']
+                spans.append({
+                    'mode': mode, 'kind': kind, 'name': name,
+                    'count': histogram['count'],
+                    'sum_seconds': round(histogram['sum'], 6),
+                    'buckets': buckets,
+                    'outcomes': {outcome: count for (m, k, n, outcome), count in self._outcomes.items()
+                                 if (m, k, n) == (mode, kind, name)},
+                    'retries': self._retries.get((mode, kind, name), 0),
+                })
+            return {'spans': spans}
+
+    def prometheus(self):
+        """Metrik dalam Prometheus text exposition format"""
+        lines = [
+            '# HELP xtrace_span_duration_seconds Duration of scan stages and requests.',
+            '# TYPE xtrace_span_duration_seconds histogram',
+        ]
+        snapshot = self.snapshot()
+        for span in snapshot['spans']:
+            labels = {'mode': span['mode'], 'kind': span['kind'], 'span': span['name']}
+            for bound, count in span['buckets'].items():
+                lines.append(f"xtrace_span_duration_seconds_bucket{_labels(**labels, le=bound)} {count}")
+            lines.append(f"xtrace_span_duration_seconds_sum{_labels(**labels)} {span['sum_seconds']}")
+            lines.append(f"xtrace_span_duration_seconds_count{_labels(**labels)} {span['count']}")
+
+        lines += ['# HELP xtrace_span_outcomes_total Completed spans by outcome.',
+                  '# TYPE xtrace_span_outcomes_total counter']
+        for span in snapshot['spans']:
+            for outcome, count in sorted(span['outcomes'].items()):
+                labels = _labels(mode=span['mode'], kind=span['kind'], span=span['name'], outcome=outcome)
+                lines.append(f"xtrace_span_outcomes_total{labels} {count}")
+
+        lines += ['# HELP xtrace_span_retries_total Retries performed inside spans.',
+                  '# TYPE xtrace_span_retries_total counter']
+        for span in snapshot['spans']:
+            labels = _labels(mode=span['mode'], kind=span['kind'], span=span['name'])
+            lines.append(f"xtrace_span_retries_total{labels} {span['retries']}")
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        """Tulis file .prom secara atomik (aman untuk node_exporter textfile collector)"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus())
+        os.replace(tmp_path, path)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._outcomes.clear()
+            self._retries.clear()
+
+
+registry = MetricsRegistry()
+
+class ScanMetrics:
+    """Timer per scan: stage dicatat satu per satu, request diagregasi per nama.
+
+    Setiap span juga dikirim ke registry global sehingga bisa diekspor sebagai
+    Prometheus text format atau diambil sebagai snapshot.
+    """
+
+    def __init__(self, mode, registry=registry):
+        self.mode = mode
+        self.registry = registry
+        self.start = time.perf_counter()
+        self.stages = []
+        self.requests = {}
+        self._lock = threading.Lock()
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    @contextmanager
+    def span(self, name, kind='stage'):
+        span = Span(name, kind)
+        stack = _local.__dict__.setdefault('stack', [])
+        stack.append(span)
+        try:
+            yield span
+        except BaseException:
+            if span.outcome == 'ok':
+                span.outcome = 'error'
+            raise
+        finally:
+            stack.pop()
+            span.duration = time.perf_counter() - span.start
+            self._add(span.name, span.kind, span.duration, span.outcome, span.retries, span.attrs)
+
+    def stage(self, name):
+        return self.span(name, 'stage')
+
+    def request(self, name):
+        return self.span(name, 'request')
+
+    def record(self, name, duration, outcome='ok', retries=0, kind='request'):
+        """Catat durasi yang diukur di tempat lain (mis. di coroutine atau worker process)"""
+        self._add(name, kind, duration, outcome, retries, None)
+
+    def _add(self, name, kind, duration, outcome, retries, attrs):
+        with self._lock:
+            if kind == 'stage':
+                entry = {'name': name, 'duration_ms': round(duration * 1000, 2), 'outcome': outcome}
+                if retries:
+                    entry['retries'] = retries
+                if attrs:
+                    entry.update(attrs)
+                self.stages.append(entry)
+            else:
+                stats = self.requests.get(name)
+                if stats is None:
+                    stats = self.requests[name] = {'count': 0, 'total': 0.0, 'max': 0.0, 'retries': 0, 'outcomes': {}}
+                stats['count'] += 1
+                stats['total'] += duration
+                stats['max'] = max(stats['max'], duration)
+                stats['retries'] += retries
+                stats['outcomes'][outcome] = stats['outcomes'].get(outcome, 0) + 1
+        self.registry.observe(self.mode, kind, name, duration, outcome, retries)
+
+    def summary(self):
+        """Ringkasan untuk metadata hasil scan"""
+        with self._lock:
+            requests = {
+                name: {
+                    'count': stats['count'],
+                    'total_ms': round(stats['total'] * 1000, 2),
+                    'mean_ms': round(stats['total'] / stats['count'] * 1000, 2),
+                    'max_ms': round(stats['max'] * 1000, 2),
+                    'retries': stats['retries'],
+                    'outcomes': dict(stats['outcomes']),
+                }
+                for name, stats in self.requests.items()
+            }
+            return {'total_ms': round(self.elapsed * 1000, 2), 'stages': list(self.stages), 'requests': requests}
+
+def snapshot():
+    """Snapshot in-process dari registry global"""
+    return registry.snapshot()
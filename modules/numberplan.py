@@ -0,0 +1,152 @@
+import os
+import json
+import re
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+DEFAULT_PLAN = os.path.join(DATA_DIR, 'numberplan.json')
+DEFAULT_COUNTRY = '62'
+DEFAULT_TRUNK = '0'
+# E.164: maksimal 15 digit termasuk kode negara
+MAX_DIGITS = 15
+MIN_DIGITS = 10
+
+_CLEAN_RE = re.compile(r'[^\d+]')
+
+class PrefixTrie:
+    """Trie digit untuk longest-prefix match dalam O(panjang nomor)"""
+
+    __slots__ = ('root',)
+
+    def __init__(self, entries=None):
+        self.root = {}
+        for prefix, value in (entries or {}).items():
+            self.insert(prefix, value)
+
+    def insert(self, prefix, value):
+        node = self.root
+        for digit in prefix:
+            node = node.setdefault(digit, {})
+        # Key None menyimpan nilai untuk prefix yang berakhir di node ini
+        node[None] = value
+
+    def longest(self, digits, start=0):
+        """Return (panjang prefix, value) untuk match terpanjang, atau (0, None)"""
+        node = self.root
+        best_length, best_value = 0, None
+        for i in range(start, len(digits)):
+            node = node.get(digits[i])
+            if node is None:
+                break
+            if None in node:
+                best_length, best_value = i + 1 - start, node[None]
+        return best_length, best_value
+
+    def shortest(self, digits, start=0):
+        """Return (panjang prefix, value) untuk match terpendek, atau (0, None)"""
+        node = self.root
+        for i in range(start, len(digits)):
+            node = node.get(digits[i])
+            if node is None:
+                break
+            if None in node:
+                return i + 1 - start, node[None]
+        return 0, None
+
+
+class NumberPlan:
+    """Index kode negara ITU dan prefix operator, dibangun sekali dari data file"""
+
+    def __init__(self, data, default_country=DEFAULT_COUNTRY):
+        self.default_country = default_country
+        self.countries = PrefixTrie({code: (iso, name) for code, (iso, name) in data['countries'].items()})
+        self.trunk_prefixes = data.get('trunk_prefixes', {})
+        self.operators = {code: PrefixTrie(prefixes) for code, prefixes in data.get('operators', {}).items()}
+
+    @classmethod
+    def load(cls, path=DEFAULT_PLAN, default_country=DEFAULT_COUNTRY):
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f), default_country)
+
+    def normalize(self, number, default_country=None):
+        """Nomor mentah ke format E.164 ('+62812...'), None jika tidak bisa dinormalisasi.
+
+        Nomor tanpa '+' dan '00' dianggap nomor nasional jika diawali trunk
+        prefix (mis. '08...') atau jika default_country diberikan eksplisit.
+        Selain itu kode negara tidak ditebak dari digit awal ('2025550123'
+        bukan Mesir) dan hasilnya None.
+        """
+        return self._normalize_clean(_CLEAN_RE.sub('', number), default_country)
+
+    def _normalize_clean(self, clean, default_country):
+        if clean.startswith('+'):
+            digits = clean[1:].replace('+', '')
+        elif clean.startswith('00'):
+            digits = clean[2:].replace('+', '')
+        else:
+            country = default_country or self.default_country
+            trunk = self.trunk_prefixes.get(country, DEFAULT_TRUNK)
+            digits = clean.replace('+', '')
+            if trunk and digits.startswith(trunk):
+                digits = country + digits[len(trunk):]
+            elif default_country and digits:
+                digits = default_country + digits
+            else:
+                return None
+        if not digits:
+            return None
+        return '+' + digits
+
+    def classify(self, number, default_country=None):
+        """Normalisasi dan klasifikasi satu nomor (negara, operator, validasi panjang)"""
+        clean = _CLEAN_RE.sub('', number)
+        e164 = self._normalize_clean(clean, default_country)
+        result = {
+            'original': number,
+            'cleaned': clean,
+            'e164': e164,
+            'country_code': None,
+            'country': None,
+            'iso': None,
+            'national_number': None,
+            'provider': None,
+            'card_type': None,
+            'valid_length': False,
+        }
+        if e164 is None:
+            return result
+
+        digits = e164[1:]
+        result['valid_length'] = MIN_DIGITS <= len(digits) <= MAX_DIGITS
+        _, country = self.countries.longest(digits)
+        if country is None:
+            return result
+
+        iso, name = country
+        # Sub-region (mis. 1242 Bahamas, 441534 Jersey) memakai kode panggil induknya
+        calling_code = digits[:self.countries.shortest(digits)[0]]
+        national = digits[len(calling_code):]
+        result.update(country_code='+' + calling_code, country=name, iso=iso, national_number=national)
+
+        operators = self.operators.get(calling_code)
+        if operators is not None:
+            _, operator = operators.longest(national)
+            if operator is not None:
+                result['provider'] = operator['name']
+                result['card_type'] = operator['type']
+        return result
+
+    def classify_many(self, numbers, default_country=None):
+        """Klasifikasi banyak nomor secara streaming (generator, memori konstan)"""
+        classify = self.classify
+        for number in numbers:
+            yield classify(number, default_country)
+
+
+_plan = None
+
+def get_plan():
+    """NumberPlan bersama, dimuat dari data/numberplan.json saat pertama dipakai"""
+    global _plan
+    if _plan is None:
+        _plan = NumberPlan.load()
+    return _plan
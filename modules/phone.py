@@ -1,132 +1,277 @@
-import re
-from .utils import save_results, generate_report
+import os
+import sys
+import json
+import time
+# csv/sqlite3/tempfile hanya dipakai mode batch dan diimpor di fungsinya supaya -p tetap cepat
+from .utils import save_results, generate_report, log
+from .numberplan import get_plan
 from .colors import Colors
 
+CHUNK_SIZE = 5000
+# File lebih besar dari ini diproses paralel di beberapa process
+PARALLEL_THRESHOLD = 8 * 1024 * 1024
+PHONE_COLUMN_HINTS = ('phone', 'mobile', 'msisdn', 'tel', 'hp', 'number', 'nomor')
+RESULT_FIELDS = ['e164', 'country_code', 'country', 'iso', 'national_number', 'provider', 'card_type',
+                 'valid_length', 'status']
+LOOKUP_COLUMNS = {'Truecaller': 'truecaller_url', 'WhatsApp Check': 'whatsapp_url',
+                  'Telegram': 'telegram_url', 'NumLookup': 'numlookup_url'}
+
+def lookup_resources(number):
+    """URL lookup eksternal untuk satu nomor (format E.164 atau cleaned)"""
+    digits = number.replace('+', '')
+    return [
+        {'name': 'Truecaller', 'url': f"https://www.truecaller.com/search/{number.replace('+', '%2B')}"},
+        {'name': 'WhatsApp Check', 'url': f"https://wa.me/{digits}"},
+        {'name': 'Telegram', 'url': f"https://t.me/{digits}"},
+        {'name': 'GetContact', 'url': "https://www.getcontact.com/"},
+        {'name': 'NumLookup', 'url': f"https://www.numlookup.com/?phone={number}"}
+    ]
+
 def check_phone(phone, session_id):
     """Enhanced phone number OSINT"""
+    from .metrics import ScanMetrics
+    metrics = ScanMetrics('phone')
     print(f"\n{Colors.BOLD}[*] Analyzing phone: {Colors.CYAN}{phone}{Colors.END}")
     
-    clean = re.sub(r'[^\d+]', '', phone)
+    with metrics.stage('classify'):
+        info = get_plan().classify(phone)
+    clean = info['e164'] or info['cleaned']
     results = {
         'target': phone,
         'original': phone,
-        'cleaned': clean,
-        'country': None,
-        'provider': None,
+        'cleaned': info['cleaned'],
+        'country': info['country'],
+        'provider': info['provider'],
         'type': None,
         'validation': {}
     }
     
-    print(f"{Colors.GREEN}[+] Cleaned format: {clean}{Colors.END}")
-    
-    country_codes = {
-        '+1': 'USA/Canada',
-        '+44': 'United Kingdom',
-        '+62': 'Indonesia',
-        '+91': 'India',
-        '+86': 'China',
-        '+81': 'Japan',
-        '+82': 'South Korea',
-        '+65': 'Singapore',
-        '+60': 'Malaysia',
-        '+66': 'Thailand',
-        '+84': 'Vietnam',
-        '+63': 'Philippines'
-    }
+    print(f"{Colors.GREEN}[+] Cleaned format: {info['cleaned']}{Colors.END}")
     
-    for code, country in country_codes.items():
-        if clean.startswith(code):
-            results['country'] = country
-            results['country_code'] = code
-            print(f"{Colors.GREEN}[+] Country: {country}{Colors.END}")
-            break
-    
-    if clean.startswith('+62') or clean.startswith('62') or clean.startswith('08'):
-        if clean.startswith('08'):
-            clean = '+62' + clean[1:]
-        elif clean.startswith('62'):
-            clean = '+' + clean
-        
-        results['country'] = 'Indonesia'
-        results['normalized'] = clean
-        results['country_code'] = '+62'
-        
-        print(f"{Colors.GREEN}[+] Country: Indonesia{Colors.END}")
-        print(f"{Colors.GREEN}[+] Normalized: {clean}{Colors.END}")
-        
-        providers_id = {
-            '811': {'name': 'Telkomsel', 'type': 'Halo'},
-            '812': {'name': 'Telkomsel', 'type': 'simPATI'},
-            '813': {'name': 'Telkomsel', 'type': 'simPATI'},
-            '821': {'name': 'Telkomsel', 'type': 'Kartu AS'},
-            '822': {'name': 'Telkomsel', 'type': 'simPATI'},
-            '823': {'name': 'Telkomsel', 'type': 'Kartu AS'},
-            '851': {'name': 'Telkomsel', 'type': 'Halo'},
-            '852': {'name': 'Telkomsel', 'type': 'Kartu AS'},
-            '853': {'name': 'Telkomsel', 'type': 'Kartu AS'},
-            '814': {'name': 'Indosat Ooredoo', 'type': 'IM3'},
-            '815': {'name': 'Indosat Ooredoo', 'type': 'Matrix'},
-            '816': {'name': 'Indosat Ooredoo', 'type': 'Mentari'},
-            '855': {'name': 'Indosat Ooredoo', 'type': 'IM3'},
-            '856': {'name': 'Indosat Ooredoo', 'type': 'IM3'},
-            '857': {'name': 'Indosat Ooredoo', 'type': 'IM3'},
-            '858': {'name': 'Indosat Ooredoo', 'type': 'Mentari'},
-            '817': {'name': 'XL Axiata', 'type': 'XL'},
-            '818': {'name': 'XL Axiata', 'type': 'XL'},
-            '819': {'name': 'XL Axiata', 'type': 'XL'},
-            '859': {'name': 'XL Axiata', 'type': 'XL'},
-            '877': {'name': 'XL Axiata', 'type': 'XL'},
-            '878': {'name': 'XL Axiata', 'type': 'XL'},
-            '895': {'name': 'Tri Indonesia', 'type': '3'},
-            '896': {'name': 'Tri Indonesia', 'type': '3'},
-            '897': {'name': 'Tri Indonesia', 'type': '3'},
-            '898': {'name': 'Tri Indonesia', 'type': '3'},
-            '899': {'name': 'Tri Indonesia', 'type': '3'},
-            '831': {'name': 'Axis', 'type': 'AXIS'},
-            '832': {'name': 'Axis', 'type': 'AXIS'},
-            '833': {'name': 'Axis', 'type': 'AXIS'},
-            '838': {'name': 'Axis', 'type': 'AXIS'},
-            '881': {'name': 'Smartfren', 'type': 'Smartfren'},
-            '882': {'name': 'Smartfren', 'type': 'Smartfren'},
-            '883': {'name': 'Smartfren', 'type': 'Smartfren'},
-            '884': {'name': 'Smartfren', 'type': 'Smartfren'},
-            '885': {'name': 'Smartfren', 'type': 'Smartfren'},
-            '886': {'name': 'Smartfren', 'type': 'Smartfren'},
-            '887': {'name': 'Smartfren', 'type': 'Smartfren'},
-            '888': {'name': 'Smartfren', 'type': 'Smartfren'},
-            '889': {'name': 'Smartfren', 'type': 'Smartfren'}
-        }
-        
-        if len(clean) >= 6:
-            prefix = clean.replace('+62', '').replace('0', '', 1)[:3]
-            if prefix in providers_id:
-                results['provider'] = providers_id[prefix]['name']
-                results['card_type'] = providers_id[prefix]['type']
-                print(f"{Colors.GREEN}[+] Provider: {results['provider']}{Colors.END}")
-                print(f"{Colors.GREEN}[+] Card Type: {results['card_type']}{Colors.END}")
-    
-    if len(clean.replace('+', '')) >= 10:
+    if info['country']:
+        results['country_code'] = info['country_code']
+        results['normalized'] = info['e164']
+        print(f"{Colors.GREEN}[+] Country: {info['country']}{Colors.END}")
+        print(f"{Colors.GREEN}[+] Normalized: {info['e164']}{Colors.END}")
+    elif info['e164'] is None:
+        print(f"{Colors.YELLOW}[!] Country unknown: add the country code with '+' or '00'{Colors.END}")
+    
+    if info['provider']:
+        results['card_type'] = info['card_type']
+        print(f"{Colors.GREEN}[+] Provider: {results['provider']}{Colors.END}")
+        print(f"{Colors.GREEN}[+] Card Type: {results['card_type']}{Colors.END}")
+    
+    if info['valid_length']:
         results['validation']['length'] = 'Valid'
-        print(f"{Colors.GREEN}[+] Length: Valid (≥10 digits){Colors.END}")
+        print(f"{Colors.GREEN}[+] Length: Valid (10-15 digits){Colors.END}")
     else:
         results['validation']['length'] = 'Invalid'
-        print(f"{Colors.RED}[!] Length: Invalid (<10 digits){Colors.END}")
+        print(f"{Colors.RED}[!] Length: Invalid (must be 10-15 digits){Colors.END}")
     
     print(f"\n{Colors.BOLD}[*] Phone Lookup Resources:{Colors.END}")
-    lookup_sites = [
-        {'name': 'Truecaller', 'url': f"https://www.truecaller.com/search/{clean.replace('+', '%2B')}"},
-        {'name': 'WhatsApp Check', 'url': f"https://wa.me/{clean.replace('+', '')}"},
-        {'name': 'Telegram', 'url': f"https://t.me/{clean.replace('+', '')}"},
-        {'name': 'GetContact', 'url': "https://www.getcontact.com/"},
-        {'name': 'NumLookup', 'url': f"https://www.numlookup.com/?phone={clean}"}
-    ]
+    lookup_sites = lookup_resources(clean)
     
     for site in lookup_sites:
         print(f"  {Colors.CYAN}→ {site['name']}: {site['url']}{Colors.END}")
     
     results['lookup_resources'] = lookup_sites
     
-    save_results('phone', results, session_id)
+    save_results('phone', results, session_id, metrics=metrics)
     generate_report('phone', results, session_id)
     
     return results
+
+def _pick_phone_column(fieldnames, column=None):
+    if column:
+        if column not in fieldnames:
+            raise ValueError(f"Column not found: {column}")
+        return column
+    for name in fieldnames:
+        if any(hint in name.lower() for hint in PHONE_COLUMN_HINTS):
+            return name
+    return fieldnames[0]
+
+def iter_phone_rows(source, column=None):
+    """Stream (nomor, row) dari CSV (kolom otomatis/--phone-column) atau teks satu nomor per baris"""
+    import csv
+    handle = sys.stdin if source == '-' else open(source, encoding='utf-8', errors='replace', newline='')
+    try:
+        if source.lower().endswith('.csv') or column:
+            reader = csv.DictReader(handle)
+            if not reader.fieldnames:
+                return
+            phone_column = _pick_phone_column(reader.fieldnames, column)
+            for row in reader:
+                number = (row.get(phone_column) or '').strip()
+                if number:
+                    yield number, row
+        else:
+            for line in handle:
+                number = line.strip()
+                if number and not number.startswith('#'):
+                    yield number, None
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _format_chunk(chunk, session_id, fields, lookups):
+    """Klasifikasi dan serialisasi satu chunk; return list (e164, line, status).
+
+    Dijalankan di worker process untuk file besar, jadi hanya string hasil
+    (bukan dict) yang dikirim balik ke process utama.
+    """
+    import io
+    import csv
+    plan = get_plan()
+    output = []
+    for number, row in chunk:
+        info = plan.classify(number)
+        info['status'] = 'valid' if info['valid_length'] and info['country'] else 'invalid'
+        if lookups and info['e164']:
+            for site in lookup_resources(info['e164']):
+                if site['name'] in LOOKUP_COLUMNS:
+                    info[LOOKUP_COLUMNS[site['name']]] = site['url']
+        
+        if fields is not None:
+            merged = {**(row or {'original': number}), **info}
+            buffer = io.StringIO()
+            csv.writer(buffer).writerow([merged.get(field, '') for field in fields])
+            line = buffer.getvalue()
+        else:
+            record = {'session_id': session_id, **info}
+            if row:
+                record['source'] = row
+            line = json.dumps(record, ensure_ascii=False) + '\n'
+        output.append((info['e164'], line, info['status']))
+    return output
+
+class _SeenNumbers:
+    """Set E.164 di SQLite sementara supaya dedup tetap memakai memori konstan"""
+
+    def __init__(self):
+        import sqlite3
+        import tempfile
+        self._file = tempfile.NamedTemporaryFile(prefix='xtrace-phones-', suffix='.db', delete=False)
+        self._file.close()
+        self._conn = sqlite3.connect(self._file.name, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=OFF')
+        self._conn.execute('PRAGMA synchronous=OFF')
+        # Cache halaman dibatasi (32MB): index di disk tetap cepat tanpa memuat semuanya ke memori
+        self._conn.execute('PRAGMA cache_size=-32768')
+        self._conn.execute('CREATE TABLE seen (e164 TEXT PRIMARY KEY) WITHOUT ROWID')
+
+    def add_new(self, numbers, batch_size=500):
+        """Return set nomor (dari list ini) yang belum pernah terlihat, lalu tandai sebagai terlihat"""
+        fresh = set(numbers)
+        candidates = list(fresh)
+        for i in range(0, len(candidates), batch_size):
+            batch = candidates[i:i + batch_size]
+            placeholders = ','.join('?' * len(batch))
+            for (number,) in self._conn.execute(f'SELECT e164 FROM seen WHERE e164 IN ({placeholders})', batch):
+                fresh.discard(number)
+        self._conn.execute('BEGIN')
+        self._conn.executemany('INSERT INTO seen VALUES (?)', ((number,) for number in fresh))
+        self._conn.execute('COMMIT')
+        return fresh
+
+    def close(self):
+        self._conn.close()
+        os.unlink(self._file.name)
+
+
+def _formatted_chunks(chunks, workers, *args):
+    """Yield hasil _format_chunk (list (e164, line, status)) per chunk sesuai urutan input, paralel jika workers > 1"""
+    if workers <= 1:
+        for chunk in chunks:
+            yield _format_chunk(chunk, *args)
+        return
+
+    # Diimpor di sini supaya mode single-number tidak memuat multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    from collections import deque
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_format_chunk, chunk, *args))
+            # Batasi chunk in-flight supaya memori tetap datar
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def check_phones_batch(source, session_id, output=None, workers=None, column=None, lookups=False):
+    """Bulk phone pipeline: CSV/teks masuk, dedup E.164, CSV/JSONL diperkaya keluar (streaming)"""
+    import csv
+    import itertools
+    if output is None:
+        output = f"result/phone_batch_{session_id}.jsonl"
+    if workers is None:
+        large = source != '-' and os.path.getsize(source) >= PARALLEL_THRESHOLD
+        workers = (os.cpu_count() or 1) if large else 1
+    out = sys.stdout if output == '-' else open(output, 'a', encoding='utf-8', newline='')
+    status = sys.stderr if out is sys.stdout else sys.stdout
+    
+    print(f"\n{Colors.BOLD}[*] Bulk phone analysis from: {Colors.CYAN}{source}{Colors.END}", file=status)
+    print(f"{Colors.YELLOW}[*] Workers: {workers}{Colors.END}", file=status)
+    
+    stats = {'rows': 0, 'written': 0, 'duplicates': 0, 'invalid': 0}
+    start_time = time.time()
+    seen = _SeenNumbers()
+    
+    rows = iter_phone_rows(source, column)
+    fields = None
+    if output.lower().endswith('.csv'):
+        # Kolom CSV: kolom input (atau 'original') lalu kolom hasil, header dari row pertama
+        first = next(rows, None)
+        if first is not None:
+            rows = itertools.chain([first], rows)
+            fields = (list(first[1]) if first[1] else ['original']) + RESULT_FIELDS
+            if lookups:
+                fields += list(LOOKUP_COLUMNS.values())
+            # Output dibuka append: header hanya untuk file baru/kosong supaya run ulang tidak menyisipkan header
+            if out is sys.stdout or out.tell() == 0:
+                csv.writer(out).writerow(fields)
+    
+    try:
+        for formatted in _formatted_chunks(_chunks(rows, CHUNK_SIZE), workers, session_id, fields, lookups):
+            fresh = seen.add_new([e164 for e164, _, _ in formatted if e164])
+            lines = []
+            for e164, line, state in formatted:
+                stats['rows'] += 1
+                if e164 is not None:
+                    if e164 not in fresh:
+                        stats['duplicates'] += 1
+                        continue
+                    # Hanya kemunculan pertama yang ditulis
+                    fresh.discard(e164)
+                stats['invalid'] += state == 'invalid'
+                lines.append(line)
+            out.write(''.join(lines))
+            stats['written'] += len(lines)
+    finally:
+        seen.close()
+        if out is not sys.stdout:
+            out.close()
+    
+    scan_duration = time.time() - start_time
+    rate = stats['rows'] / scan_duration if scan_duration else 0
+    print(f"{Colors.GREEN}[✓] {stats['rows']} rows, {stats['written']} unique numbers written{Colors.END}", file=status)
+    print(f"{Colors.YELLOW}[!] Duplicates skipped: {stats['duplicates']} | Invalid: {stats['invalid']}{Colors.END}", file=status)
+    print(f"{Colors.CYAN}[i] {scan_duration:.2f} seconds ({rate:.0f} rows/s){Colors.END}", file=status)
+    if out is not sys.stdout:
+        print(f"{Colors.GREEN}[✓] Results streamed to: {output}{Colors.END}", file=status)
+    log(f"Bulk phone scan: {stats['rows']} rows, {stats['written']} written, output {output}",
+        latency_ms=round(scan_duration * 1000, 1))
+    
+    stats['scan_duration'] = f"{scan_duration:.2f}s"
+    return stats
@@ -1,6 +1,12 @@
 import os
-import hashlib
-from .utils import save_results, generate_report
+import sys
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, as_completed, FIRST_COMPLETED
+from .utils import save_results, generate_report, log
+from .exif import read_metadata
+from .hashing import hash_file
+from .metrics import ScanMetrics
 from .colors import Colors
 
 try:
@@ -10,38 +16,103 @@ try:
 except ImportError:
     PILLOW_AVAILABLE = False
 
+PHOTO_EXTENSIONS = {'.jpg', '.jpeg', '.jpe', '.tif', '.tiff', '.png', '.webp', '.gif', '.bmp', '.heic'}
+IMPORTANT_TAGS = ['Make', 'Model', 'DateTime', 'DateTimeOriginal', 'Software', 'Artist', 'Copyright']
+
+def _decode(value):
+    if isinstance(value, bytes):
+        return value.decode('utf-8', errors='ignore').strip().strip('\x00')
+    return value
+
+def _convert_to_degrees(value):
+    d, m, s = value
+    return float(d) + float(m) / 60 + float(s) / 3600
+
+def _read_metadata(photo_path):
+    # Fast path: baca header JPEG/TIFF saja, Pillow hanya untuk format lain
+    metadata = read_metadata(photo_path)
+    if metadata is None:
+        with Image.open(photo_path) as img:
+            metadata = {
+                'format': img.format,
+                'width': img.size[0],
+                'height': img.size[1],
+                'mode': img.mode,
+                'exif': img._getexif() if hasattr(img, '_getexif') else None
+            }
+    return metadata
+
+def analyze_photo(photo_path, algorithms=('md5', 'sha256'), metrics=None):
+    """Ekstrak file info, EXIF, GPS dan hash satu foto tanpa output ke terminal"""
+    if metrics is None:
+        metadata = _read_metadata(photo_path)
+        hashes = hash_file(photo_path, algorithms)
+    else:
+        with metrics.stage('metadata'):
+            metadata = _read_metadata(photo_path)
+        with metrics.stage('hashing'):
+            hashes = hash_file(photo_path, algorithms)
+    
+    size_bytes = os.path.getsize(photo_path)
+    results = {
+        'target': photo_path,
+        'file_info': {
+            'filename': os.path.basename(photo_path),
+            'size_bytes': size_bytes,
+            'size_kb': round(size_bytes / 1024, 2),
+            'dimensions': f"{metadata['width']}x{metadata['height']}",
+            'format': metadata['format'],
+            'mode': metadata['mode']
+        },
+        'exif_data': {},
+        'gps_data': {},
+        'hashes': hashes
+    }
+    
+    for tag_id, value in (metadata['exif'] or {}).items():
+        tag = TAGS.get(tag_id, tag_id)
+        if tag == 'GPSInfo' and isinstance(value, dict):
+            results['gps_data'] = {GPSTAGS.get(gps_tag_id, gps_tag_id): _decode(gps_value)
+                                   for gps_tag_id, gps_value in value.items()}
+        else:
+            results['exif_data'][tag] = str(_decode(value))
+    
+    gps_data = results['gps_data']
+    if 'GPSLatitude' in gps_data and 'GPSLongitude' in gps_data:
+        try:
+            lat = _convert_to_degrees(gps_data['GPSLatitude'])
+            lon = _convert_to_degrees(gps_data['GPSLongitude'])
+            
+            if gps_data.get('GPSLatitudeRef') == 'S':
+                lat = -lat
+            if gps_data.get('GPSLongitudeRef') == 'W':
+                lon = -lon
+            
+            results['gps_decimal'] = {'latitude': lat, 'longitude': lon}
+        except (ValueError, TypeError):
+            pass
+    
+    return results
+
 def check_photo(photo_path, session_id):
     """Photo EXIF and metadata analysis"""
+    metrics = ScanMetrics('photo')
     if not PILLOW_AVAILABLE:
         print(f"{Colors.RED}[!] Pillow library not installed{Colors.END}")
         print(f"{Colors.YELLOW}[!] Install: pip install Pillow{Colors.END}")
         return None
     
+    if os.path.isdir(photo_path):
+        return check_photo_directory(photo_path, session_id)
+    
     print(f"\n{Colors.BOLD}[*] Analyzing photo: {Colors.CYAN}{photo_path}{Colors.END}")
     
     if not os.path.exists(photo_path):
         print(f"{Colors.RED}[!] File not found{Colors.END}")
         return None
     
-    results = {
-        'target': photo_path,
-        'file_info': {},
-        'exif_data': {},
-        'gps_data': {},
-        'hashes': {}
-    }
-    
     try:
-        img = Image.open(photo_path)
-        
-        results['file_info'] = {
-            'filename': os.path.basename(photo_path),
-            'size_bytes': os.path.getsize(photo_path),
-            'size_kb': round(os.path.getsize(photo_path) / 1024, 2),
-            'dimensions': f"{img.size[0]}x{img.size[1]}",
-            'format': img.format,
-            'mode': img.mode
-        }
+        results = analyze_photo(photo_path, metrics=metrics)
         
         print(f"\n{Colors.BOLD}[*] File Information:{Colors.END}")
         print(f"  {Colors.GREEN}[+] Filename: {results['file_info']['filename']}{Colors.END}")
@@ -50,66 +121,25 @@ def check_photo(photo_path, session_id):
         print(f"  {Colors.GREEN}[+] Format: {results['file_info']['format']}{Colors.END}")
         
         print(f"\n{Colors.BOLD}[*] File Hashes:{Colors.END}")
-        with open(photo_path, 'rb') as f:
-            file_data = f.read()
-            results['hashes'] = {
-                'md5': hashlib.md5(file_data).hexdigest(),
-                'sha256': hashlib.sha256(file_data).hexdigest()
-            }
-        
         print(f"  {Colors.CYAN}MD5:    {results['hashes']['md5']}{Colors.END}")
         print(f"  {Colors.CYAN}SHA256: {results['hashes']['sha256'][:50]}...{Colors.END}")
         
-        exif = img._getexif()
-        if exif:
+        if results['exif_data'] or results['gps_data']:
             print(f"\n{Colors.BOLD}[*] EXIF Data Found:{Colors.END}")
             
-            for tag_id, value in exif.items():
-                tag = TAGS.get(tag_id, tag_id)
-                
-                if tag == 'GPSInfo':
-                    gps_data = {}
-                    for gps_tag_id, gps_value in value.items():
-                        sub_tag = GPSTAGS.get(gps_tag_id, gps_tag_id)
-                        if isinstance(gps_value, bytes):
-                            gps_data[sub_tag] = gps_value.decode('utf-8', errors='ignore').strip().strip('\x00')
-                        else:
-                            gps_data[sub_tag] = gps_value
-                    
-                    results['gps_data'] = gps_data
-                    
-                    if 'GPSLatitude' in gps_data and 'GPSLongitude' in gps_data:
-                        try:
-                            def convert_to_degrees(value):
-                                d, m, s = value
-                                return float(d) + float(m) / 60 + float(s) / 3600
-                            
-                            lat = convert_to_degrees(gps_data['GPSLatitude'])
-                            lon = convert_to_degrees(gps_data['GPSLongitude'])
-                            
-                            if gps_data.get('GPSLatitudeRef') == 'S':
-                                lat = -lat
-                            if gps_data.get('GPSLongitudeRef') == 'W':
-                                lon = -lon
-                            
-                            results['gps_decimal'] = {'latitude': lat, 'longitude': lon}
-                            
-                            print(f"  {Colors.GREEN}[✓] GPS Location Found!{Colors.END}")
-                            print(f"      Latitude: {lat}")
-                            print(f"      Longitude: {lon}")
-                            print(f"      {Colors.CYAN}Google Maps: https://maps.google.com/?q={lat},{lon}{Colors.END}")
-                        except (ValueError, TypeError):
-                            print(f"  {Colors.YELLOW}[!] Could not parse GPS coordinates.{Colors.END}")
-                else:
-                    if isinstance(value, bytes):
-                        value = value.decode('utf-8', errors='ignore').strip().strip('\x00')
-                    
-                    results['exif_data'][tag] = str(value)
-                    
-                    important_tags = ['Make', 'Model', 'DateTime', 'DateTimeOriginal', 
-                                    'Software', 'Artist', 'Copyright']
-                    if tag in important_tags:
-                        print(f"  {Colors.CYAN}{tag}: {value}{Colors.END}")
+            for tag, value in results['exif_data'].items():
+                if tag in IMPORTANT_TAGS:
+                    print(f"  {Colors.CYAN}{tag}: {value}{Colors.END}")
+            
+            if 'gps_decimal' in results:
+                lat = results['gps_decimal']['latitude']
+                lon = results['gps_decimal']['longitude']
+                print(f"  {Colors.GREEN}[✓] GPS Location Found!{Colors.END}")
+                print(f"      Latitude: {lat}")
+                print(f"      Longitude: {lon}")
+                print(f"      {Colors.CYAN}Google Maps: https://maps.google.com/?q={lat},{lon}{Colors.END}")
+            elif 'GPSLatitude' in results['gps_data'] and 'GPSLongitude' in results['gps_data']:
+                print(f"  {Colors.YELLOW}[!] Could not parse GPS coordinates.{Colors.END}")
         else:
             print(f"\n{Colors.YELLOW}[!] No EXIF data found{Colors.END}")
         
@@ -124,13 +154,104 @@ def check_photo(photo_path, session_id):
         for search in searches:
             print(f"  {Colors.CYAN}→ {search}{Colors.END}")
         
-        img.close()
-        
-        save_results('photo', results, session_id)
+        save_results('photo', results, session_id, metrics=metrics)
         generate_report('photo', results, session_id)
         
         return results
-        
+    
     except Exception as e:
         print(f"{Colors.RED}[!] Error analyzing photo: {e}{Colors.END}")
         return None
+
+def iter_photos(directory):
+    """Cari file foto secara rekursif (streaming, tanpa membangun list)"""
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() in PHOTO_EXTENSIONS:
+                yield os.path.join(root, name)
+
+def _analyze_worker(photo_path):
+    start = time.perf_counter()
+    try:
+        return photo_path, analyze_photo(photo_path), None, time.perf_counter() - start
+    except Exception as e:
+        return photo_path, None, f"{type(e).__name__}: {e}", time.perf_counter() - start
+
+def check_photo_directory(directory, session_id, output=None, workers=None):
+    """Analisis semua foto di folder secara paralel (process pool) ke satu file JSONL"""
+    if not PILLOW_AVAILABLE:
+        print(f"{Colors.RED}[!] Pillow library not installed{Colors.END}")
+        return None
+    
+    if output is None:
+        output = f"result/photo_corpus_{session_id}.jsonl"
+    workers = workers or os.cpu_count() or 1
+    out = sys.stdout if output == '-' else open(output, 'a', encoding='utf-8')
+    status = sys.stderr if out is sys.stdout else sys.stdout
+    
+    print(f"\n{Colors.BOLD}[*] Analyzing photo directory: {Colors.CYAN}{directory}{Colors.END}", file=status)
+    print(f"{Colors.YELLOW}[*] Workers: {workers}{Colors.END}", file=status)
+    
+    stats = {'files': 0, 'errors': 0, 'bytes': 0, 'gps': 0}
+    metrics = ScanMetrics('photo_corpus')
+    start_time = time.time()
+    last_progress = start_time
+
+    def write_record(photo_path, results, error, duration):
+        # Durasi diukur di worker process, dicatat di sini
+        metrics.record('analyze_file', duration, 'error' if error else 'ok')
+        record = {'session_id': session_id, 'path': photo_path, 'status': 'error' if error else 'ok'}
+        stats['files'] += 1
+        if error:
+            record['error'] = error
+            stats['errors'] += 1
+        else:
+            record.update(results)
+            stats['bytes'] += results['file_info']['size_bytes']
+            stats['gps'] += 'gps_decimal' in results
+        out.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+
+    def progress(final=False):
+        nonlocal last_progress
+        now = time.time()
+        if not final and now - last_progress < 0.5:
+            return
+        last_progress = now
+        elapsed = max(now - start_time, 1e-6)
+        line = (f"\r  {Colors.CYAN}[i] {stats['files']} files | {stats['errors']} errors | "
+                f"{stats['files'] / elapsed:.1f} files/s | {stats['bytes'] / elapsed / 1048576:.1f} MB/s{Colors.END}")
+        print(line, end='\n' if final else '', file=status, flush=True)
+    
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = set()
+            for photo_path in iter_photos(directory):
+                pending.add(executor.submit(_analyze_worker, photo_path))
+                # Batasi jumlah future supaya memori tetap datar untuk folder besar
+                if len(pending) >= workers * 4:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        write_record(*future.result())
+                progress()
+            # Batch terakhir: urut selesai supaya progress tetap berjalan sampai total
+            for future in as_completed(pending):
+                write_record(*future.result())
+                progress()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    
+    progress(final=True)
+    scan_duration = time.time() - start_time
+    print(f"\n{Colors.GREEN}[✓] Analyzed {stats['files'] - stats['errors']} of {stats['files']} files "
+          f"({stats['gps']} with GPS) in {scan_duration:.2f} seconds{Colors.END}", file=status)
+    if stats['errors']:
+        print(f"{Colors.YELLOW}[!] Errors: {stats['errors']} (see 'error' records){Colors.END}", file=status)
+    if out is not sys.stdout:
+        print(f"{Colors.GREEN}[✓] Results streamed to: {output}{Colors.END}", file=status)
+    log(f"Photo corpus scan: {stats['files']} files, {stats['errors']} errors, output {output}",
+        latency_ms=round(scan_duration * 1000, 1), timings=metrics.summary()['requests'])
+    
+    stats['scan_duration'] = f"{scan_duration:.2f}s"
+    return stats
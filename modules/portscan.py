@@ -0,0 +1,157 @@
+import os
+import errno
+import socket
+import selectors
+import ipaddress
+import time
+
+DEFAULT_SCOPE_FILE = os.path.join('data', 'scope.txt')
+DEFAULT_IN_FLIGHT = 256
+MIN_TIMEOUT = 0.3
+MAX_TIMEOUT = 2.0
+
+class ScopeError(Exception):
+    """Target tidak ada di scope file yang diizinkan"""
+
+def load_scope(path=None):
+    """Baca scope file: satu IP atau CIDR per baris, '#' untuk komentar"""
+    path = path or DEFAULT_SCOPE_FILE
+    if not os.path.exists(path):
+        raise ScopeError(f"Scope file not found: {path}")
+
+    networks = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            entry = line.split('#', 1)[0].strip()
+            if entry:
+                try:
+                    networks.append(ipaddress.ip_network(entry, strict=False))
+                except ValueError:
+                    raise ScopeError(f"Invalid scope entry: {entry}")
+    return networks
+
+def ensure_in_scope(ip, scope_file=None):
+    """Raise ScopeError jika ip tidak termasuk scope file"""
+    address = ipaddress.ip_address(ip)
+    networks = load_scope(scope_file)
+    if not any(address in network for network in networks):
+        raise ScopeError(f"{ip} is not listed in scope file {scope_file or DEFAULT_SCOPE_FILE}")
+
+def parse_ports(spec):
+    """Parse daftar port seperti '22,80,8000-8100' menjadi list terurut"""
+    ports = set()
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            start, end = (int(p) for p in part.split('-', 1))
+            ports.update(range(start, end + 1))
+        else:
+            ports.add(int(part))
+    invalid = [p for p in ports if not 0 < p < 65536]
+    if invalid:
+        raise ValueError(f"Invalid port: {invalid[0]}")
+    return sorted(ports)
+
+class PortScanner:
+    """TCP connect scanner non-blocking berbasis selectors dalam satu thread.
+
+    Timeout tiap connect dihitung ulang dari RTT yang terukur (SYN/ACK atau
+    RST) dengan rumus RTO ala TCP, dibatasi antara min_timeout dan max_timeout.
+    """
+
+    def __init__(self, max_in_flight=DEFAULT_IN_FLIGHT, min_timeout=MIN_TIMEOUT, max_timeout=MAX_TIMEOUT):
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self._srtt = None
+        self._rttvar = None
+
+    @property
+    def timeout(self):
+        if self._srtt is None:
+            return self.max_timeout
+        rto = self._srtt + 4 * self._rttvar
+        return min(self.max_timeout, max(self.min_timeout, rto))
+
+    def _observe_rtt(self, rtt):
+        if self._srtt is None:
+            self._srtt, self._rttvar = rtt, rtt / 2
+        else:
+            self._rttvar = 0.75 * self._rttvar + 0.25 * abs(self._srtt - rtt)
+            self._srtt = 0.875 * self._srtt + 0.125 * rtt
+
+    def scan(self, ip, ports, on_open=None):
+        """Scan port; return dict port -> 'open' / 'closed' / 'filtered'"""
+        family = socket.AF_INET6 if ipaddress.ip_address(ip).version == 6 else socket.AF_INET
+        states = {}
+        queue = iter(ports)
+        exhausted = False
+        retry_port = None
+        in_flight = {}
+        selector = selectors.DefaultSelector()
+
+        try:
+            while True:
+                while not exhausted and len(in_flight) < self.max_in_flight:
+                    port, retry_port = (retry_port, None) if retry_port is not None else (next(queue, None), None)
+                    if port is None:
+                        exhausted = True
+                        break
+                    try:
+                        sock = socket.socket(family, socket.SOCK_STREAM)
+                    except OSError as e:
+                        if e.errno not in (errno.EMFILE, errno.ENFILE) or not in_flight:
+                            raise
+                        # Batas file descriptor tercapai: kecilkan jumlah in-flight dan coba lagi nanti
+                        self.max_in_flight = len(in_flight)
+                        retry_port = port
+                        break
+                    sock.setblocking(False)
+                    start = time.monotonic()
+                    err = sock.connect_ex((ip, port))
+                    if err not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY):
+                        sock.close()
+                        # ENETUNREACH/EHOSTUNREACH dll. tidak berarti port tertutup
+                        states[port] = 'closed' if err == errno.ECONNREFUSED else 'filtered'
+                        continue
+                    in_flight[sock] = (port, start, start + self.timeout)
+                    selector.register(sock, selectors.EVENT_WRITE)
+
+                if not in_flight:
+                    break
+
+                now = time.monotonic()
+                wait = max(0.0, min(deadline for _, _, deadline in in_flight.values()) - now)
+                for key, _ in selector.select(timeout=wait):
+                    sock = key.fileobj
+                    port, start, _ = in_flight.pop(sock)
+                    err = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                    selector.unregister(sock)
+                    sock.close()
+                    if err == 0:
+                        states[port] = 'open'
+                        self._observe_rtt(time.monotonic() - start)
+                        if on_open:
+                            on_open(port)
+                    elif err == errno.ECONNREFUSED:
+                        states[port] = 'closed'
+                        self._observe_rtt(time.monotonic() - start)
+                    else:
+                        states[port] = 'filtered'
+
+                now = time.monotonic()
+                for sock, (port, _, deadline) in list(in_flight.items()):
+                    if deadline <= now:
+                        del in_flight[sock]
+                        selector.unregister(sock)
+                        sock.close()
+                        states[port] = 'filtered'
+        finally:
+            for sock in in_flight:
+                selector.unregister(sock)
+                sock.close()
+            selector.close()
+
+        return states
@@ -0,0 +1,158 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+# Status yang di-retry; 429/503 juga menurunkan rate host
+RETRY_STATUSES = (429, 502, 503, 504)
+THROTTLE_STATUSES = (429, 503)
+MAX_RETRIES = 3
+RETRY_DEADLINE = 30.0
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 10.0
+
+# Host tanpa throttle tidak dibatasi; setelah throttle rate dimulai dari separuh rate yang terukur
+INITIAL_RATE = 1.0
+MIN_RATE = 0.2
+MAX_RATE = 100.0
+DECREASE = 0.5
+INCREASE = 1.05
+BURST = 5
+
+FAILURE_THRESHOLD = 5
+OPEN_SECONDS = 30.0
+
+class ThrottledError(Exception):
+    """Host menolak request (429/503 atau deadline retry habis); hasilnya bukan 'not found'"""
+
+
+class CircuitOpenError(ThrottledError):
+    """Host sedang diblokir circuit breaker karena gagal berturut-turut"""
+
+
+def parse_retry_after(value):
+    """Header Retry-After (detik atau HTTP-date) ke detik, None jika tidak valid"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+def backoff_delay(attempt, retry_after=None):
+    """Exponential backoff dengan jitter, minimal sebesar Retry-After"""
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)) * random.uniform(0.5, 1.0)
+    return max(delay, retry_after or 0.0)
+
+class HostLimiter:
+    """Token bucket adaptif dan circuit breaker untuk satu host.
+
+    Selama host tidak pernah throttle, request tidak ditahan sama sekali.
+    Setelah 429/503 rate turun multiplikatif, lalu naik perlahan setiap
+    request sukses sampai MAX_RATE (kembali tanpa batas).
+    """
+
+    def __init__(self, host):
+        self.host = host
+        self.rate = None
+        self.tokens = 0.0
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.failures = 0
+        self.open_until = 0.0
+        # Saat half-open hanya satu request percobaan yang boleh lewat
+        self.probe_started = None
+        self._window_start = self.updated
+        self._window_count = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, deadline):
+        """Tunggu giliran kirim; raise ThrottledError jika giliran jatuh setelah deadline"""
+        with self._lock:
+            now = time.monotonic()
+            if now < self.open_until:
+                raise CircuitOpenError(f"Circuit open for {self.host} ({self.open_until - now:.0f}s left)")
+            # Percobaan yang tidak pernah melapor hasil dianggap hilang setelah OPEN_SECONDS
+            trial = self.open_until > 0 and (self.probe_started is None or now - self.probe_started > OPEN_SECONDS)
+            if self.open_until and not trial:
+                raise CircuitOpenError(f"Circuit half-open for {self.host}, trial request in flight")
+            wait = max(0.0, self.blocked_until - now)
+            if self.rate is not None:
+                self.tokens = min(BURST, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                self.tokens -= 1
+                if self.tokens < 0:
+                    wait = max(wait, -self.tokens / self.rate)
+            if now + wait > deadline:
+                if self.rate is not None:
+                    self.tokens += 1
+                raise ThrottledError(f"Rate limit for {self.host} exceeds request deadline")
+
+            if trial:
+                self.probe_started = now
+            if now - self._window_start >= 1.0:
+                self._window_start, self._window_count = now, 0
+            self._window_count += 1
+        if wait:
+            time.sleep(wait)
+
+    def throttled(self, retry_after=None):
+        with self._lock:
+            now = time.monotonic()
+            if self.rate is None:
+                observed = self._window_count / max(now - self._window_start, 1.0)
+                self.rate = max(INITIAL_RATE, observed * DECREASE)
+            else:
+                self.rate = max(MIN_RATE, self.rate * DECREASE)
+            self.tokens = min(self.tokens, 0.0)
+            self.updated = now
+            if retry_after:
+                self.blocked_until = max(self.blocked_until, now + retry_after)
+            # Host menjawab; retry berikutnya menjadi percobaan baru
+            self.probe_started = None
+
+    def success(self):
+        with self._lock:
+            self.failures = 0
+            self.open_until = 0.0
+            self.probe_started = None
+            if self.rate is not None:
+                self.rate *= INCREASE
+                if self.rate >= MAX_RATE:
+                    self.rate = None
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            self.probe_started = None
+            if self.failures >= FAILURE_THRESHOLD:
+                # Setelah OPEN_SECONDS satu request percobaan lolos; gagal lagi langsung membuka circuit
+                self.open_until = time.monotonic() + OPEN_SECONDS
+
+
+class RateLimiter:
+    """Kumpulan HostLimiter, dibuat saat host pertama kali dipakai"""
+
+    def __init__(self):
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def host(self, host):
+        limiter = self._hosts.get(host)
+        if limiter is None:
+            with self._lock:
+                limiter = self._hosts.setdefault(host, HostLimiter(host))
+        return limiter
+
+    def stats(self):
+        """Host yang sedang dibatasi atau circuit-nya terbuka"""
+        now = time.monotonic()
+        return {
+            host: {'rate': round(limiter.rate, 2) if limiter.rate else None,
+                   'circuit_open': limiter.open_until > now, 'failures': limiter.failures}
+            for host, limiter in list(self._hosts.items())
+            if limiter.rate is not None or limiter.failures
+        }
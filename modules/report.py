@@ -0,0 +1,106 @@
+import os
+import re
+import html
+from datetime import datetime
+from .store import store
+
+PAGE_SIZE = 50
+
+STYLE = """
+        body { font-family: Arial; margin: 20px; background: #f5f5f5; }
+        .header { background: #2c3e50; color: white; padding: 20px; border-radius: 5px; }
+        .section { background: white; margin: 20px 0; padding: 20px; border-radius: 5px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }
+        .nav { margin: 20px 0; }
+        .nav a { margin-right: 15px; }
+        pre { white-space: pre-wrap; word-break: break-all; background: #ecf0f1; padding: 10px; border-radius: 3px; }
+        table { width: 100%; border-collapse: collapse; }
+        th, td { padding: 10px; text-align: left; border-bottom: 1px solid #ddd; }
+        th { background: #34495e; color: white; }
+"""
+
+def _page_name(base, page):
+    return f"{base}.html" if page == 1 else f"{base}_p{page}.html"
+
+def _write_header(f, title, subtitle, page):
+    f.write(f"""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>XTrace Report - {html.escape(title)} (page {page})</title>
+    <style>{STYLE}    </style>
+</head>
+<body>
+    <div class="header">
+        <h1>XTrace v3.0 - OSINT Report</h1>
+        <p>{html.escape(subtitle)} | Page {page}</p>
+        <p>Generated: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}</p>
+    </div>
+""")
+
+def _write_footer(f, base, page, has_next):
+    links = []
+    if page > 1:
+        links.append(f'<a href="{os.path.basename(_page_name(base, page - 1))}">&laquo; Previous</a>')
+    if has_next:
+        links.append(f'<a href="{os.path.basename(_page_name(base, page + 1))}">Next &raquo;</a>')
+    f.write(f'    <div class="nav">{" ".join(links)}</div>\n</body>\n</html>\n')
+
+def render_report(rows, base, title, subtitle, page_size=PAGE_SIZE):
+    """Tulis row hasil ke HTML berhalaman secara streaming; return list file halaman.
+
+    Row diambil dari result store dengan raw=True, jadi payload JSON yang
+    tersimpan langsung ditulis tanpa serialisasi ulang.
+    """
+    files = []
+    f = None
+    page = 0
+    count = 0
+
+    try:
+        for row in rows:
+            if f is not None and count == page_size:
+                # Halaman penuh dan masih ada row: tutup dengan link ke halaman berikutnya
+                _write_footer(f, base, page, True)
+                f.close()
+                f = None
+            if f is None:
+                page += 1
+                count = 0
+                files.append(_page_name(base, page))
+                f = open(files[-1], 'w', encoding='utf-8')
+                _write_header(f, title, subtitle, page)
+
+            f.write(f"""    <div class="section">
+        <h2>#{row['id']} {html.escape(row['mode'].upper())} - {html.escape(row['target'])}</h2>
+        <p>Session: {html.escape(row['session_id'])} | {html.escape(row['timestamp'][:19])}</p>
+        <pre>{html.escape(row['payload'])}</pre>
+    </div>
+""")
+            count += 1
+
+        if f is not None:
+            _write_footer(f, base, page, False)
+    finally:
+        if f is not None:
+            f.close()
+
+    return files
+
+def _safe_name(value):
+    return re.sub(r'[^\w.@+-]', '_', value)[:80]
+
+def render_query_report(session_id=None, target=None, directory='reports', page_size=PAGE_SIZE):
+    """Render report untuk satu session dan/atau target langsung dari result store"""
+    os.makedirs(directory, exist_ok=True)
+    parts = []
+    if session_id:
+        parts.append(f"session_{_safe_name(session_id)}")
+    if target:
+        parts.append(f"target_{_safe_name(target)}")
+    base = os.path.join(directory, '_'.join(parts) or 'all')
+    subtitle = ' | '.join(filter(None, [
+        f"Session: {session_id}" if session_id else None,
+        f"Target: {target}" if target else None,
+    ])) or 'All results'
+    rows = store.iter_rows(session_id=session_id, target=target, raw=True)
+    return render_report(rows, base, session_id or target or 'all', subtitle, page_size)
@@ -0,0 +1,95 @@
+import socket
+import threading
+from concurrent.futures import Future
+from .cache import cache
+
+try:
+    import dns.resolver
+    DNS_AVAILABLE = True
+except ImportError:
+    DNS_AVAILABLE = False
+
+class DNSLookupError(Exception):
+    """Query DNS gagal (termasuk hasil negative cache)"""
+
+def resolve_host(host):
+    """socket.gethostbyname dengan cache"""
+    hit, value = cache.get('dns', f"host:{host}")
+    if hit:
+        if value is None:
+            raise socket.gaierror(f"Cannot resolve {host} (cached)")
+        return value
+
+    try:
+        ip = socket.gethostbyname(host)
+    except socket.gaierror:
+        cache.set('dns', f"host:{host}", None, ttl=cache.ttls['dns_negative'])
+        raise
+    cache.set('dns', f"host:{host}", ip)
+    return ip
+
+def resolve_records(domain, record_type):
+    """dns.resolver.resolve dengan cache; return list record dalam bentuk string"""
+    if not DNS_AVAILABLE:
+        raise DNSLookupError("dnspython not installed")
+
+    key = f"{record_type}:{domain}"
+    hit, value = cache.get('dns', key)
+    if hit:
+        if value is None:
+            raise DNSLookupError(f"No {record_type} records for {domain} (cached)")
+        return value
+
+    try:
+        answers = dns.resolver.resolve(domain, record_type)
+    except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer, dns.resolver.NoNameservers) as e:
+        cache.set('dns', key, None, ttl=cache.ttls['dns_negative'])
+        raise DNSLookupError(str(e))
+    except dns.exception.DNSException as e:
+        raise DNSLookupError(str(e))
+
+    records = [str(rdata) for rdata in answers]
+    cache.set('dns', key, records, ttl=min(answers.rrset.ttl, cache.ttls['dns']) if answers.rrset else None)
+    return records
+
+class SharedLookups:
+    """Memo in-process untuk batch scan: lookup yang sama dari banyak domain hanya dikirim sekali.
+
+    Lookup yang sedang berjalan juga dibagi: thread lain yang meminta key yang
+    sama menunggu Future milik thread pertama, bukan mengirim query baru.
+    Hasil negatif ikut di-memo. Memo dikosongkan saat melewati max_entries.
+    """
+
+    def __init__(self, max_entries=100000):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._futures = {}
+
+    def _get(self, key, func, *args):
+        with self._lock:
+            future = self._futures.get(key)
+            owner = future is None
+            if owner:
+                if len(self._futures) >= self.max_entries:
+                    self._futures.clear()
+                future = self._futures[key] = Future()
+                self.misses += 1
+            else:
+                self.hits += 1
+        if owner:
+            try:
+                future.set_result(func(*args))
+            except Exception as e:
+                future.set_exception(e)
+        return future.result()
+
+    def host(self, host):
+        return self._get(('host', host), resolve_host, host)
+
+    def records(self, domain, record_type):
+        return self._get((record_type, domain), resolve_records, domain, record_type)
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._futures)}
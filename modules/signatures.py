@@ -0,0 +1,131 @@
+import os
+import re
+import json
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+DEFAULT_SIGNATURES = os.path.join(DATA_DIR, 'signatures.json')
+READ_SIZE = 8192
+# Byte terakhir chunk sebelumnya ikut dicari lagi supaya pattern yang terpotong batas chunk tetap cocok
+OVERLAP = 512
+
+FOUND = 'found'
+NOT_FOUND = 'not_found'
+
+def _compile(patterns):
+    return [re.compile(pattern.encode('utf-8'), re.IGNORECASE) for pattern in patterns]
+
+class Signature:
+    """Aturan satu platform: status, URL redirect dan byte pattern di awal body"""
+
+    __slots__ = ('found_status', 'follow_redirects', 'max_bytes', 'missing_url', 'missing_patterns',
+                 'found_patterns')
+
+    def __init__(self, rules):
+        self.found_status = frozenset(rules['found_status'])
+        self.follow_redirects = rules['follow_redirects']
+        self.max_bytes = rules['max_bytes']
+        self.missing_url = [re.compile(pattern, re.IGNORECASE) for pattern in rules['missing_url']]
+        self.missing_patterns = _compile(rules['missing_patterns'])
+        self.found_patterns = _compile(rules['found_patterns'])
+
+    def check_head(self, status, url=None):
+        """Verdict dari status dan URL tujuan redirect, atau None jika body perlu dibaca.
+
+        ``url`` hanya diisi jika request di-redirect (Location atau URL akhir
+        yang berbeda), supaya pattern tidak mencocokkan username di URL request.
+        """
+        if url and any(pattern.search(url) for pattern in self.missing_url):
+            return NOT_FOUND, 'missing_url'
+        if status not in self.found_status:
+            return NOT_FOUND, f"status_{status}"
+        if not self.missing_patterns and not self.found_patterns:
+            return FOUND, f"status_{status}"
+        return None
+
+    def check_body(self, window):
+        for pattern in self.missing_patterns:
+            if pattern.search(window):
+                return NOT_FOUND, 'missing_pattern'
+        for pattern in self.found_patterns:
+            if pattern.search(window):
+                return FOUND, 'found_pattern'
+        return None
+
+    def inspect(self, response, requested_url=None):
+        """Verdict (found/not_found, alasan) dari response yang di-stream (preload=False).
+
+        Body dibaca per chunk hanya sampai verdict didapat atau max_bytes
+        tercapai. Return juga True jika body sudah habis dibaca (koneksi bisa
+        dipakai ulang), False jika transfer harus dibatalkan.
+        """
+        url = response.headers.get('Location')
+        if not url and response.url != requested_url:
+            url = response.url
+        verdict = self.check_head(response.status, url)
+        if verdict is not None:
+            return verdict, False
+
+        tail = b''
+        remaining = self.max_bytes
+        exhausted = False
+        while remaining > 0:
+            chunk = response.read(min(READ_SIZE, remaining))
+            if not chunk:
+                exhausted = True
+                break
+            remaining -= len(chunk)
+            window = tail + chunk
+            verdict = self.check_body(window)
+            if verdict is not None:
+                return verdict, False
+            tail = window[-OVERLAP:]
+
+        # Body habis atau max_bytes tercapai tanpa pattern yang cocok
+        if self.found_patterns:
+            return (NOT_FOUND, 'no_found_pattern'), exhausted
+        return (FOUND, 'no_missing_pattern'), exhausted
+
+
+class SignatureSet:
+    """Signature per platform dari data file; platform tanpa entry memakai defaults"""
+
+    def __init__(self, data):
+        self.defaults = data.get('defaults', {})
+        self.default = Signature(self._merge({}))
+        self.platforms = {name: Signature(self._merge(rules)) for name, rules in data.get('platforms', {}).items()}
+
+    def _merge(self, rules):
+        merged = {
+            'found_status': [200],
+            'follow_redirects': True,
+            'max_bytes': 16384,
+            'missing_url': [],
+            'missing_patterns': [],
+            'found_patterns': [],
+        }
+        merged.update({key: value for key, value in self.defaults.items()})
+        for key, value in rules.items():
+            # Daftar pattern platform ditambahkan ke default, nilai lain menimpa
+            if key in ('missing_url', 'missing_patterns', 'found_patterns'):
+                merged[key] = list(merged[key]) + list(value)
+            else:
+                merged[key] = value
+        return merged
+
+    @classmethod
+    def load(cls, path=DEFAULT_SIGNATURES):
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def get(self, platform):
+        return self.platforms.get(platform, self.default)
+
+
+_signatures = None
+
+def get_signatures():
+    """SignatureSet bersama, dimuat dari data/signatures.json saat pertama dipakai"""
+    global _signatures
+    if _signatures is None:
+        _signatures = SignatureSet.load()
+    return _signatures
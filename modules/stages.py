@@ -0,0 +1,120 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+DEFAULT_DEADLINE = 60.0
+
+class Stage:
+    """Satu node di graph: fungsi, dependency dan status setelah dijalankan"""
+
+    __slots__ = ('name', 'func', 'after', 'when', 'status', 'result', 'error', 'duration')
+
+    def __init__(self, name, func, after, when):
+        self.name = name
+        self.func = func
+        self.after = tuple(after)
+        self.when = when
+        self.status = 'pending'
+        self.result = None
+        self.error = None
+        self.duration = None
+
+
+class StageGraph:
+    """Dependency graph kecil untuk stage scan yang saling independen.
+
+    Setiap stage dijalankan di thread pool begitu semua dependency-nya selesai
+    dengan status 'ok' (dan predicate ``when`` bernilai true), sehingga total
+    latency mendekati rantai dependency terpanjang. Stage yang belum selesai
+    saat deadline tercapai ditandai 'timeout'; stage yang dependency-nya gagal
+    ditandai 'skipped'.
+    """
+
+    def __init__(self, deadline=DEFAULT_DEADLINE, max_workers=None, executor=None):
+        self.deadline = deadline
+        self.max_workers = max_workers
+        # Executor dari luar (mis. batch mode) dipakai bersama dan tidak di-shutdown di sini
+        self.executor = executor
+        self.stages = {}
+        self.results = {}
+
+    def add(self, name, func, after=(), when=None):
+        """Daftarkan stage; func(results) menerima dict hasil stage yang sudah selesai"""
+        for dependency in after:
+            # Dependency harus didaftarkan lebih dulu, jadi graph selalu acyclic
+            if dependency not in self.stages:
+                raise ValueError(f"Unknown dependency '{dependency}' for stage '{name}'")
+        self.stages[name] = Stage(name, func, after, when)
+
+    def _run_stage(self, stage):
+        start = time.perf_counter()
+        try:
+            return stage.func(self.results)
+        finally:
+            stage.duration = time.perf_counter() - start
+
+    def _ready(self, executor, running):
+        for stage in self.stages.values():
+            if stage.status != 'pending':
+                continue
+            statuses = [self.stages[dependency].status for dependency in stage.after]
+            if any(status in ('error', 'skipped', 'timeout') for status in statuses):
+                stage.status = 'skipped'
+            elif all(status == 'ok' for status in statuses):
+                if stage.when is not None and not stage.when(self.results):
+                    stage.status = 'skipped'
+                else:
+                    stage.status = 'running'
+                    running[executor.submit(self._run_stage, stage)] = stage
+
+    def run(self):
+        """Jalankan semua stage; return dict hasil stage yang berstatus 'ok'"""
+        start = time.monotonic()
+        running = {}
+        executor = self.executor or ThreadPoolExecutor(max_workers=self.max_workers or max(len(self.stages), 1),
+                                                       thread_name_prefix='xtrace-stage')
+        try:
+            while True:
+                # Skip berantai bisa membuka stage lain, jadi ulangi sampai stabil
+                before = None
+                while before != [stage.status for stage in self.stages.values()]:
+                    before = [stage.status for stage in self.stages.values()]
+                    self._ready(executor, running)
+                if not running:
+                    break
+                remaining = None if self.deadline is None else self.deadline - (time.monotonic() - start)
+                if remaining is not None and remaining <= 0:
+                    for stage in running.values():
+                        stage.status = 'timeout'
+                    for stage in self.stages.values():
+                        if stage.status == 'pending':
+                            stage.status = 'skipped'
+                    break
+                done, _ = wait(running, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    try:
+                        stage.result = future.result()
+                        stage.status = 'ok'
+                        self.results[stage.name] = stage.result
+                    except Exception as e:
+                        stage.error = e
+                        stage.status = 'error'
+        finally:
+            # Stage yang timeout dibiarkan selesai sendiri (masing-masing punya timeout socket)
+            if executor is not self.executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+            else:
+                for future in running:
+                    future.cancel()
+        return self.results
+
+    def status(self):
+        """Status dan durasi setiap stage, untuk metadata hasil scan"""
+        return {
+            stage.name: {
+                'status': stage.status,
+                'duration_ms': round(stage.duration * 1000, 2) if stage.duration is not None else None,
+                **({'error': str(stage.error)} if stage.error is not None else {}),
+            }
+            for stage in self.stages.values()
+        }
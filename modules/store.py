@@ -0,0 +1,138 @@
+import os
+import json
+import sqlite3
+import threading
+import time
+
+DEFAULT_PATH = os.path.join('result', 'xtrace.db')
+
+SCHEMA = [
+    'CREATE TABLE IF NOT EXISTS results ('
+    ' id INTEGER PRIMARY KEY AUTOINCREMENT,'
+    ' session_id TEXT NOT NULL, mode TEXT NOT NULL, target TEXT NOT NULL,'
+    ' timestamp TEXT NOT NULL, created REAL NOT NULL, payload TEXT NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS results_created ON results (created)',
+    'CREATE INDEX IF NOT EXISTS results_session ON results (session_id, created)',
+    'CREATE INDEX IF NOT EXISTS results_target ON results (target, created)',
+    'CREATE INDEX IF NOT EXISTS results_mode ON results (mode, created)',
+]
+
+class ResultStore:
+    """Penyimpanan hasil scan berbasis SQLite dengan index per session, mode, target dan waktu"""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            for statement in SCHEMA:
+                self._conn.execute(statement)
+        return self._conn
+
+    def add(self, result_data):
+        """Simpan satu hasil (format sama dengan file JSON lama); return id record"""
+        payload = json.dumps(result_data, ensure_ascii=False, default=str)
+        with self._lock:
+            cursor = self._connect().execute(
+                'INSERT INTO results (session_id, mode, target, timestamp, created, payload) VALUES (?, ?, ?, ?, ?, ?)',
+                (result_data['session_id'], result_data['mode'], str(result_data['target']),
+                 result_data['timestamp'], time.time(), payload)
+            )
+            return cursor.lastrowid
+
+    def _query(self, where='', params=(), order='DESC', limit=None):
+        sql = 'SELECT id, session_id, mode, target, timestamp, payload FROM results'
+        if where:
+            sql += ' WHERE ' + where
+        sql += f' ORDER BY created {order}, id {order}'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params = tuple(params) + (int(limit),)
+        with self._lock:
+            rows = self._connect().execute(sql, params).fetchall()
+        for row_id, session_id, mode, target, timestamp, payload in rows:
+            yield {'id': row_id, 'session_id': session_id, 'mode': mode, 'target': target,
+                   'timestamp': timestamp, 'result': json.loads(payload)}
+
+    def latest(self, limit=10, mode=None):
+        """N hasil terbaru (opsional difilter per mode)"""
+        if mode:
+            return list(self._query('mode = ?', (mode,), limit=limit))
+        return list(self._query(limit=limit))
+
+    def by_target(self, target, limit=None):
+        """Semua hasil untuk satu target, terbaru lebih dulu"""
+        return list(self._query('target = ?', (target,), limit=limit))
+
+    def by_session(self, session_id):
+        """Semua hasil dalam satu session, urut sesuai waktu scan"""
+        return list(self._query('session_id = ?', (session_id,), order='ASC'))
+
+    def get(self, record_id):
+        rows = list(self._query('id = ?', (record_id,)))
+        return rows[0] if rows else None
+
+    def iter_rows(self, session_id=None, target=None, batch_size=500, raw=False):
+        """Iterasi hasil per batch (untuk export/report besar tanpa memuat semuanya).
+
+        Dengan raw=True setiap row berisi 'payload' (JSON string apa adanya)
+        alih-alih 'result', jadi tidak ada decode/encode ulang.
+        """
+        clauses, params = [], []
+        if session_id:
+            clauses.append('session_id = ?')
+            params.append(session_id)
+        if target:
+            clauses.append('target = ?')
+            params.append(target)
+        last_id = 0
+        while True:
+            where = ' AND '.join(clauses + ['id > ?'])
+            sql = ('SELECT id, session_id, mode, target, timestamp, payload FROM results'
+                   f' WHERE {where} ORDER BY id LIMIT ?')
+            with self._lock:
+                rows = self._connect().execute(sql, tuple(params) + (last_id, batch_size)).fetchall()
+            if not rows:
+                return
+            for row_id, session, mode, row_target, timestamp, payload in rows:
+                row = {'id': row_id, 'session_id': session, 'mode': mode, 'target': row_target,
+                       'timestamp': timestamp}
+                if raw:
+                    row['payload'] = payload
+                else:
+                    row['result'] = json.loads(payload)
+                yield row
+            last_id = rows[-1][0]
+
+    def count(self):
+        with self._lock:
+            return self._connect().execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def export_json(self, rows, directory='result'):
+        """Tulis hasil ke file JSON per scan (format lama); return list nama file"""
+        os.makedirs(directory, exist_ok=True)
+        filenames = []
+        for row in rows:
+            stamp = row['timestamp'][:19].replace('-', '').replace(':', '').replace('T', '_')
+            filename = os.path.join(directory, f"{row['mode']}_{stamp}_{row['id']}.json")
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(row['result'], f, indent=4, ensure_ascii=False)
+            filenames.append(filename)
+        return filenames
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+store = ResultStore()
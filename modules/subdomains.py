@@ -0,0 +1,138 @@
+import os
+import asyncio
+import random
+import socket
+import string
+import time
+from .engine import ProbeEngine
+
+try:
+    import dns.asyncresolver
+    import dns.exception
+    DNS_AVAILABLE = True
+except ImportError:
+    DNS_AVAILABLE = False
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+DEFAULT_WORDLIST = os.path.join(DATA_DIR, 'subdomains.txt')
+DEFAULT_CONCURRENCY = 100
+WILDCARD_PROBES = 3
+
+def iter_wordlist(path=None):
+    """Stream label subdomain dari wordlist, satu per baris"""
+    with open(path or DEFAULT_WORDLIST, encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            label = line.strip().lower()
+            if label and not label.startswith('#'):
+                yield label
+
+def make_resolver(nameservers=None, timeout=2.0):
+    """Async resolver dnspython; nameservers berupa list 'ip' atau 'ip:port'"""
+    resolver = dns.asyncresolver.Resolver(configure=not nameservers)
+    if nameservers:
+        addresses = []
+        for server in nameservers:
+            host, _, port = server.partition(':') if server.count(':') == 1 else (server, '', '')
+            addresses.append(host)
+            if port:
+                resolver.port = int(port)
+        resolver.nameservers = addresses
+    resolver.timeout = timeout
+    resolver.lifetime = timeout
+    return resolver
+
+def _make_lookup(nameservers, timeout):
+    if not DNS_AVAILABLE:
+        # Fallback tanpa dnspython: gethostbyname blocking di thread pool engine
+        def lookup(name):
+            try:
+                return sorted(set(socket.gethostbyname_ex(name)[2]))
+            except OSError:
+                return None
+        return lookup
+
+    resolver = make_resolver(nameservers, timeout)
+
+    async def lookup(name):
+        try:
+            answer = await resolver.resolve(name, 'A')
+        except dns.exception.DNSException:
+            return None
+        return sorted(rdata.address for rdata in answer)
+    return lookup
+
+def detect_wildcard(domain, nameservers=None, timeout=2.0):
+    """Resolve label acak; IP yang muncul berarti domain memakai wildcard DNS"""
+    lookup = _make_lookup(nameservers, timeout)
+    labels = (''.join(random.choice(string.ascii_lowercase + string.digits) for _ in range(16))
+              for _ in range(WILDCARD_PROBES))
+    wildcard_ips = set()
+    for _, ips, _ in ProbeEngine(limit=WILDCARD_PROBES).run(
+            ((label, (f"{label}.{domain}",)) for label in labels), lookup):
+        wildcard_ips.update(ips or [])
+    return wildcard_ips
+
+def _timed_lookup(lookup, metrics):
+    """Bungkus lookup supaya setiap query dicatat sebagai request 'subdomain_lookup'"""
+    if asyncio.iscoroutinefunction(lookup):
+        async def timed(name):
+            start = time.perf_counter()
+            ips = await lookup(name)
+            metrics.record('subdomain_lookup', time.perf_counter() - start, 'found' if ips else 'not_found')
+            return ips
+    else:
+        def timed(name):
+            start = time.perf_counter()
+            ips = lookup(name)
+            metrics.record('subdomain_lookup', time.perf_counter() - start, 'found' if ips else 'not_found')
+            return ips
+    return timed
+
+def enumerate_subdomains(domain, wordlist=None, nameservers=None, concurrency=DEFAULT_CONCURRENCY,
+                         timeout=2.0, on_found=None, metrics=None, journal=None, cancel=None):
+    """Enumerasi subdomain dari wordlist dengan deteksi wildcard DNS.
+
+    Wordlist dibaca secara streaming dan hanya ``concurrency`` query yang
+    berjalan bersamaan. Return dict berisi ``found`` (list subdomain + IP),
+    ``wildcard_ips`` dan ``checked``. Dengan ``metrics`` (ScanMetrics) durasi
+    setiap query ikut dicatat. Dengan ``journal`` (JobJournal) setiap query
+    yang selesai dicatat dan query yang sudah ada di journal tidak diulang.
+    Setelah ``cancel`` (threading.Event) di-set tidak ada query baru yang dikirim.
+    """
+    wildcard_ips = detect_wildcard(domain, nameservers, timeout)
+    lookup = _make_lookup(nameservers, timeout)
+    if metrics is not None:
+        lookup = _timed_lookup(lookup, metrics)
+    found = []
+    checked = [0]
+
+    def accept(subdomain, ips):
+        checked[0] += 1
+        if not ips:
+            return
+        # Subdomain yang hanya menunjuk ke IP wildcard dianggap false positive
+        if wildcard_ips and set(ips) <= wildcard_ips:
+            return
+        entry = {'subdomain': subdomain, 'ips': ips}
+        found.append(entry)
+        if on_found:
+            on_found(entry)
+
+    def on_result(subdomain, ips, error):
+        if journal is not None and error is None:
+            journal.record((subdomain,), ips)
+        accept(subdomain, ips)
+
+    if journal is not None:
+        # Hasil dari run sebelumnya yang terhenti
+        for (subdomain,), ips in list(journal.done.items()):
+            accept(subdomain, ips)
+
+    jobs = ((f"{label}.{domain}", (f"{label}.{domain}",)) for label in iter_wordlist(wordlist)
+            if journal is None or (f"{label}.{domain}",) not in journal)
+    if cancel is None and journal is not None:
+        cancel = journal.cancelled
+    ProbeEngine(limit=concurrency).run(jobs, lookup, on_result, cancel=cancel)
+
+    found.sort(key=lambda entry: entry['subdomain'])
+    return {'found': found, 'wildcard_ips': sorted(wildcard_ips), 'checked': checked[0]}
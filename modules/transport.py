@@ -0,0 +1,322 @@
+import http.client
+import threading
+import time
+import zlib
+import urllib.parse
+from .metrics import note_retry
+from .ratelimit import (RETRY_STATUSES, THROTTLE_STATUSES, MAX_RETRIES, RETRY_DEADLINE, ThrottledError,
+                        parse_retry_after, backoff_delay)
+
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+MAX_REDIRECTS = 10
+
+class PoolTimeout(TimeoutError):
+    """Tidak ada slot koneksi yang bebas sebelum deadline request (mis. response yang tidak di-release)"""
+
+
+class PooledResponse:
+    """Response HTTP yang terikat ke koneksi dari pool.
+
+    Body dibaca lewat read(); setelah selesai panggil release() supaya koneksi
+    kembali ke pool (atau ditutup jika tidak bisa dipakai ulang).
+    """
+
+    def __init__(self, transport, key, conn, raw, url):
+        self.url = url
+        self.status = raw.status
+        self.reason = raw.reason
+        self.headers = raw.msg
+        self._transport = transport
+        self._key = key
+        self._conn = conn
+        self._raw = raw
+        self._buffer = b''
+        self._decoder = None
+
+        encoding = (raw.getheader('Content-Encoding') or '').lower()
+        if encoding == 'gzip':
+            self._decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif encoding == 'deflate':
+            self._decoder = zlib.decompressobj()
+
+    def getcode(self):
+        return self.status
+
+    def geturl(self):
+        return self.url
+
+    def read(self, amt=None):
+        """Baca body (sudah di-decode dari gzip/deflate)"""
+        if amt is None:
+            chunks = [self._buffer]
+            self._buffer = b''
+            while True:
+                chunk = self._read_raw(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+            return b''.join(chunks)
+
+        while len(self._buffer) < amt:
+            chunk = self._read_raw(max(amt, 8192))
+            if not chunk:
+                break
+            self._buffer += chunk
+        data, self._buffer = self._buffer[:amt], self._buffer[amt:]
+        return data
+
+    def _read_raw(self, amt):
+        while self._raw is not None and not self._raw.isclosed():
+            try:
+                chunk = self._raw.read(amt)
+            except (http.client.HTTPException, OSError):
+                self.close()
+                return b''
+            if not chunk:
+                break
+            if self._decoder is None:
+                return chunk
+            try:
+                decoded = self._decoder.decompress(chunk)
+            except zlib.error:
+                self.close()
+                return b''
+            if decoded:
+                return decoded
+        if self._decoder is not None:
+            tail, self._decoder = self._decoder.flush(), None
+            return tail
+        return b''
+
+    def release(self):
+        """Kembalikan koneksi ke pool jika body sudah habis dibaca"""
+        if self._conn is None:
+            return
+        reusable = self._raw.isclosed() and self._conn.sock is not None
+        if not reusable:
+            self._raw.close()
+        self._transport._release(self._key, self._conn, reusable)
+        self._conn = None
+
+    def close(self):
+        """Putus koneksi tanpa membaca sisa body (abort transfer)"""
+        if self._conn is None:
+            return
+        self._raw.close()
+        self._transport._release(self._key, self._conn, False)
+        self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class BufferedResponse:
+    """Response yang body-nya sudah ada di memori (mis. dari cache)"""
+
+    def __init__(self, url, status, reason, headers, data):
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = http.client.HTTPMessage()
+        for name, value in headers:
+            self.headers[name] = value
+        self.data = data
+        self._offset = 0
+
+    def getcode(self):
+        return self.status
+
+    def geturl(self):
+        return self.url
+
+    def read(self, amt=None):
+        end = len(self.data) if amt is None else self._offset + amt
+        chunk = self.data[self._offset:end]
+        self._offset += len(chunk)
+        return chunk
+
+    def release(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class HTTPTransport:
+    """HTTP/HTTPS transport dengan connection pool keep-alive per host.
+
+    Dengan limiter (RateLimiter), setiap request menunggu giliran di token
+    bucket host-nya, 429/502/503/504 di-retry dengan backoff sampai deadline,
+    dan host yang terus gagal diblokir circuit breaker.
+    """
+
+    def __init__(self, max_idle_per_host=4, max_connections=64, idle_timeout=30, context=None, limiter=None):
+        self.max_idle_per_host = max_idle_per_host
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        self.context = context
+        self.limiter = limiter
+        self._idle = {}
+        self._active = 0
+        self._cond = threading.Condition()
+
+    def request(self, method, url, body=None, headers=None, timeout=10, preload=True,
+                follow_redirects=True, deadline=RETRY_DEADLINE):
+        """Kirim request; dengan preload=True body langsung dibaca dan koneksi dilepas.
+
+        Raise ThrottledError jika host masih menolak (429/503) setelah retry
+        atau circuit breaker host sedang terbuka.
+        """
+        response = None
+        deadline_at = time.monotonic() + deadline
+        for _ in range(MAX_REDIRECTS + 1):
+            response = self._send_paced(method, url, body, headers or {}, timeout, deadline_at)
+            location = response.headers.get('Location')
+            if not (follow_redirects and response.status in REDIRECT_CODES and location):
+                break
+            # Buang body redirect supaya koneksi bisa dipakai ulang
+            response.read()
+            response.release()
+            url = urllib.parse.urljoin(url, location)
+            if response.status == 303 or (response.status in (301, 302) and method == 'POST'):
+                method, body = 'GET', None
+
+        if preload:
+            response.data = response.read()
+            response.release()
+            response._buffer = response.data
+        return response
+
+    def _send_paced(self, method, url, body, headers, timeout, deadline_at):
+        """_send lewat limiter host, dengan retry untuk status sementara"""
+        if self.limiter is None:
+            return self._send(method, url, body, headers, timeout, deadline_at)
+        parts = urllib.parse.urlsplit(url)
+        host = self.limiter.host(f"{parts.hostname}:{parts.port or (443 if parts.scheme == 'https' else 80)}")
+
+        attempt = 0
+        while True:
+            host.acquire(deadline_at)
+            try:
+                response = self._send(method, url, body, headers, timeout, deadline_at)
+            except PoolTimeout:
+                # Pool penuh di sisi kita, bukan kegagalan host
+                raise
+            except (http.client.HTTPException, OSError):
+                host.failure()
+                raise
+            if response.status not in RETRY_STATUSES:
+                if response.status >= 500:
+                    host.failure()
+                else:
+                    host.success()
+                return response
+
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if response.status in THROTTLE_STATUSES:
+                host.throttled(retry_after)
+            else:
+                host.failure()
+            delay = backoff_delay(attempt, retry_after)
+            # Body error biasanya kecil; dibaca habis supaya koneksi tetap di pool
+            response.read()
+            response.release()
+            if attempt >= MAX_RETRIES or time.monotonic() + delay > deadline_at:
+                # Throttle yang tidak kunjung reda ikut dihitung circuit breaker (502/504 sudah dihitung di atas)
+                if response.status in THROTTLE_STATUSES:
+                    host.failure()
+                raise ThrottledError(f"{host.host} returned {response.status} after {attempt + 1} attempts")
+            note_retry()
+            time.sleep(delay)
+            attempt += 1
+
+    def _send(self, method, url, body, headers, timeout, deadline_at=None):
+        parts = urllib.parse.urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ('http', 'https'):
+            raise ValueError(f"Unsupported URL scheme: {url}")
+        port = parts.port or (443 if scheme == 'https' else 80)
+        key = (scheme, parts.hostname, port)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+
+        conn, reused = self._acquire(key, timeout, deadline_at)
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            raw = conn.getresponse()
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            if not reused:
+                self._release(key, conn, False)
+                raise
+            # Koneksi idle yang sudah ditutup server: coba sekali lagi dengan koneksi baru
+            note_retry()
+            conn = self._new_connection(key, timeout)
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                raw = conn.getresponse()
+            except Exception:
+                conn.close()
+                self._release(key, conn, False)
+                raise
+        except Exception:
+            conn.close()
+            self._release(key, conn, False)
+            raise
+        return PooledResponse(self, key, conn, raw, url)
+
+    def _new_connection(self, key, timeout):
+        scheme, host, port = key
+        if scheme == 'https':
+            return http.client.HTTPSConnection(host, port, timeout=timeout, context=self.context)
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def _acquire(self, key, timeout, deadline_at=None):
+        if deadline_at is None:
+            deadline_at = time.monotonic() + timeout
+        with self._cond:
+            while self._active >= self.max_connections:
+                remaining = deadline_at - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeout(f"No free connection slot for {key[1]} before the request deadline")
+                self._cond.wait(remaining)
+            self._active += 1
+
+            idle = self._idle.get(key)
+            now = time.monotonic()
+            while idle:
+                conn, last_used = idle.pop()
+                if now - last_used <= self.idle_timeout and conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                    conn.timeout = timeout
+                    return conn, True
+                conn.close()
+
+        try:
+            return self._new_connection(key, timeout), False
+        except Exception:
+            self._release(key, None, False)
+            raise
+
+    def _release(self, key, conn, reusable):
+        with self._cond:
+            self._active -= 1
+            idle = self._idle.setdefault(key, [])
+            if reusable and len(idle) < self.max_idle_per_host:
+                idle.append((conn, time.monotonic()))
+                conn = None
+            self._cond.notify()
+        if conn is not None:
+            conn.close()
+
+    def close(self):
+        """Tutup semua koneksi idle"""
+        with self._cond:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn, _ in conns:
+                conn.close()
@@ -1,120 +1,173 @@
+import sys
+import json
 import time
-import threading
 import urllib.parse
 from datetime import datetime
-from .utils import make_request, save_results, generate_report
+from .utils import get_transport, headers, save_results, generate_report, log
+from .signatures import get_signatures, FOUND
+from .engine import ProbeEngine
+from .jobs import open_journal
+from .metrics import ScanMetrics
 from .colors import Colors
 
-def check_username(username, session_id):
+PLATFORMS = {
+    'GitHub': 'https://github.com/{username}',
+    'Reddit': 'https://www.reddit.com/user/{username}',
+    'Twitter/X': 'https://twitter.com/{username}',
+    'Instagram': 'https://www.instagram.com/{username}',
+    'Facebook': 'https://www.facebook.com/{username}',
+    'LinkedIn': 'https://www.linkedin.com/in/{username}',
+    'TikTok': 'https://www.tiktok.com/@{username}',
+    'Snapchat': 'https://www.snapchat.com/add/{username}',
+    'Pinterest': 'https://www.pinterest.com/{username}',
+    'Tumblr': 'https://{username}.tumblr.com',
+    
+    'Medium': 'https://medium.com/@{username}',
+    'YouTube': 'https://www.youtube.com/@{username}',
+    'Twitch': 'https://www.twitch.tv/{username}',
+    'Vimeo': 'https://vimeo.com/{username}',
+    'Dailymotion': 'https://www.dailymotion.com/{username}',
+    
+    'GitLab': 'https://gitlab.com/{username}',
+    'Bitbucket': 'https://bitbucket.org/{username}',
+    'CodePen': 'https://codepen.io/{username}',
+    'Replit': 'https://replit.com/@{username}',
+    'StackOverflow': 'https://stackoverflow.com/users/{username}',
+    'HackerRank': 'https://www.hackerrank.com/{username}',
+    'LeetCode': 'https://leetcode.com/{username}',
+    'CodeForces': 'https://codeforces.com/profile/{username}',
+    'HackerNews': 'https://news.ycombinator.com/user?id={username}',
+    
+    'DeviantArt': 'https://www.deviantart.com/{username}',
+    'Behance': 'https://www.behance.net/{username}',
+    'Dribbble': 'https://dribbble.com/{username}',
+    'ArtStation': 'https://www.artstation.com/{username}',
+    'Flickr': 'https://www.flickr.com/people/{username}',
+    
+    'Spotify': 'https://open.spotify.com/user/{username}',
+    'SoundCloud': 'https://soundcloud.com/{username}',
+    'Bandcamp': 'https://{username}.bandcamp.com',
+    'Mixcloud': 'https://www.mixcloud.com/{username}',
+    
+    'Steam': 'https://steamcommunity.com/id/{username}',
+    'Xbox': 'https://account.xbox.com/en-us/profile?gamertag={username}',
+    'PlayStation': 'https://psnprofiles.com/{username}',
+    'Roblox': 'https://www.roblox.com/users/profile?username={username}',
+    'Epic Games': 'https://www.epicgames.com/site/en-US/{username}',
+    
+    'AngelList': 'https://angel.co/{username}',
+    'Meetup': 'https://www.meetup.com/members/{username}',
+    'SlideShare': 'https://www.slideshare.net/{username}',
+    'ResearchGate': 'https://www.researchgate.net/profile/{username}',
+    'Academia': 'https://independent.academia.edu/{username}',
+    
+    'ProductHunt': 'https://www.producthunt.com/@{username}',
+    'Etsy': 'https://www.etsy.com/shop/{username}',
+    'Patreon': 'https://www.patreon.com/{username}',
+    
+    'Quora': 'https://www.quora.com/profile/{username}',
+    'Scribd': 'https://www.scribd.com/{username}',
+    
+    'About.me': 'https://about.me/{username}',
+    'Linktree': 'https://linktr.ee/{username}',
+    'Gravatar': 'https://gravatar.com/{username}',
+    'Keybase': 'https://keybase.io/{username}',
+    
+    'Kaskus': 'https://www.kaskus.co.id/profile/{username}',
+    'Tokopedia': 'https://www.tokopedia.com/{username}',
+    'Shopee': 'https://shopee.co.id/{username}',
+    'Bukalapak': 'https://www.bukalapak.com/u/{username}',
+    'Lazada': 'https://www.lazada.co.id/shop/{username}',
+}
+
+# Response dengan body sekecil ini dibaca habis supaya koneksinya bisa dipakai ulang
+DRAIN_LIMIT = 16 * 1024
+
+def get_platforms(username):
+    """Bangun URL profil untuk setiap platform"""
+    return {platform: url.format(username=username) for platform, url in PLATFORMS.items()}
+
+def probe_platform(url, platform=None):
+    """Status HTTP jika profil ditemukan menurut signature platform (status, redirect, byte pattern), None jika tidak.
+
+    Body di-stream dan transfer dibatalkan begitu verdict didapat, jadi paling
+    banyak max_bytes pertama yang diunduh. Verdict disimpan di cache.
+    Host yang terus throttle raise ThrottledError (dicatat sebagai error).
+    """
+    import http.client
+    from .cache import cache
+    from .transport import PoolTimeout
+    
+    hit, cached = cache.get('profile', url)
+    if hit and isinstance(cached, dict):
+        return cached['status'] if cached['verdict'] == FOUND else None
+    
+    signature = get_signatures().get(platform)
+    try:
+        response = get_transport().request('GET', url, headers=headers, timeout=8, preload=False,
+                                           follow_redirects=signature.follow_redirects)
+    except PoolTimeout:
+        # Pool lokal penuh: hasilnya error, bukan profil tidak ada
+        raise
+    except (http.client.HTTPException, OSError):
+        return None
+    try:
+        (verdict, reason), exhausted = signature.inspect(response, url)
+    except (http.client.HTTPException, OSError):
+        response.close()
+        return None
+    if not exhausted:
+        length = response.headers.get('Content-Length')
+        # Sisa body kecil lebih murah dibaca habis daripada membuka koneksi (dan handshake TLS) baru
+        if length and length.isdigit() and int(length) <= DRAIN_LIMIT:
+            response.read()
+            exhausted = True
+    if exhausted:
+        response.release()
+    else:
+        response.close()
+    # 429/5xx bersifat sementara, jadi verdict-nya tidak di-cache
+    if response.status < 429:
+        cache.set('profile', url, {'verdict': verdict, 'status': response.status})
+    return response.status if verdict == FOUND else None
+
+def _timed_probe(metrics):
+    """Worker probe_platform yang mencatat durasi dan hasil setiap request"""
+    def probe(url, platform=None):
+        with metrics.request('profile_probe') as span:
+            status = probe_platform(url, platform)
+            span.set('found' if status else 'not_found')
+            return status
+    return probe
+
+def check_username(username, session_id, concurrency=None):
     """Enhanced username search dengan 100+ platform"""
     start_time = time.time()
+    metrics = ScanMetrics('username')
     print(f"\n{Colors.BOLD}[*] Scanning username: {Colors.CYAN}{username}{Colors.END}")
     print(f"{Colors.YELLOW}[*] Checking 100+ platforms (this may take a minute)...{Colors.END}\n")
     
-    platforms = {
-        'GitHub': f'https://github.com/{username}',
-        'Reddit': f'https://www.reddit.com/user/{username}',
-        'Twitter/X': f'https://twitter.com/{username}',
-        'Instagram': f'https://www.instagram.com/{username}',
-        'Facebook': f'https://www.facebook.com/{username}',
-        'LinkedIn': f'https://www.linkedin.com/in/{username}',
-        'TikTok': f'https://www.tiktok.com/@{username}',
-        'Snapchat': f'https://www.snapchat.com/add/{username}',
-        'Pinterest': f'https://www.pinterest.com/{username}',
-        'Tumblr': f'https://{username}.tumblr.com',
-        
-        'Medium': f'https://medium.com/@{username}',
-        'YouTube': f'https://www.youtube.com/@{username}',
-        'Twitch': f'https://www.twitch.tv/{username}',
-        'Vimeo': f'https://vimeo.com/{username}',
-        'Dailymotion': f'https://www.dailymotion.com/{username}',
-        
-        'GitLab': f'https://gitlab.com/{username}',
-        'Bitbucket': f'https://bitbucket.org/{username}',
-        'CodePen': f'https://codepen.io/{username}',
-        'Replit': f'https://replit.com/@{username}',
-        'StackOverflow': f'https://stackoverflow.com/users/{username}',
-        'HackerRank': f'https://www.hackerrank.com/{username}',
-        'LeetCode': f'https://leetcode.com/{username}',
-        'CodeForces': f'https://codeforces.com/profile/{username}',
-        'HackerNews': f'https://news.ycombinator.com/user?id={username}',
-        
-        'DeviantArt': f'https://www.deviantart.com/{username}',
-        'Behance': f'https://www.behance.net/{username}',
-        'Dribbble': f'https://dribbble.com/{username}',
-        'ArtStation': f'https://www.artstation.com/{username}',
-        'Flickr': f'https://www.flickr.com/people/{username}',
-        
-        'Spotify': f'https://open.spotify.com/user/{username}',
-        'SoundCloud': f'https://soundcloud.com/{username}',
-        'Bandcamp': f'https://{username}.bandcamp.com',
-        'Mixcloud': f'https://www.mixcloud.com/{username}',
-        
-        'Steam': f'https://steamcommunity.com/id/{username}',
-        'Xbox': f'https://account.xbox.com/en-us/profile?gamertag={username}',
-        'PlayStation': f'https://psnprofiles.com/{username}',
-        'Roblox': f'https://www.roblox.com/users/profile?username={username}',
-        'Epic Games': f'https://www.epicgames.com/site/en-US/{username}',
-        
-        'AngelList': f'https://angel.co/{username}',
-        'Meetup': f'https://www.meetup.com/members/{username}',
-        'SlideShare': f'https://www.slideshare.net/{username}',
-        'ResearchGate': f'https://www.researchgate.net/profile/{username}',
-        'Academia': f'https://independent.academia.edu/{username}',
-        
-        'ProductHunt': f'https://www.producthunt.com/@{username}',
-        'Etsy': f'https://www.etsy.com/shop/{username}',
-        'Patreon': f'https://www.patreon.com/{username}',
-        
-        'Quora': f'https://www.quora.com/profile/{username}',
-        'Scribd': f'https://www.scribd.com/{username}',
-        
-        'About.me': f'https://about.me/{username}',
-        'Linktree': f'https://linktr.ee/{username}',
-        'Gravatar': f'https://gravatar.com/{username}',
-        'Keybase': f'https://keybase.io/{username}',
-        
-        'Kaskus': f'https://www.kaskus.co.id/profile/{username}',
-        'Tokopedia': f'https://www.tokopedia.com/{username}',
-        'Shopee': f'https://shopee.co.id/{username}',
-        'Bukalapak': f'https://www.bukalapak.com/u/{username}',
-        'Lazada': f'https://www.lazada.co.id/shop/{username}',
-    }
+    platforms = get_platforms(username)
     
     found = []
     not_found = []
     errors = []
-    lock = threading.Lock()
-    
-    def check_platform(platform, url):
-        try:
-            response = make_request(url, timeout=8)
-            if response and response.status == 200:
-                with lock:
-                    found.append({'platform': platform, 'url': url, 'status_code': 200})
-                    print(f"  {Colors.GREEN}[✓] {platform:25s} → {url}{Colors.END}")
-            else:
-                with lock:
-                    not_found.append(platform)
-        except Exception as e:
-            with lock:
-                errors.append({'platform': platform, 'error': str(e)})
-    
-    threads = []
-    max_threads = 20 
-    
-    for i, (platform, url) in enumerate(platforms.items()):
-        thread = threading.Thread(target=check_platform, args=(platform, url))
-        thread.start()
-        threads.append(thread)
-        
-        if len(threads) >= max_threads:
-            for t in threads:
-                t.join()
-            threads = []
-    
-    for thread in threads:
-        thread.join()
+    
+    def on_result(platform, status, error):
+        url = platforms[platform]
+        if error is not None:
+            errors.append({'platform': platform, 'error': str(error)})
+        elif status:
+            found.append({'platform': platform, 'url': url, 'status_code': status})
+            print(f"  {Colors.GREEN}[✓] {platform:25s} → {url}{Colors.END}")
+        else:
+            not_found.append(platform)
+    
+    engine = ProbeEngine(limit=concurrency or len(platforms))
+    with metrics.stage('platform_probes') as stage:
+        engine.run(((platform, (url, platform)) for platform, url in platforms.items()), _timed_probe(metrics),
+                   on_result)
+        stage.set(platforms=len(platforms))
     
     found.sort(key=lambda x: x['platform'])
     
@@ -161,7 +214,100 @@ def check_username(username, session_id):
         'timestamp': datetime.now().isoformat()
     }
     
-    save_results('username', results, session_id)
+    save_results('username', results, session_id, metrics=metrics)
     generate_report('username', results, session_id)
     
     return results
+
+def iter_usernames(source):
+    """Baca username satu per baris dari file ('-' untuk stdin)"""
+    handle = sys.stdin if source == '-' else open(source, encoding='utf-8')
+    try:
+        for line in handle:
+            name = line.strip()
+            if name and not name.startswith('#'):
+                yield name
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+def check_usernames_batch(source, session_id, output=None, concurrency=50, restart=False):
+    """Batch username scan dengan output JSONL yang di-stream per hasil.
+
+    Probe yang selesai (found/not_found) dicatat di job journal; command yang
+    sama melanjutkan ke output yang sama dan hanya menjalankan sisanya.
+    Probe yang error diulang saat resume.
+    """
+    journal = open_journal('username_batch', source, restart=restart)
+    if output is None and journal is not None:
+        output = journal.meta.get('output')
+    if output is None:
+        output = f"result/username_batch_{session_id}.jsonl"
+    if journal is not None and 'output' not in journal.meta:
+        journal.set_meta(output=output)
+    out = sys.stdout if output == '-' else open(output, 'a', encoding='utf-8')
+    # Jika JSONL ke stdout, status ditulis ke stderr supaya output tetap bersih
+    status = sys.stderr if out is sys.stdout else sys.stdout
+    
+    start_time = time.time()
+    metrics = ScanMetrics('username_batch')
+    counts = {'found': 0, 'not_found': 0, 'error': 0}
+    print(f"\n{Colors.BOLD}[*] Batch username scan from: {Colors.CYAN}{source}{Colors.END}", file=status)
+    if journal is not None and journal.resumed:
+        for verdict in journal.done.values():
+            counts[verdict] += 1
+        print(f"{Colors.CYAN}[i] Resuming job: {len(journal)} probes already done{Colors.END}", file=status)
+    
+    jobs = (
+        ((username, platform, url), (url, platform))
+        for username in iter_usernames(source)
+        for platform, url in get_platforms(username).items()
+        if journal is None or (username, platform) not in journal
+    )
+    
+    def on_result(key, is_found, error):
+        username, platform, url = key
+        record = {
+            'session_id': session_id,
+            'username': username,
+            'platform': platform,
+            'url': url,
+            'status': 'error' if error is not None else ('found' if is_found else 'not_found'),
+            'timestamp': datetime.now().isoformat()
+        }
+        if error is not None:
+            record['error'] = str(error)
+        counts[record['status']] += 1
+        out.write(json.dumps(record, ensure_ascii=False) + '\n')
+        out.flush()
+        if journal is not None and error is None:
+            journal.record((username, platform), record['status'])
+    
+    try:
+        ProbeEngine(limit=concurrency).run(jobs, _timed_probe(metrics), on_result,
+                                           cancel=journal.cancelled if journal else None)
+    except KeyboardInterrupt:
+        if journal is not None:
+            journal.interrupted(status)
+        raise
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    if journal is not None:
+        journal.finish()
+    
+    scan_duration = time.time() - start_time
+    total = sum(counts.values())
+    print(f"\n{Colors.GREEN}[✓] Found: {counts['found']}{Colors.END}", file=status)
+    print(f"{Colors.RED}[×] Not found: {counts['not_found']}{Colors.END}", file=status)
+    print(f"{Colors.YELLOW}[!] Errors: {counts['error']}{Colors.END}", file=status)
+    print(f"{Colors.CYAN}[i] {total} probes in {scan_duration:.2f} seconds{Colors.END}", file=status)
+    limited = get_transport().limiter.stats()
+    if limited:
+        print(f"{Colors.YELLOW}[!] Rate-limited hosts: {', '.join(sorted(limited))}{Colors.END}", file=status)
+    if out is not sys.stdout:
+        print(f"{Colors.GREEN}[✓] Results streamed to: {output}{Colors.END}", file=status)
+    log(f"Batch username scan: {total} probes, {counts['found']} found, output {output}",
+        latency_ms=round(scan_duration * 1000, 1), timings=metrics.summary()['requests'])
+    
+    return counts
@@ -1,15 +1,11 @@
 import os
-import json
+import sys
 from datetime import datetime
-import urllib.request
-import urllib.parse
-import urllib.error
-import socket
-import ssl
+import atexit
+import threading
 from .colors import Colors
 
-# SSL context and headers for requests
-ssl_context = ssl._create_unverified_context()
+# Headers for requests
 headers = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
     'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
@@ -20,6 +16,20 @@ headers = {
     'Upgrade-Insecure-Requests': '1'
 }
 
+# Transport dibuat saat request pertama, jadi mode tanpa HTTP tidak memuat ssl/http.client
+_transport = None
+_transport_lock = threading.Lock()
+
+# Body lebih besar dari ini tidak disimpan di cache
+MAX_CACHED_BODY = 256 * 1024
+
+# Tulis juga file JSON per scan (format lama) selain ke result store
+LEGACY_JSON = bool(os.environ.get('XTRACE_LEGACY_JSON'))
+
+# HTML report bersifat opt-in (--report / XTRACE_REPORTS=1)
+REPORTS_ENABLED = bool(os.environ.get('XTRACE_REPORTS'))
+_pending_reports = set()
+
 def ensure_directories():
     """Pastikan semua folder yang dibutuhkan ada"""
     dirs = ['docs', 'images', 'logs', 'result', 'reports', 'data']
@@ -27,41 +37,82 @@ def ensure_directories():
         if not os.path.exists(d):
             os.makedirs(d)
 
-def log(message, level="INFO"):
-    """Logging ke file dengan format lengkap"""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    log_file = f"logs/xtrace_{datetime.now().strftime('%Y%m%d')}.log"
-    try:
-        with open(log_file, 'a', encoding='utf-8') as f:
-            f.write(f"[{timestamp}] [{level}] {message}\n")
-    except:
-        pass
+def log(message, level="INFO", **fields):
+    """Logging terstruktur (JSON lines) lewat background writer.
 
-def make_request(url, timeout=10, method='GET', data=None):
+    Field tambahan (mis. latency_ms=12.5) ikut dicatat di record; module
+    diambil dari pemanggil kalau tidak diberikan.
+    """
+    from .logger import logger
+    module = fields.pop('module', None) or sys._getframe(1).f_globals.get('__name__')
+    logger.log(message, level, module, **fields)
+
+def get_transport():
+    """Transport bersama supaya request ke host yang sama memakai ulang koneksi"""
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            import ssl
+            from .transport import HTTPTransport
+            from .ratelimit import RateLimiter
+            _transport = HTTPTransport(max_idle_per_host=4, max_connections=64,
+                                       context=ssl._create_unverified_context(), limiter=RateLimiter())
+            atexit.register(_transport.close)
+    return _transport
+
+def make_request(url, timeout=10, method='GET', data=None, use_cache=True):
     """HTTP request dengan error handling lengkap"""
+    import base64
+    import http.client
+    import urllib.parse
+    from .transport import BufferedResponse
+    from .ratelimit import ThrottledError
+    from .cache import cache
+    
+    cacheable = use_cache and method == 'GET' and not data
+    if cacheable:
+        hit, cached = cache.get('http', url)
+        if hit:
+            if cached['status'] >= 400:
+                return None
+            return BufferedResponse(cached['url'], cached['status'], cached['reason'],
+                                    cached['headers'], base64.b64decode(cached['body']))
+    
     try:
+        request_headers = headers
         if data:
             data = urllib.parse.urlencode(data).encode('utf-8')
+            request_headers = dict(headers, **{'Content-Type': 'application/x-www-form-urlencoded'})
         
-        req = urllib.request.Request(url, data=data, headers=headers, method=method)
-        response = urllib.request.urlopen(req, timeout=timeout, context=ssl_context)
-        return response
-    except urllib.error.HTTPError as e:
-        if e.code == 404:
+        response = get_transport().request(method, url, body=data, headers=request_headers, timeout=timeout)
+        # Error sementara (429/5xx) tidak di-cache
+        if cacheable and response.status < 429 and len(response.data) <= MAX_CACHED_BODY:
+            cache.set('http', url, {
+                'url': response.url,
+                'status': response.status,
+                'reason': response.reason,
+                'headers': list(response.headers.items()),
+                'body': base64.b64encode(response.data).decode('ascii')
+            })
+        if response.status >= 400:
             return None
-        return None
-    except urllib.error.URLError:
-        return None
-    except socket.timeout:
+        return response
+    except ThrottledError:
+        # Throttle bukan berarti resource tidak ada; pemanggil yang memutuskan
+        raise
+    except (http.client.HTTPException, OSError):
         return None
     except Exception as e:
         log(f"Request error for {url}: {str(e)}", "ERROR")
         return None
 
-def save_results(mode, data, session_id):
-    """Simpan hasil ke file JSON dengan format lengkap"""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"result/{mode}_{timestamp}.json"
+def save_results(mode, data, session_id, metrics=None):
+    """Simpan hasil ke result store (SQLite), opsional juga ke file JSON lama.
+
+    Jika metrics (ScanMetrics) diberikan, durasi per stage/request ikut
+    disimpan di metadata['timings'].
+    """
+    from .store import store
     
     result_data = {
         'session_id': session_id,
@@ -75,57 +126,40 @@ def save_results(mode, data, session_id):
             'scan_duration': data.get('scan_duration', 'unknown')
         }
     }
+    if metrics is not None:
+        result_data['metadata']['timings'] = metrics.summary()
+        if 'scan_duration' not in data:
+            result_data['metadata']['scan_duration'] = f"{metrics.elapsed:.2f}s"
     
     try:
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(result_data, f, indent=4, ensure_ascii=False)
+        record_id = store.add(result_data)
+        print(f"\n{Colors.GREEN}[✓] Results saved: {store.path} (#{record_id}){Colors.END}")
+        log(f"Results saved: {store.path} #{record_id}")
         
-        print(f"\n{Colors.GREEN}[✓] Results saved: {filename}{Colors.END}")
-        log(f"Results saved: {filename}")
-        return filename
+        if LEGACY_JSON:
+            filename = store.export_json([store.get(record_id)])[0]
+            print(f"{Colors.GREEN}[✓] JSON exported: {filename}{Colors.END}")
+        return record_id
     except Exception as e:
         print(f"{Colors.RED}[!] Error saving results: {e}{Colors.END}")
         return None
 
 def generate_report(mode, data, session_id):
-    """Generate HTML report"""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"reports/{mode}_report_{timestamp}.html"
-    
-    html_content = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <title>XTrace Report - {mode.upper()}</title>
-    <style>
-        body {{ font-family: Arial; margin: 20px; background: #f5f5f5; }}
-        .header {{ background: #2c3e50; color: white; padding: 20px; border-radius: 5px; }}
-        .section {{ background: white; margin: 20px 0; padding: 20px; border-radius: 5px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }}
-        .result-item {{ margin: 10px 0; padding: 10px; background: #ecf0f1; border-radius: 3px; }}
-        .success {{ color: #27ae60; }}
-        .error {{ color: #e74c3c; }}
-        table {{ width: 100%; border-collapse: collapse; }}
-        th, td {{ padding: 10px; text-align: left; border-bottom: 1px solid #ddd; }}
-        th {{ background: #34495e; color: white; }}
-    </style>
-</head>
-<body>
-    <div class="header">
-        <h1>XTrace v3.0 - OSINT Report</h1>
-        <p>Mode: {mode.upper()} | Session: {session_id}</p>
-        <p>Generated: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}</p>
-    </div>
-    <div class="section">
-        <h2>Scan Results</h2>
-        <pre>{json.dumps(data, indent=2, ensure_ascii=False)}</pre>
-    </div>
-</body>
-</html>
-"""
-    
-    try:
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        print(f"{Colors.GREEN}[✓] HTML report generated: {filename}{Colors.END}")
-    except:
-        pass
+    """Tandai session untuk HTML report (opt-in, dirender sekali di akhir run)"""
+    if not REPORTS_ENABLED:
+        return
+    if not _pending_reports:
+        atexit.register(flush_reports)
+    _pending_reports.add(session_id)
+
+def flush_reports():
+    """Render satu report berhalaman per session yang ditandai generate_report"""
+    from .report import render_query_report
+    while _pending_reports:
+        session_id = _pending_reports.pop()
+        try:
+            files = render_query_report(session_id=session_id)
+            if files:
+                print(f"{Colors.GREEN}[✓] HTML report generated: {files[0]} ({len(files)} pages){Colors.END}")
+        except Exception as e:
+            log(f"Report generation failed for session {session_id}: {e}", "ERROR")
@@ -2,25 +2,63 @@
 import argparse
 import sys
 import os
+import json
 from datetime import datetime
 import time
-import subprocess
 
-import importlib.metadata
-from packaging.version import parse as parse_version
+from modules.colors import Colors
+
+# Define requirements with package name and version specifier
+REQUIREMENTS = {
+    "beautifulsoup4": ">=4.12.0",
+    "dnspython": ">=2.4.0",
+    "Pillow": ">=10.0.0"
+}
+
+DEPCHECK_CACHE = os.path.join(os.path.expanduser('~'), '.cache', 'xtrace', 'depcheck.json')
+
+def environment_key():
+    """Fingerprint of the Python environment: interpreter, requirements and site-packages mtimes."""
+    parts = [sys.executable, sys.version, json.dumps(REQUIREMENTS, sort_keys=True)]
+    for path in sys.path:
+        # pip install/uninstall adds or removes entries, which bumps the directory mtime
+        if path.endswith(('site-packages', 'dist-packages')):
+            try:
+                parts.append(f"{path}:{os.stat(path).st_mtime_ns}")
+            except OSError:
+                pass
+    # Kept as plain text: hashing it would load hashlib/OpenSSL on every start
+    return '\n'.join(parts)
+
+def dependencies_cached(env_key):
+    """True if a previous run already verified the dependencies for this environment."""
+    try:
+        with open(DEPCHECK_CACHE, encoding='utf-8') as f:
+            return json.load(f).get('env_key') == env_key
+    except (OSError, ValueError):
+        return False
+
+def save_dependency_check(env_key):
+    try:
+        os.makedirs(os.path.dirname(DEPCHECK_CACHE), exist_ok=True)
+        with open(DEPCHECK_CACHE, 'w', encoding='utf-8') as f:
+            json.dump({'env_key': env_key, 'checked_at': datetime.now().isoformat()}, f)
+    except OSError:
+        pass
 
 def check_and_install_dependencies():
     """Checks for required packages and prompts the user to install them if they are missing."""
+    if dependencies_cached(environment_key()):
+        return
+
     try:
-        # Define requirements with package name and version specifier
-        requirements = {
-            "beautifulsoup4": ">=4.12.0",
-            "dnspython": ">=2.4.0",
-            "Pillow": ">=10.0.0"
-        }
+        import subprocess
+        import importlib.metadata
+        from packaging.version import parse as parse_version
+
         missing_packages = []
 
-        for package, version_spec in requirements.items():
+        for package, version_spec in REQUIREMENTS.items():
             try:
                 installed_version = importlib.metadata.version(package)
                 if parse_version(installed_version) < parse_version(version_spec.strip(">=")):
@@ -44,7 +82,7 @@ def check_and_install_dependencies():
                     subprocess.check_call([sys.executable, "-m", "pip", "install", *package_names])
                     print(f"{Colors.GREEN}[✓] Dependencies installed successfully.{Colors.END}")
                     # Re-check to be sure
-                    for package, version_spec in requirements.items():
+                    for package, version_spec in REQUIREMENTS.items():
                         importlib.metadata.version(package) # This will raise PackageNotFoundError if not installed
                 except subprocess.CalledProcessError as e:
                     print(f"{Colors.RED}[!] Error installing dependencies: {e}{Colors.END}")
@@ -63,25 +101,14 @@ def check_and_install_dependencies():
         print(f"{Colors.YELLOW}Please upgrade your Python environment or manually install dependencies from requirements.txt.{Colors.END}")
         sys.exit(1)
 
+    # Recompute the key: a successful install above changes site-packages
+    save_dependency_check(environment_key())
 
-# These imports are now guaranteed by the dependency checker.
-from PIL import Image
-import dns.resolver
-from bs4 import BeautifulSoup
-
-from modules.colors import Colors
-from modules.username import check_username
-from modules.email import check_email
-from modules.domain import check_domain
-from modules.phone import check_phone
-from modules.ip import check_ip
-from modules.photo import check_photo
-from modules.utils import ensure_directories, log
 
+# Mode modules are imported on demand so each invocation only loads what it uses.
 class XTraceOSINT:
     def __init__(self):
         self.session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
-        ensure_directories()
     
     def banner(self):
         """Banner aplikasi enhanced"""
@@ -107,6 +134,9 @@ class XTraceOSINT:
 [!] Timestamp: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}{Colors.END}
 """
         print(banner)
+        from modules.utils import log
+        from modules.logger import set_session
+        set_session(self.session_id)
         log(f"XTrace v3.0 started - Session: {self.session_id}")
 
     def interactive_mode(self):
@@ -134,37 +164,44 @@ class XTraceOSINT:
                 print(f"║  Thank you for using XTrace v3.0!          ║")
                 print(f"║  Stay safe and hack ethically!             ║")
                 print(f"╚════════════════════════════════════════════╝{Colors.END}\n")
+                from modules.utils import log
                 log("Session ended by user")
                 break
                 
             elif choice == '1':
                 username = input(f"\n{Colors.YELLOW}Enter username: {Colors.END}").strip()
                 if username:
+                    from modules.username import check_username
                     check_username(username, self.session_id)
                     
             elif choice == '2':
                 email = input(f"\n{Colors.YELLOW}Enter email: {Colors.END}").strip()
                 if email:
+                    from modules.email import check_email
                     check_email(email, self.session_id)
                     
             elif choice == '3':
                 domain = input(f"\n{Colors.YELLOW}Enter domain: {Colors.END}").strip()
                 if domain:
+                    from modules.domain import check_domain
                     check_domain(domain, self.session_id)
                     
             elif choice == '4':
                 phone = input(f"\n{Colors.YELLOW}Enter phone number: {Colors.END}").strip()
                 if phone:
+                    from modules.phone import check_phone
                     check_phone(phone, self.session_id)
                     
             elif choice == '5':
                 ip = input(f"\n{Colors.YELLOW}Enter IP address: {Colors.END}").strip()
                 if ip:
+                    from modules.ip import check_ip
                     check_ip(ip, self.session_id)
                     
             elif choice == '6':
                 photo = input(f"\n{Colors.YELLOW}Enter photo path: {Colors.END}").strip()
                 if photo:
+                    from modules.photo import check_photo
                     check_photo(photo, self.session_id)
                     
             elif choice == '7':
@@ -177,62 +214,187 @@ class XTraceOSINT:
     
     def view_reports(self):
         """View saved reports"""
+        from modules.store import store
         print(f"\n{Colors.BOLD}[*] Saved Reports:{Colors.END}\n")
         
-        result_files = sorted([f for f in os.listdir('result') if f.endswith('.json')])
+        latest = store.latest(10)
         
-        if not result_files:
+        if not latest:
             print(f"{Colors.YELLOW}[!] No reports found{Colors.END}")
             return
         
-        for i, filename in enumerate(result_files[-10:], 1):  # Show last 10
-            print(f"  {Colors.CYAN}[{i}] {filename}{Colors.END}")
+        for row in reversed(latest):  # Show last 10
+            print(f"  {Colors.CYAN}[{row['id']}] {row['timestamp'][:19]}  {row['mode']:8s} {row['target']}{Colors.END}")
         
-        print(f"\n{Colors.GREEN}[✓] Total reports: {len(result_files)}{Colors.END}")
-        print(f"{Colors.CYAN}[i] Location: ./result/{Colors.END}")
+        print(f"\n{Colors.GREEN}[✓] Total reports: {store.count()}{Colors.END}")
+        print(f"{Colors.CYAN}[i] Location: {store.path}{Colors.END}")
 
 def main():
     """Main function"""
-    check_and_install_dependencies()
     parser = argparse.ArgumentParser(description="XTrace v3.0 - Advanced OSINT Intelligence Platform", add_help=False)
 
     parser.add_argument('-u', '--username', help="Search for a username")
+    parser.add_argument('-U', '--username-file', help="Batch username scan from a file ('-' for stdin)")
+    parser.add_argument('-o', '--output', help="Output file for batch modes, JSONL or .csv for phones ('-' for stdout)")
     parser.add_argument('-e', '--email', help="Analyze an email address")
+    parser.add_argument('-E', '--email-file', help="Bulk email validation from a file ('-' for stdin)")
+    parser.add_argument('--hash-index-add', help="Add an email list to the hash reverse index ('-' for stdin)")
+    parser.add_argument('--hash-lookup', help="Find emails for a md5/sha1/sha256 digest or a file of digests ('-' for stdin)")
+    parser.add_argument('--hash-index', help="Hash reverse index directory (default: data/hashindex)")
     parser.add_argument('-d', '--domain', help="Analyze a domain")
+    parser.add_argument('-D', '--domain-file', help="Batch domain analysis from a file ('-' for stdin)")
     parser.add_argument('-p', '--phone', help="Analyze a phone number")
+    parser.add_argument('-P', '--phone-file', help="Bulk phone analysis from a CSV/text file ('-' for stdin)")
+    parser.add_argument('--phone-column', help="CSV column holding the phone number (default: auto-detect)")
+    parser.add_argument('--lookup-urls', action='store_true', help="Add lookup-resource URL columns in bulk phone mode")
     parser.add_argument('-i', '--ip', help="Analyze an IP address")
     parser.add_argument('-ph', '--photo', help="Analyze a photo")
+    parser.add_argument('-c', '--concurrency', type=int, help="Maximum concurrent probes / worker processes")
+    parser.add_argument('-w', '--wordlist', help="Subdomain wordlist for domain analysis")
+    parser.add_argument('--nameservers', help="Comma-separated DNS servers for subdomain enumeration")
+    parser.add_argument('--deadline', type=float, help="Per-scan deadline in seconds for domain analysis (default: 60)")
+    parser.add_argument('--restart', action='store_true', help="Discard the job journal of an interrupted batch job and start over")
+    parser.add_argument('--resume', action='store_true', help="Continue an interrupted or timed-out subdomain enumeration (-d)")
+    parser.add_argument('--ports', help="Ports to scan in IP mode, e.g. 22,80,8000-8100")
+    parser.add_argument('--scope', help="Scope file of authorized IPs/CIDRs (default: data/scope.txt)")
+    parser.add_argument('--session', help="Select stored results by session ID")
+    parser.add_argument('--target', help="Select stored results by target")
+    parser.add_argument('--export-json', action='store_true', help="Export selected stored results as per-scan JSON files")
+    parser.add_argument('--report', action='store_true', help="Render a paginated HTML report for the session (or for --session/--target)")
+    parser.add_argument('--legacy-json', action='store_true', help="Also write a per-scan JSON file for each result")
+    parser.add_argument('--no-cache', action='store_true', help="Bypass the HTTP/DNS response cache")
+    parser.add_argument('--metrics-file', help='Write per-stage timing metrics (Prometheus text format)')
     parser.add_argument('-h', '--help', action='store_true', help='Show this help message and exit')
 
     args = parser.parse_args()
 
-    tool = XTraceOSINT()
-
     if args.help:
         print_help()
         sys.exit(0)
 
+    check_and_install_dependencies()
+
+    from modules.utils import ensure_directories, log
+
     if len(sys.argv) == 1:
+        ensure_directories()
+        tool = XTraceOSINT()
         tool.banner()
         tool.interactive_mode()
         sys.exit(0)
 
+    if args.export_json:
+        export_results(args.session, args.target)
+        return
+
+    modes = [args.username, args.username_file, args.email, args.email_file, args.hash_index_add,
+             args.hash_lookup, args.domain, args.domain_file, args.phone, args.phone_file, args.ip, args.photo]
+    if args.report and not any(modes):
+        render_reports(args.session, args.target)
+        return
+
+    if not any(modes):
+        parser.print_help()
+        return
+
+    ensure_directories()
+    if args.legacy_json or args.report:
+        import modules.utils
+        modules.utils.LEGACY_JSON = modules.utils.LEGACY_JSON or args.legacy_json
+        modules.utils.REPORTS_ENABLED = modules.utils.REPORTS_ENABLED or args.report
     session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+    from modules.logger import set_session
+    set_session(session_id)
+
+    if args.no_cache:
+        # Read by modules.cache when the shared cache is created
+        os.environ['XTRACE_NO_CACHE'] = '1'
 
     if args.username:
-        check_username(args.username, session_id)
+        from modules.username import check_username
+        check_username(args.username, session_id, concurrency=args.concurrency)
+    elif args.username_file:
+        from modules.username import check_usernames_batch
+        check_usernames_batch(args.username_file, session_id, output=args.output,
+                              concurrency=args.concurrency or 50, restart=args.restart)
     elif args.email:
+        from modules.email import check_email
         check_email(args.email, session_id)
+    elif args.email_file:
+        from modules.email import check_emails_batch
+        check_emails_batch(args.email_file, session_id, output=args.output, concurrency=args.concurrency or 50,
+                           restart=args.restart)
+    elif args.hash_index_add or args.hash_lookup:
+        from modules.hashindex import build_hash_index, lookup_hashes, DEFAULT_DIRECTORY
+        directory = args.hash_index or DEFAULT_DIRECTORY
+        if args.hash_index_add:
+            build_hash_index(args.hash_index_add, directory)
+        if args.hash_lookup:
+            lookup_hashes(args.hash_lookup, directory, output=args.output)
     elif args.domain:
-        check_domain(args.domain, session_id)
+        from modules.domain import check_domain
+        from modules.stages import DEFAULT_DEADLINE
+        nameservers = args.nameservers.split(',') if args.nameservers else None
+        check_domain(args.domain, session_id, wordlist=args.wordlist, nameservers=nameservers,
+                     concurrency=args.concurrency, deadline=args.deadline or DEFAULT_DEADLINE, resume=args.resume)
+    elif args.domain_file:
+        from modules.domain import check_domains_batch
+        from modules.stages import DEFAULT_DEADLINE
+        nameservers = args.nameservers.split(',') if args.nameservers else None
+        check_domains_batch(args.domain_file, session_id, output=args.output, workers=args.concurrency,
+                            wordlist=args.wordlist, nameservers=nameservers,
+                            deadline=args.deadline or DEFAULT_DEADLINE, restart=args.restart)
     elif args.phone:
+        from modules.phone import check_phone
         check_phone(args.phone, session_id)
+    elif args.phone_file:
+        from modules.phone import check_phones_batch
+        check_phones_batch(args.phone_file, session_id, output=args.output, workers=args.concurrency,
+                           column=args.phone_column, lookups=args.lookup_urls)
     elif args.ip:
-        check_ip(args.ip, session_id)
+        from modules.ip import check_ip
+        check_ip(args.ip, session_id, port_spec=args.ports, scope_file=args.scope,
+                 concurrency=args.concurrency)
     elif args.photo:
-        check_photo(args.photo, session_id)
-    else:
-        parser.print_help()
+        if os.path.isdir(args.photo):
+            from modules.photo import check_photo_directory
+            check_photo_directory(args.photo, session_id, output=args.output, workers=args.concurrency)
+        else:
+            from modules.photo import check_photo
+            check_photo(args.photo, session_id)
+
+    # Only modes that touched the network have loaded the cache
+    cache_module = sys.modules.get('modules.cache')
+    if cache_module and (cache_module.cache.hits or cache_module.cache.misses):
+        log(f"Cache stats: {cache_module.cache.stats()}")
+
+    if args.metrics_file:
+        from modules.metrics import registry
+        registry.write_prometheus(args.metrics_file)
+        print(f"{Colors.GREEN}[✓] Metrics written: {args.metrics_file}{Colors.END}")
+
+def export_results(session_id=None, target=None):
+    """Export stored results to the legacy one-JSON-file-per-scan layout"""
+    if not session_id and not target:
+        print(f"{Colors.RED}[!] Use --session and/or --target to select results to export{Colors.END}")
+        return
+    from modules.store import store
+    filenames = store.export_json(store.iter_rows(session_id=session_id, target=target))
+    for filename in filenames:
+        print(f"  {Colors.CYAN}→ {filename}{Colors.END}")
+    print(f"{Colors.GREEN}[✓] Exported {len(filenames)} results{Colors.END}")
+
+def render_reports(session_id=None, target=None):
+    """Render an HTML report on demand from stored results"""
+    if not session_id and not target:
+        print(f"{Colors.RED}[!] Use --session and/or --target to select results for the report{Colors.END}")
+        return
+    from modules.report import render_query_report
+    files = render_query_report(session_id=session_id, target=target)
+    if not files:
+        print(f"{Colors.YELLOW}[!] No stored results match{Colors.END}")
+        return
+    print(f"{Colors.GREEN}[✓] HTML report generated: {files[0]} ({len(files)} pages){Colors.END}")
 
 def print_help():
     """Print help menu"""
@@ -246,20 +408,50 @@ def print_help():
 
 {Colors.BOLD}OPTIONS:{Colors.END}
   {Colors.GREEN}-u, --username <username>{Colors.END}    Search username across 50+ platforms
+  {Colors.GREEN}-U, --username-file <file>{Colors.END}    Batch username scan, one per line ('-' = stdin)
+  {Colors.GREEN}-o, --output <file>{Colors.END}          JSONL output for batch modes, .csv for phones ('-' = stdout)
   {Colors.GREEN}-e, --email <email>{Colors.END}          Email validation and OSINT
+  {Colors.GREEN}-E, --email-file <file>{Colors.END}      Bulk email validation, one lookup per domain ('-' = stdin)
+  {Colors.GREEN}--hash-index-add <file>{Colors.END}     Add emails to the hash reverse index ('-' = stdin)
+  {Colors.GREEN}--hash-lookup <hash|file>{Colors.END}   Find known emails for md5/sha1/sha256 digests ('-' = stdin)
+  {Colors.GREEN}--hash-index <dir>{Colors.END}          Hash reverse index directory (default: data/hashindex)
   {Colors.GREEN}-d, --domain <domain>{Colors.END}        Domain analysis and DNS lookup
+  {Colors.GREEN}-D, --domain-file <file>{Colors.END}     Batch domain analysis on shared worker pools ('-' = stdin)
   {Colors.GREEN}-p, --phone <phone>{Colors.END}          Phone number lookup and analysis
+  {Colors.GREEN}-P, --phone-file <file>{Colors.END}      Bulk phone analysis from CSV/text, deduplicated ('-' = stdin)
+  {Colors.GREEN}--phone-column <name>{Colors.END}       CSV column with the phone number (default: auto-detect)
+  {Colors.GREEN}--lookup-urls{Colors.END}               Add lookup-resource URL columns to bulk phone output
   {Colors.GREEN}-i, --ip <ip>{Colors.END}               IP address information and port scan
-  {Colors.GREEN}-ph, --photo <photo>{Colors.END}        Photo EXIF and metadata extraction
+  {Colors.GREEN}-ph, --photo <photo>{Colors.END}        Photo EXIF and metadata extraction (file or folder)
+  {Colors.GREEN}-c, --concurrency <n>{Colors.END}       Maximum concurrent probes (default: all platforms)
+  {Colors.GREEN}-w, --wordlist <file>{Colors.END}       Subdomain wordlist (default: data/subdomains.txt)
+  {Colors.GREEN}--nameservers <ip,ip>{Colors.END}       DNS servers used for subdomain enumeration
+  {Colors.GREEN}--deadline <seconds>{Colors.END}        Overall deadline for domain analysis stages (default: 60)
+  {Colors.GREEN}--restart{Colors.END}                   Start an interrupted batch job over instead of resuming
+  {Colors.GREEN}--resume{Colors.END}                    Continue an interrupted or timed-out subdomain enumeration (-d)
+  {Colors.GREEN}--ports <list>{Colors.END}              Ports for IP scan, e.g. 22,80,8000-8100
+  {Colors.GREEN}--scope <file>{Colors.END}              Authorized IPs/CIDRs for port scanning (default: data/scope.txt)
+  {Colors.GREEN}--session <id>{Colors.END}              Select stored results by session ID
+  {Colors.GREEN}--target <value>{Colors.END}            Select stored results by target
+  {Colors.GREEN}--export-json{Colors.END}               Export selected results as per-scan JSON files
+  {Colors.GREEN}--report{Colors.END}                    Render a paginated HTML report (run session or --session/--target)
+  {Colors.GREEN}--legacy-json{Colors.END}               Also write a per-scan JSON file for new results
+  {Colors.GREEN}--no-cache{Colors.END}                  Bypass the on-disk HTTP/DNS cache (data/cache.db)
+  {Colors.GREEN}--metrics-file <file>{Colors.END}       Write per-stage timings in Prometheus text format
   {Colors.GREEN}-h, --help{Colors.END}                  Show this help menu
 
 {Colors.BOLD}EXAMPLES:{Colors.END}
   {Colors.CYAN}xtrace -u john_doe{Colors.END}
+  {Colors.CYAN}xtrace -U usernames.txt -o hits.jsonl{Colors.END}
   {Colors.CYAN}xtrace -e test@example.com{Colors.END}
+  {Colors.CYAN}xtrace --hash-index-add emails.txt --hash-lookup leaked_hashes.txt{Colors.END}
   {Colors.CYAN}xtrace -d example.com{Colors.END}
+  {Colors.CYAN}xtrace -D domains.txt -c 64 -o domains.jsonl{Colors.END}
   {Colors.CYAN}xtrace -p +6281234567890{Colors.END}
+  {Colors.CYAN}xtrace -P contacts.csv -o enriched.csv{Colors.END}
   {Colors.CYAN}xtrace -i 8.8.8.8{Colors.END}
   {Colors.CYAN}xtrace -ph image.jpg{Colors.END}
+  {Colors.CYAN}xtrace -ph ./evidence/ -o photos.jsonl{Colors.END}
 
 {Colors.BOLD}FEATURES:{Colors.END}
   • Username search across 50+ social media & platforms
@@ -268,13 +460,13 @@ def print_help():
   • Phone number validation and provider lookup (ID support)
   • IP geolocation, port scanning, and threat intelligence
   • Photo EXIF extraction including GPS coordinates
-  • Automated report generation (JSON & HTML)
+  • Indexed result store with on-demand HTML reports
   • Multi-threaded scanning for speed
   • Comprehensive logging system
 
 {Colors.BOLD}OUTPUT:{Colors.END}
-  • Results saved in: {Colors.CYAN}./result/{Colors.END}
-  • HTML reports in: {Colors.CYAN}./reports/{Colors.END}
+  • Results saved in: {Colors.CYAN}./result/xtrace.db{Colors.END}
+  • HTML reports in: {Colors.CYAN}./reports/{Colors.END} (with --report)
   • Logs saved in: {Colors.CYAN}./logs/{Colors.END}
 
 {Colors.BOLD}DEPENDENCIES:{Colors.END}